@@ -1,13 +1,25 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from src.models.user import db, User, UserRole
 from src.models.activity import Activity, ActivityType
+from src.models.activity_daily_count import ActivityDailyCount
 from src.routes.auth import token_required, role_required
+from src.services.read_routing import read_replica
+from src.services.pagination import paginate, InvalidCursor
+from src.services.loading import with_profile
+from src.services.activity_rollup import rebuild_activity_rollup
+from src.services.activity_archive import activity_archive, months_to_archive, add_months, DEFAULT_RETENTION_MONTHS
 from datetime import datetime, timedelta
+import itertools
+import click
+
+# Longest ?days= window the recent and statistics views accept
+MAX_DAYS = 366
 
 activities_bp = Blueprint('activities', __name__)
 
 @activities_bp.route('/', methods=['GET'])
 @token_required
+@read_replica
 def get_activities(current_user):
     # Get query parameters for filtering
     activity_type = request.args.get('activity_type')
@@ -21,7 +33,7 @@ def get_activities(current_user):
     per_page = request.args.get('per_page', 50, type=int)
     
     # Base query
-    query = Activity.query
+    query = with_profile(Activity.query, 'activities.list')
     
     # Apply filters
     if activity_type:
@@ -58,8 +70,11 @@ def get_activities(current_user):
         except ValueError:
             return jsonify({'message': 'Invalid date format for date_to!'}), 400
     
-    # Pagination
-    activities_pagination = query.order_by(Activity.created_at.desc()).paginate(page=page, per_page=per_page)
+    # Pagination (by page number, or by keyset when cursor= is given)
+    try:
+        activities_pagination = paginate(query, Activity.created_at, Activity.id, page=page, per_page=per_page)
+    except InvalidCursor:
+        return jsonify({'message': 'Invalid cursor value'}), 400
     
     # Format response
     activities_list = []
@@ -88,23 +103,24 @@ def get_activities(current_user):
     
     return jsonify({
         'activities': activities_list,
-        'total': activities_pagination.total,
-        'pages': activities_pagination.pages,
-        'current_page': activities_pagination.page
+        **activities_pagination.meta
     })
 
 @activities_bp.route('/recent', methods=['GET'])
 @token_required
+@read_replica
 def get_recent_activities(current_user):
     # Get query parameters
     days = request.args.get('days', 7, type=int)
     limit = request.args.get('limit', 20, type=int)
+    if not 1 <= days <= MAX_DAYS:
+        return jsonify({'message': f'days must be between 1 and {MAX_DAYS}'}), 400
     
     # Calculate date range
     from_date = datetime.utcnow() - timedelta(days=days)
     
     # Get recent activities
-    activities = Activity.query.filter(
+    activities = with_profile(Activity.query, 'activities.list').filter(
         Activity.created_at >= from_date
     ).order_by(Activity.created_at.desc()).limit(limit).all()
     
@@ -134,6 +150,80 @@ def get_recent_activities(current_user):
     
     return jsonify({'activities': activities_list})
 
+@activities_bp.route('/archive', methods=['GET'])
+@token_required
+@read_replica
+@role_required([UserRole.ADMIN, UserRole.MANAGER])
+def get_archived_activities(current_user):
+    """Activities moved out of the hot table, read from the monthly archive files"""
+    activity_type = request.args.get('activity_type')
+    month = request.args.get('month')
+    date_from = request.args.get('date_from')
+    date_to = request.args.get('date_to')
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', 50, type=int), 200)
+    
+    if page < 1 or per_page < 1:
+        return jsonify({'message': 'Invalid page value'}), 400
+    
+    filters = {}
+    for key in ('user_id', 'candidate_id', 'application_id', 'job_position_id'):
+        value = request.args.get(key, type=int)
+        if value:
+            filters[key] = value
+    
+    if activity_type:
+        try:
+            filters['activity_type'] = ActivityType(activity_type)
+        except ValueError:
+            return jsonify({'message': 'Invalid activity type value'}), 400
+    
+    from_date = to_date = None
+    try:
+        if month:
+            from_date = datetime.strptime(month, '%Y-%m')
+            to_date = add_months(from_date, 1) - timedelta(microseconds=1)
+        if date_from:
+            from_date = datetime.fromisoformat(date_from)
+        if date_to:
+            to_date = datetime.fromisoformat(date_to)
+    except ValueError:
+        return jsonify({'message': 'Invalid date format!'}), 400
+    
+    # Archived months are streamed, so only the requested page is kept in memory
+    rows = activity_archive().read(from_date, to_date, **filters)
+    page_rows = list(itertools.islice(rows, (page - 1) * per_page, page * per_page + 1))
+    has_more = len(page_rows) > per_page
+    page_rows = page_rows[:per_page]
+    
+    user_ids = {row['user_id'] for row in page_rows if row['user_id']}
+    user_names = dict(db.session.query(User.id, User.full_name).filter(User.id.in_(user_ids)).all()) if user_ids else {}
+    
+    activities_list = []
+    for row in page_rows:
+        activity_data = {
+            'id': row['id'],
+            'activity_type': row['activity_type'].value,
+            'description': row['description'],
+            'details': row['details'],
+            'created_at': row['created_at'].isoformat(),
+            'user_id': row['user_id'],
+            'user_name': user_names.get(row['user_id'])
+        }
+        
+        for key in ('candidate_id', 'application_id', 'job_position_id'):
+            if row[key]:
+                activity_data[key] = row[key]
+        
+        activities_list.append(activity_data)
+    
+    return jsonify({
+        'activities': activities_list,
+        'current_page': page,
+        'per_page': per_page,
+        'has_more': has_more
+    })
+
 @activities_bp.route('/', methods=['POST'])
 @token_required
 def create_activity(current_user):
@@ -170,31 +260,34 @@ def create_activity(current_user):
 
 @activities_bp.route('/statistics', methods=['GET'])
 @token_required
+@read_replica
 @role_required([UserRole.ADMIN, UserRole.MANAGER])
 def get_activity_statistics(current_user):
+    """Activity statistics over the last ``days`` days, answered from the daily rollup"""
     # Get query parameters
     days = request.args.get('days', 30, type=int)
+    if not 1 <= days <= MAX_DAYS:
+        return jsonify({'message': f'days must be between 1 and {MAX_DAYS}'}), 400
     
-    # Calculate date range
-    from_date = datetime.utcnow() - timedelta(days=days)
+    # Whole days, today included
+    today = datetime.utcnow().date()
+    from_day = today - timedelta(days=days - 1)
+    in_range = ActivityDailyCount.day >= from_day
+    activity_count = db.func.sum(ActivityDailyCount.count)
     
     # Count activities by type
-    type_counts = {}
-    for activity_type in ActivityType:
-        count = Activity.query.filter(
-            Activity.activity_type == activity_type,
-            Activity.created_at >= from_date
-        ).count()
-        type_counts[activity_type.value] = count
+    type_counts = dict(db.session.query(
+        ActivityDailyCount.activity_type, activity_count
+    ).filter(in_range).group_by(ActivityDailyCount.activity_type).all())
+    
+    type_distribution = {member.value: type_counts.get(member, 0) for member in ActivityType}
     
     # Count activities by user (top 5)
     user_counts = db.session.query(
-        Activity.user_id, User.full_name, db.func.count(Activity.id)
-    ).join(User).filter(
-        Activity.created_at >= from_date
-    ).group_by(Activity.user_id, User.full_name).order_by(
-        db.func.count(Activity.id).desc()
-    ).limit(5).all()
+        ActivityDailyCount.user_id, User.full_name, activity_count
+    ).join(User).filter(in_range).group_by(
+        ActivityDailyCount.user_id, User.full_name
+    ).order_by(activity_count.desc()).limit(5).all()
     
     user_data = [{
         'user_id': user_id,
@@ -202,31 +295,48 @@ def get_activity_statistics(current_user):
         'activity_count': count
     } for user_id, user_name, count in user_counts]
     
-    # Activity trend by day
-    today = datetime.utcnow().date()
-    daily_counts = []
+    # Activity trend by day, zero-filled and in chronological order
+    day_counts = dict(db.session.query(
+        ActivityDailyCount.day, activity_count
+    ).filter(in_range).group_by(ActivityDailyCount.day).all())
     
+    daily_counts = []
     for i in range(days):
-        day = today - timedelta(days=i)
-        day_start = datetime.combine(day, datetime.min.time())
-        day_end = datetime.combine(day, datetime.max.time())
-        
-        count = Activity.query.filter(
-            Activity.created_at >= day_start,
-            Activity.created_at <= day_end
-        ).count()
-        
+        day = from_day + timedelta(days=i)
         daily_counts.append({
             'date': day.isoformat(),
-            'count': count
+            'count': day_counts.get(day, 0)
         })
     
-    # Reverse to get chronological order
-    daily_counts.reverse()
-    
     return jsonify({
-        'total_activities': Activity.query.filter(Activity.created_at >= from_date).count(),
-        'type_distribution': type_counts,
+        'total_activities': sum(type_distribution.values()),
+        'type_distribution': type_distribution,
         'top_active_users': user_data,
         'daily_trend': daily_counts
     })
+
+@activities_bp.cli.command('archive')
+@click.option('--keep-months', type=int, default=None, help='Months to keep in the activities table')
+def archive_command(keep_months):
+    """Move activities older than the retention window into the monthly archive files"""
+    if keep_months is None:
+        keep_months = current_app.config.get('ACTIVITY_RETENTION_MONTHS', DEFAULT_RETENTION_MONTHS)
+    
+    archive = activity_archive()
+    total = 0
+    for month in months_to_archive(db.session.connection(), keep_months):
+        count = archive.archive_month(db.session.connection(), month)
+        db.session.commit()
+        total += count
+        click.echo(f"{month:%Y-%m}: {count} activities archived")
+    
+    click.echo(f"Archived {total} activities to {archive.directory}")
+
+@activities_bp.cli.command('rebuild-rollup')
+@click.option('--skip-archive', is_flag=True, help='Only count the activities table')
+def rebuild_rollup_command(skip_archive):
+    """Rebuild the daily activity rollup from the activities table and the archive"""
+    archive = None if skip_archive else activity_archive()
+    total, archived = rebuild_activity_rollup(db.session.connection(), archive)
+    db.session.commit()
+    click.echo(f"Counted {total} activities ({archived} from the archive)")
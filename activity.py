@@ -1,5 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, Float, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, Float, JSON, Index
 from sqlalchemy.orm import relationship
 import enum
 import datetime
@@ -17,6 +17,13 @@ class ActivityType(enum.Enum):
 
 class Activity(db.Model):
     __tablename__ = 'activities'
+    __table_args__ = (
+        Index('ix_activities_created_at', 'created_at'),
+        Index('ix_activities_candidate_id_created_at', 'candidate_id', 'created_at'),
+        Index('ix_activities_user_id_created_at', 'user_id', 'created_at'),
+        Index('ix_activities_activity_type_created_at', 'activity_type', 'created_at'),
+        Index('ix_activities_application_id', 'application_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'))
@@ -0,0 +1,111 @@
+from flask import current_app
+from sqlalchemy import select, delete
+from src.models.activity import Activity
+from src.services.activity_log import serialize_activity, deserialize_activity
+from src.services.sql_dates import month_of
+from datetime import datetime
+import glob
+import gzip
+import os
+import re
+
+# Activities live in two tiers: the hot ``activities`` table keeps the recent
+# months, older months are moved into one gzip'd NDJSON file per month. List and
+# statistics views only ever read the table; archived months are read by
+# streaming the files for the months a query overlaps.
+
+ARCHIVE_FILE = re.compile(r'activities-(\d{4})-(\d{2})\.ndjson\.gz$')
+
+DEFAULT_RETENTION_MONTHS = 6
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+class ActivityArchive:
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, month):
+        return os.path.join(self.directory, f'activities-{month:%Y-%m}.ndjson.gz')
+
+    def months(self):
+        """Start dates of the archived months, oldest first"""
+        months = []
+        for path in glob.glob(os.path.join(self.directory, 'activities-*.ndjson.gz')):
+            match = ARCHIVE_FILE.search(path)
+            if match:
+                months.append(datetime(int(match.group(1)), int(match.group(2)), 1))
+        return sorted(months)
+
+    def archive_month(self, connection, month):
+        """Move one month of the hot table into its archive file, returning the row count.
+
+        The file is written and fsynced before the rows are deleted, so a crash
+        can at worst leave rows in both places; readers skip the duplicates.
+        Months archived again (late rows) are appended as a new gzip member.
+        """
+        in_month = (Activity.created_at >= month, Activity.created_at < add_months(month, 1))
+        rows = connection.execute(
+            select(Activity.__table__).where(*in_month).order_by(Activity.created_at, Activity.id)
+        ).mappings()
+
+        os.makedirs(self.directory, exist_ok=True)
+        count = 0
+        with open(self.path(month), 'ab') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='ab') as archive:
+                for row in rows:
+                    archive.write((serialize_activity(dict(row)) + '\n').encode())
+                    count += 1
+            raw.flush()
+            os.fsync(raw.fileno())
+
+        connection.execute(delete(Activity.__table__).where(*in_month))
+        return count
+
+    def read(self, from_date=None, to_date=None, **filters):
+        """Yield archived activities as dicts, oldest first, matching ``filters`` exactly"""
+        for month in self.months():
+            if from_date and add_months(month, 1) <= from_date:
+                continue
+            if to_date and month > to_date:
+                continue
+
+            seen = set()
+            with gzip.open(self.path(month), 'rt') as archive:
+                for line in archive:
+                    row = deserialize_activity(line)
+                    if row['id'] in seen:
+                        continue
+                    seen.add(row['id'])
+
+                    if from_date and row['created_at'] < from_date:
+                        continue
+                    if to_date and row['created_at'] > to_date:
+                        continue
+                    if all(row.get(key) == value for key, value in filters.items()):
+                        yield row
+
+
+def activity_archive():
+    """The archive of the current app, under ``ACTIVITY_ARCHIVE_DIR``"""
+    directory = current_app.config.get('ACTIVITY_ARCHIVE_DIR') or os.path.join(
+        current_app.instance_path, 'archive', 'activities'
+    )
+    return ActivityArchive(directory)
+
+
+def months_to_archive(connection, keep_months):
+    """Start dates of the hot-table months that fall outside the retention window"""
+    cutoff = add_months(month_start(datetime.utcnow()), -keep_months)
+    month = month_of(Activity.created_at)
+    rows = connection.execute(
+        select(month).where(Activity.created_at < cutoff).group_by(month).order_by(month)
+    ).scalars()
+    return [datetime.strptime(value, '%Y-%m') for value in rows]
@@ -0,0 +1,24 @@
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import Column, Integer, Date, ForeignKey, Enum, UniqueConstraint, Index, text
+from .user import db
+from .activity import ActivityType
+
+class ActivityDailyCount(db.Model):
+    __tablename__ = 'activity_daily_counts'
+    __table_args__ = (
+        UniqueConstraint('day', 'activity_type', 'user_id', name='uq_activity_daily_counts_day_type_user'),
+        # NULLs are distinct in the constraint above, so rows without a user get their own
+        Index('uq_activity_daily_counts_day_type_no_user', 'day', 'activity_type', unique=True,
+              sqlite_where=text('user_id IS NULL'), postgresql_where=text('user_id IS NULL')),
+    )
+
+    # Rollup of the activities table, one row per day, activity type and user.
+    # Rows are never decremented, so archived activities stay counted.
+    id = Column(Integer, primary_key=True)
+    day = Column(Date, nullable=False)
+    activity_type = Column(Enum(ActivityType), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ActivityDailyCount {self.day} {self.activity_type.value} {self.user_id}>"
@@ -0,0 +1,338 @@
+from sqlalchemy import event, insert, inspect
+from src.models.user import db
+from src.models.activity import Activity, ActivityType
+from src.services.activity_rollup import count_daily_activities
+from src.services.dashboard_stream import dashboard_broadcaster
+from collections import Counter
+from datetime import datetime
+import atexit
+import glob
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_COLUMNS = (
+    'user_id', 'candidate_id', 'application_id', 'job_position_id',
+    'activity_type', 'description', 'details', 'created_at'
+)
+
+WRITE_ATTEMPTS = 3
+
+_PENDING_KEY = 'pending_activities'
+_RESOLVED_KEY = 'resolved_activities'
+_STOP = object()
+
+
+def log_activity(**values):
+    """Record an activity for the current transaction.
+
+    The row is written only if the transaction commits. Foreign key values may
+    be given as model instances, which resolves rows that only get their id
+    when the transaction is flushed (e.g. ``candidate_id=new_candidate``).
+    """
+    values.setdefault('created_at', datetime.utcnow())
+    session = db.session()
+    if not session.in_transaction():
+        # Tie the activity to a transaction so a rollback discards it
+        session.begin()
+    session.info.setdefault(_PENDING_KEY, []).append(values)
+
+
+def _resolve(values):
+    row = dict.fromkeys(ACTIVITY_COLUMNS)
+    for key, value in values.items():
+        if isinstance(value, db.Model):
+            # The identity key is known once flushed and never needs a query
+            identity = inspect(value).identity
+            value = identity[0] if identity else None
+        row[key] = value
+    return row
+
+
+def serialize_activity(row):
+    return json.dumps(dict(row, activity_type=row['activity_type'].name, created_at=row['created_at'].isoformat()))
+
+
+def deserialize_activity(line):
+    row = json.loads(line)
+    row['activity_type'] = ActivityType[row['activity_type']]
+    row['created_at'] = datetime.fromisoformat(row['created_at'])
+    return row
+
+
+class ActivitySink:
+    """Writes activity rows outside the request, in batches, from a background thread.
+
+    Rows are queued once their transaction commits. The worker inserts them in
+    bulk, up to ``ACTIVITY_LOG_BATCH_SIZE`` rows or ``ACTIVITY_LOG_FLUSH_INTERVAL``
+    seconds at a time. When the queue is full the request inserts its own rows
+    instead, so a slow database pushes back rather than dropping activities.
+
+    With ``ACTIVITY_LOG_SPOOL_DIR`` set, rows are appended to a spool segment
+    before they are queued. Segments are named by pid and a random token, so
+    a restarted process reusing a pid never appends to an old spool, and hold
+    at most one batch worth of rows. A segment is deleted once each of its rows
+    is written; rows dropped after ``WRITE_ATTEMPTS`` failed writes are moved to
+    a segment of their own first. Segments left by dead processes are
+    replayed on startup. A crash between an insert and the deletion can replay
+    rows twice. ``ACTIVITY_LOG_ASYNC = False`` writes activities inside the
+    request transaction instead.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._engine = None
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._spool_lock = threading.Lock()
+        self._spool_dir = None
+        self._spool_token = None
+        self._spool_sequence = 0
+        self._spool = None
+        self._spool_path = None
+        self._spool_rows = 0
+        # Segment path -> rows in it not yet written or moved aside
+        self._unwritten = {}
+
+    def init_app(self, app):
+        app.config.setdefault('ACTIVITY_LOG_ASYNC', True)
+        app.config.setdefault('ACTIVITY_LOG_QUEUE_SIZE', 10000)
+        app.config.setdefault('ACTIVITY_LOG_BATCH_SIZE', 500)
+        app.config.setdefault('ACTIVITY_LOG_FLUSH_INTERVAL', 1.0)
+        app.config.setdefault('ACTIVITY_LOG_ENQUEUE_TIMEOUT', 0.5)
+        app.config.setdefault('ACTIVITY_LOG_SHUTDOWN_TIMEOUT', 10.0)
+        app.config.setdefault('ACTIVITY_LOG_SPOOL_DIR', None)
+
+        self.enabled = app.config['ACTIVITY_LOG_ASYNC']
+        self.queue_size = app.config['ACTIVITY_LOG_QUEUE_SIZE']
+        self.batch_size = app.config['ACTIVITY_LOG_BATCH_SIZE']
+        self.flush_interval = app.config['ACTIVITY_LOG_FLUSH_INTERVAL']
+        self.enqueue_timeout = app.config['ACTIVITY_LOG_ENQUEUE_TIMEOUT']
+        self.shutdown_timeout = app.config['ACTIVITY_LOG_SHUTDOWN_TIMEOUT']
+        self._spool_dir = app.config['ACTIVITY_LOG_SPOOL_DIR']
+
+        with app.app_context():
+            self._engine = db.engine
+
+        if self._spool_dir:
+            os.makedirs(self._spool_dir, exist_ok=True)
+            self.replay_spools()
+
+        atexit.register(self.shutdown)
+
+    def enqueue(self, rows):
+        self._ensure_worker()
+        segment = self._spool_write(rows) if self._spool_dir else None
+
+        for row in rows:
+            try:
+                self._queue.put((row, segment), timeout=self.enqueue_timeout)
+            except queue.Full:
+                logger.warning("Activity queue full, writing activity inline")
+                self._write([(row, segment)])
+
+    def flush(self):
+        """Block until every queued row has been written"""
+        if self._queue is not None and self._pid == os.getpid():
+            self._queue.join()
+
+    def shutdown(self):
+        """Write out whatever is still queued, used at interpreter exit"""
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(self.shutdown_timeout)
+        if self._thread.is_alive():
+            logger.error("Activity writer did not finish within %ss, %s rows left in the queue",
+                         self.shutdown_timeout, self._queue.qsize())
+
+    def replay_spools(self):
+        """Insert the rows spooled by processes that exited before writing them"""
+        replayed = 0
+        for path in glob.glob(os.path.join(self._spool_dir, 'activities-*.ndjson')):
+            pid = int(os.path.basename(path).split('-')[1].split('.')[0])
+            if pid != os.getpid() and _process_alive(pid):
+                continue
+
+            # Claim the file so concurrently starting workers do not replay it twice
+            claimed = f'{path}.replay-{os.getpid()}'
+            try:
+                os.rename(path, claimed)
+            except FileNotFoundError:
+                continue
+
+            with open(claimed) as spool:
+                rows = [deserialize_activity(line) for line in spool if line.strip()]
+            for start in range(0, len(rows), self.batch_size):
+                self._insert(rows[start:start + self.batch_size])
+            os.remove(claimed)
+            replayed += len(rows)
+
+        if replayed:
+            logger.info("Replayed %s spooled activities", replayed)
+        return replayed
+
+    def _ensure_worker(self):
+        # Started lazily so that forked server workers each get their own thread
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            # Segments still open belong to the parent process
+            self._spool_token, self._spool_sequence = secrets.token_hex(4), 0
+            self._spool, self._spool_path, self._spool_rows, self._unwritten = None, None, 0, {}
+            self._thread = threading.Thread(target=self._run, name='activity-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, items):
+        """Insert queued ``(row, segment)`` items, retrying before giving up on them"""
+        rows = [row for row, _ in items]
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            try:
+                self._insert(rows)
+                break
+            except Exception:
+                if attempt == WRITE_ATTEMPTS:
+                    logger.exception("Dropping %s activities after %s failed writes", len(rows), attempt)
+                    if self._spool_dir:
+                        # Kept for the next startup, apart from the rows that were written
+                        self._spool_dropped(rows)
+                    break
+                time.sleep(0.1 * 2 ** attempt)
+
+        if self._spool_dir:
+            self._spool_settled(Counter(segment for _, segment in items))
+
+    def _insert(self, rows):
+        with self._engine.begin() as connection:
+            connection.execute(insert(Activity.__table__), rows)
+            count_daily_activities(connection, rows)
+        dashboard_broadcaster.notify()
+
+    def _segment_path(self):
+        self._spool_sequence += 1
+        name = f'activities-{os.getpid()}-{self._spool_token}-{self._spool_sequence:06d}.ndjson'
+        return os.path.join(self._spool_dir, name)
+
+    def _spool_write(self, rows):
+        """Append rows to the open segment, returning its path"""
+        data = ''.join(serialize_activity(row) + '\n' for row in rows)
+        with self._spool_lock:
+            if self._spool is not None and self._spool_rows >= self.batch_size:
+                self._spool.close()
+                self._spool = None
+            if self._spool is None:
+                self._spool_path = self._segment_path()
+                self._spool = open(self._spool_path, 'a')
+                self._spool_rows = 0
+            self._spool.write(data)
+            self._spool.flush()
+            os.fsync(self._spool.fileno())
+            self._spool_rows += len(rows)
+            self._unwritten[self._spool_path] = self._unwritten.get(self._spool_path, 0) + len(rows)
+            return self._spool_path
+
+    def _spool_dropped(self, rows):
+        with self._spool_lock:
+            path = self._segment_path()
+        with open(path, 'w') as spool:
+            spool.write(''.join(serialize_activity(row) + '\n' for row in rows))
+            spool.flush()
+            os.fsync(spool.fileno())
+
+    def _spool_settled(self, counts):
+        """Delete the segments whose rows have all been written or moved aside"""
+        with self._spool_lock:
+            for path, count in counts.items():
+                if path is None:
+                    continue
+                self._unwritten[path] -= count
+                if self._unwritten[path] > 0:
+                    continue
+                del self._unwritten[path]
+                if path == self._spool_path:
+                    self._spool.close()
+                    self._spool, self._spool_path = None, None
+                os.remove(path)
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+activity_sink = ActivitySink()
+
+
+@event.listens_for(db.session, 'before_commit')
+def resolve_pending_activities(session):
+    pending = session.info.get(_PENDING_KEY)
+    if not pending:
+        return
+
+    # Flush first so that new rows referenced by the activities have ids
+    session.flush()
+    rows = [_resolve(values) for values in session.info.pop(_PENDING_KEY)]
+
+    if activity_sink.enabled:
+        session.info[_RESOLVED_KEY] = rows
+    else:
+        session.connection().execute(insert(Activity.__table__), rows)
+        count_daily_activities(session.connection(), rows)
+
+
+@event.listens_for(db.session, 'after_commit')
+def enqueue_committed_activities(session):
+    rows = session.info.pop(_RESOLVED_KEY, None)
+    if rows:
+        activity_sink.enqueue(rows)
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def discard_pending_activities(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_RESOLVED_KEY, None)
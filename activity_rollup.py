@@ -0,0 +1,89 @@
+from sqlalchemy import event, select, insert, delete, func
+from sqlalchemy.dialects import postgresql, sqlite
+from src.models.user import db
+from src.models.activity import Activity
+from src.models.activity_daily_count import ActivityDailyCount
+from src.services.sql_dates import day_of
+from collections import Counter
+
+
+def _day_key(row):
+    return row['created_at'].date(), row['activity_type'], row['user_id']
+
+
+def apply_daily_counts(connection, counts):
+    """Add ``{(day, activity_type, user_id): count}`` to the rollup rows.
+
+    One INSERT ... ON CONFLICT DO UPDATE per key kind, so concurrent writers
+    adding to the same new row both land instead of one failing on the
+    unique constraint. Rows without a user conflict on the partial index, as
+    NULLs never match in the (day, type, user) constraint.
+    """
+    table = ActivityDailyCount.__table__
+    upsert = postgresql.insert if connection.dialect.name == 'postgresql' else sqlite.insert
+    # In key order so concurrent transactions take row locks in the same order
+    rows = [
+        {'day': day, 'activity_type': activity_type, 'user_id': user_id, 'count': count}
+        for (day, activity_type, user_id), count in sorted(
+            counts.items(), key=lambda item: (item[0][0], item[0][1].name, item[0][2] or 0)
+        )
+    ]
+
+    for with_user in (False, True):
+        params = [row for row in rows if (row['user_id'] is not None) == with_user]
+        if not params:
+            continue
+        statement = upsert(table)
+        if with_user:
+            statement = statement.on_conflict_do_update(
+                index_elements=['day', 'activity_type', 'user_id'],
+                set_={'count': table.c.count + statement.excluded.count}
+            )
+        else:
+            statement = statement.on_conflict_do_update(
+                index_elements=['day', 'activity_type'], index_where=table.c.user_id.is_(None),
+                set_={'count': table.c.count + statement.excluded.count}
+            )
+        connection.execute(statement, params)
+
+
+def count_daily_activities(connection, rows):
+    """Fold newly inserted activity rows into the rollup, inside the inserting transaction"""
+    apply_daily_counts(connection, Counter(_day_key(row) for row in rows))
+
+
+def rebuild_activity_rollup(connection, archive=None):
+    """Recompute the rollup from the activities table and, if given, the activity archive"""
+    table = ActivityDailyCount.__table__
+    connection.execute(delete(table))
+
+    day = day_of(Activity.created_at)
+    connection.execute(
+        insert(table).from_select(
+            ['day', 'activity_type', 'user_id', 'count'],
+            select(day, Activity.activity_type, Activity.user_id, func.count(Activity.id))
+            .group_by(day, Activity.activity_type, Activity.user_id)
+        )
+    )
+
+    archived = 0
+    if archive is not None:
+        counts = Counter()
+        for row in archive.read():
+            counts[_day_key(row)] += 1
+            archived += 1
+        apply_daily_counts(connection, counts)
+
+    total = connection.execute(select(func.coalesce(func.sum(table.c.count), 0))).scalar()
+    return total, archived
+
+
+@event.listens_for(db.session, 'after_flush')
+def count_flushed_activities(session, flush_context):
+    """Count activities added through the ORM, e.g. by POST /api/activities/"""
+    rows = [
+        {'created_at': obj.created_at, 'activity_type': obj.activity_type, 'user_id': obj.user_id}
+        for obj in session.new if isinstance(obj, Activity)
+    ]
+    if rows:
+        count_daily_activities(session.connection(), rows)
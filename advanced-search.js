@@ -2,6 +2,27 @@
 // This file contains the JavaScript code for the advanced search functionality
 // It handles dynamic filtering, suggestion algorithms, and search result rendering
 
+// Checkbox ids on the jobs page mapped to /api/search filter values
+const JOB_TYPE_PARAMS = { fulltime: 'full_time', parttime: 'part_time', contract: 'contract', temporary: 'temporary' };
+const SALARY_PARAMS = { negotiable: 'negotiable', 10: 'under_10', 20: '10_20', 30: '20_30', plus: '30_plus' };
+
+const JOB_TYPE_LABELS = {
+    full_time: 'Toàn thời gian',
+    part_time: 'Bán thời gian',
+    contract: 'Hợp đồng',
+    temporary: 'Tạm thời',
+    internship: 'Thực tập'
+};
+const JOB_LEVEL_LABELS = {
+    entry: 'Nhân viên',
+    junior: 'Chuyên viên',
+    mid_level: 'Chuyên viên',
+    senior: 'Chuyên viên cao cấp',
+    manager: 'Quản lý',
+    director: 'Giám đốc',
+    executive: 'Điều hành'
+};
+
 class MPSAdvancedSearch {
     constructor(options = {}) {
         // Default configuration
@@ -202,15 +223,12 @@ class MPSAdvancedSearch {
         }
         
         try {
-            // In a real implementation, this would be an API call
-            // For demo purposes, we'll simulate it
-            console.log(`Fetching suggestions for: ${query}`);
-            
-            // Simulate API call delay
-            await new Promise(resolve => setTimeout(resolve, 300));
-            
-            // Mock suggestions based on query
-            const suggestions = this.getMockSuggestions(query);
+            const params = new URLSearchParams({ q: query, limit: this.config.maxSuggestions });
+            const response = await fetch(`${this.config.suggestionsEndpoint}?${params}`);
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            const { suggestions } = await response.json();
             
             // Cache suggestions
             this.cache.suggestions[query] = suggestions;
@@ -222,33 +240,6 @@ class MPSAdvancedSearch {
         }
     }
     
-    // Get mock suggestions (in a real implementation, this would come from the API)
-    getMockSuggestions(query) {
-        query = query.toLowerCase();
-        
-        const allSuggestions = [
-            { type: 'position', text: 'Kỹ sư Điện tử', count: 12 },
-            { type: 'position', text: 'Kỹ sư Phần mềm', count: 8 },
-            { type: 'position', text: 'Kỹ thuật viên Bảo trì', count: 5 },
-            { type: 'position', text: 'Kỹ sư Cơ khí', count: 7 },
-            { type: 'position', text: 'Kỹ sư Tự động hóa', count: 4 },
-            { type: 'company', text: 'Samsung Electronics', count: 15 },
-            { type: 'company', text: 'LG Display', count: 9 },
-            { type: 'company', text: 'Intel Vietnam', count: 6 },
-            { type: 'company', text: 'Foxconn', count: 11 },
-            { type: 'skill', text: 'Kỹ năng lập trình', count: 22 },
-            { type: 'skill', text: 'Kỹ năng quản lý', count: 18 },
-            { type: 'skill', text: 'Kỹ năng giao tiếp', count: 30 },
-            { type: 'location', text: 'Khu công nghiệp Bắc Ninh', count: 14 },
-            { type: 'location', text: 'Khu công nghiệp Bình Dương', count: 16 }
-        ];
-        
-        // Filter suggestions based on query
-        return allSuggestions
-            .filter(suggestion => suggestion.text.toLowerCase().includes(query))
-            .slice(0, this.config.maxSuggestions);
-    }
-    
     // Render suggestions dropdown
     renderSuggestions(suggestions) {
         // Find or create suggestions container
@@ -411,20 +402,11 @@ class MPSAdvancedSearch {
                 return;
             }
             
-            // In a real implementation, this would be an API call
-            // For demo purposes, we'll simulate it
-            console.log('Performing search with:', {
-                filters: this.state.filters,
-                sortBy: this.state.sortBy,
-                page: this.state.page,
-                resultsPerPage: this.state.resultsPerPage
-            });
-            
-            // Simulate API call delay
-            await new Promise(resolve => setTimeout(resolve, 800));
-            
-            // Mock search results
-            const results = this.getMockSearchResults();
+            const response = await fetch(`${this.config.apiEndpoint}?${this.buildSearchParams()}`);
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            const results = this.formatSearchResults(await response.json());
             
             // Cache results
             this.cache.searchResults[cacheKey] = results;
@@ -440,109 +422,60 @@ class MPSAdvancedSearch {
         }
     }
     
-    // Get mock search results (in a real implementation, this would come from the API)
-    getMockSearchResults() {
-        // In a real implementation, this would filter based on this.state.filters
-        const totalResults = 56;
-        const totalPages = Math.ceil(totalResults / this.state.resultsPerPage);
-        
-        // Generate mock job listings
-        const jobs = [
-            {
-                id: 1,
-                title: 'Kỹ sư Điện tử',
-                company: 'ABC Electronics Vietnam',
-                location: 'Bắc Ninh',
-                salary: '20 - 25 triệu',
-                type: 'Toàn thời gian',
-                tags: ['Điện tử', 'Kỹ thuật', 'Sản xuất'],
-                logo: '/assets/company-logo-1.png',
-                posted_days_ago: 2
-            },
-            {
-                id: 2,
-                title: 'Quản lý Sản xuất',
-                company: 'XYZ Manufacturing Co., Ltd',
-                location: 'Bình Dương',
-                salary: '30 - 35 triệu',
-                type: 'Toàn thời gian',
-                tags: ['Sản xuất', 'Quản lý', 'Cấp cao'],
-                logo: '/assets/company-logo-2.png',
-                posted_days_ago: 7
-            },
-            {
-                id: 3,
-                title: 'Kỹ thuật viên Bảo trì',
-                company: 'DEF Industries Vietnam',
-                location: 'Hà Nội',
-                salary: '15 - 18 triệu',
-                type: 'Toàn thời gian',
-                tags: ['Kỹ thuật', 'Bảo trì', 'Sản xuất'],
-                logo: '/assets/company-logo-3.png',
-                posted_days_ago: 0
-            },
-            {
-                id: 4,
-                title: 'Chuyên viên Nhân sự',
-                company: 'GHI Technology Co., Ltd',
-                location: 'TP. Hồ Chí Minh',
-                salary: '18 - 22 triệu',
-                type: 'Toàn thời gian',
-                tags: ['Nhân sự', 'Tuyển dụng', 'Hành chính'],
-                logo: '/assets/company-logo-4.png',
-                posted_days_ago: 3
-            },
-            {
-                id: 5,
-                title: 'Kỹ sư Phần mềm',
-                company: 'JKL Software Vietnam',
-                location: 'Đà Nẵng',
-                salary: '25 - 30 triệu',
-                type: 'Toàn thời gian',
-                tags: ['IT', 'Phần mềm', 'Lập trình'],
-                logo: '/assets/company-logo-5.png',
-                posted_days_ago: 5
-            }
-        ];
-        
-        // Apply sorting
-        if (this.state.sortBy === 'date') {
-            jobs.sort((a, b) => a.posted_days_ago - b.posted_days_ago);
-        } else if (this.state.sortBy === 'salary-high') {
-            jobs.sort((a, b) => {
-                const aAvg = this.getAverageSalary(a.salary);
-                const bAvg = this.getAverageSalary(b.salary);
-                return bAvg - aAvg;
-            });
-        } else if (this.state.sortBy === 'salary-low') {
-            jobs.sort((a, b) => {
-                const aAvg = this.getAverageSalary(a.salary);
-                const bAvg = this.getAverageSalary(b.salary);
-                return aAvg - bAvg;
-            });
-        }
+    // Translate the filter state into /api/search query parameters
+    buildSearchParams() {
+        const { keyword, location, level, type, salary } = this.state.filters;
+        const params = new URLSearchParams({
+            sort: this.state.sortBy,
+            page: this.state.page,
+            per_page: this.state.resultsPerPage
+        });
+        
+        if (keyword) params.set('q', keyword);
+        if (location) params.set('location', location);
+        if (level) params.set('job_level', level.join(','));
+        if (type) params.set('job_type', type.map(value => JOB_TYPE_PARAMS[value]).join(','));
+        if (salary) params.set('salary', salary.map(value => SALARY_PARAMS[value]).join(','));
+        
+        return params;
+    }
+    
+    // Shape the API response for the job cards and pagination
+    formatSearchResults(data) {
+        const jobs = data.jobs.map(job => ({
+            ...job,
+            salary: this.formatSalary(job),
+            type: JOB_TYPE_LABELS[job.job_type] || job.job_type,
+            tags: [job.department, JOB_LEVEL_LABELS[job.job_level], job.remote_option ? 'Remote' : null].filter(Boolean)
+        }));
         
-        // Return paginated results
         return {
             jobs: jobs,
+            facets: data.facets,
             pagination: {
-                currentPage: this.state.page,
-                totalPages: totalPages,
-                totalResults: totalResults,
-                resultsPerPage: this.state.resultsPerPage,
-                startResult: (this.state.page - 1) * this.state.resultsPerPage + 1,
-                endResult: Math.min(this.state.page * this.state.resultsPerPage, totalResults)
+                currentPage: data.current_page,
+                totalPages: data.pages,
+                totalResults: data.total,
+                resultsPerPage: data.per_page,
+                startResult: data.total ? (data.current_page - 1) * data.per_page + 1 : 0,
+                endResult: Math.min(data.current_page * data.per_page, data.total)
             }
         };
     }
     
-    // Helper to extract average salary from salary range string
-    getAverageSalary(salaryString) {
-        const matches = salaryString.match(/(\d+)\s*-\s*(\d+)/);
-        if (matches && matches.length === 3) {
-            return (parseInt(matches[1]) + parseInt(matches[2])) / 2;
+    // Format a public salary range, in millions for VND
+    formatSalary(job) {
+        if (job.salary_min == null && job.salary_max == null) {
+            return 'Thỏa thuận';
         }
-        return 0;
+        
+        const format = job.salary_currency === 'VND'
+            ? value => `${Math.round(value / 1000000)}`
+            : value => value.toLocaleString('vi-VN');
+        const unit = job.salary_currency === 'VND' ? 'triệu' : job.salary_currency;
+        const range = [job.salary_min, job.salary_max].filter(value => value != null).map(format);
+        
+        return `${range.join(' - ')} ${unit}`;
     }
     
     // Show loading state
@@ -691,7 +624,7 @@ class MPSAdvancedSearch {
                     </div>
                 </div>
                 <div class="col-md-3">
-                    <img src="${job.logo}" alt="${job.company}" class="img-fluid mb-3">
+                    ${job.logo ? `<img src="${job.logo}" alt="${job.company}" class="img-fluid mb-3">` : ''}
                     <p class="text-muted small mb-0">${postedTime}</p>
                 </div>
             </div>
@@ -0,0 +1,40 @@
+from src.models.user import db
+
+
+def enum_counts(model, enums, *criteria, aggregates=None):
+    """Count rows per enum value for one or more columns in a single table scan.
+
+    ``enums`` maps a result key to a ``(column, EnumClass)`` pair and
+    ``aggregates`` maps a result key to any extra SQL aggregate that should
+    ride along in the same SELECT. Enum values without rows are zero-filled.
+    """
+    aggregates = aggregates or {}
+
+    columns = [db.func.count(model.id).label('total')]
+    for key, (column, enum_class) in enums.items():
+        for member in enum_class:
+            columns.append(
+                db.func.sum(db.case((column == member, 1), else_=0)).label(f'{key}__{member.name}')
+            )
+    for key, expression in aggregates.items():
+        columns.append(expression.label(key))
+
+    row = db.session.query(*columns).select_from(model).filter(*criteria).one()._mapping
+
+    result = {'total': row['total'] or 0}
+    for key, (column, enum_class) in enums.items():
+        result[key] = {member.value: row[f'{key}__{member.name}'] or 0 for member in enum_class}
+    for key in aggregates:
+        result[key] = row[key]
+
+    return result
+
+
+def group_counts(column, *criteria, limit=None):
+    """Count rows per distinct value of ``column``, skipping NULL/empty values"""
+    query = db.session.query(column, db.func.count()).filter(*criteria).group_by(column)
+
+    if limit:
+        query = query.order_by(db.func.count().desc()).limit(limit)
+
+    return {value: count for value, count in query.all() if value}
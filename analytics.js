@@ -8,7 +8,9 @@ class MPSAnalytics {
         this.config = {
             apiEndpoint: '/api/analytics',
             reportEndpoint: '/api/reports',
-            refreshInterval: 3600000, // 1 hour in milliseconds
+            streamEndpoint: '/api/analytics/stream',
+            accessToken: null, // JWT from the caller, sent as a query parameter since EventSource cannot set headers; without it the dashboard polls
+            refreshInterval: 3600000, // 1 hour in milliseconds, polling fallback when the stream is unavailable
             ...options
         };
         
@@ -18,6 +20,7 @@ class MPSAnalytics {
             currentReport: null,
             dateRange: 'month', // 'week', 'month', 'quarter', 'year'
             isLoading: false,
+            liveData: null,
             charts: {}
         };
         
@@ -63,12 +66,80 @@ class MPSAnalytics {
         // Initial load of dashboard data
         this.loadDashboardData();
         
-        // Set up periodic refresh
-        setInterval(() => {
+        // Receive dashboard updates pushed by the server
+        this.subscribeToUpdates();
+    }
+    
+    // Subscribe to the dashboard stream, falling back to periodic refresh
+    subscribeToUpdates() {
+        if (!window.EventSource || !this.config.accessToken) {
+            this.startPolling();
+            return;
+        }
+        
+        const url = `${this.config.streamEndpoint}?access_token=${encodeURIComponent(this.config.accessToken)}`;
+        
+        // EventSource reconnects by itself and the server answers with a fresh snapshot
+        this.eventSource = new EventSource(url);
+        
+        this.eventSource.addEventListener('snapshot', (e) => {
+            this.state.liveData = JSON.parse(e.data);
+            this.applyLiveData();
+        });
+        
+        this.eventSource.addEventListener('delta', (e) => {
+            const delta = JSON.parse(e.data);
+            const liveData = this.state.liveData || {};
+            
+            Object.entries(delta).forEach(([section, value]) => {
+                const isObject = value && typeof value === 'object' && !Array.isArray(value);
+                liveData[section] = isObject ? { ...(liveData[section] || {}), ...value } : value;
+            });
+            
+            this.state.liveData = liveData;
+            this.applyLiveData();
+        });
+        
+        this.eventSource.onerror = () => {
+            // Network drops reconnect by themselves; an error status (expired
+            // token, server at its stream limit) closes the stream for good
+            if (this.eventSource.readyState === EventSource.CLOSED) {
+                console.warn('Dashboard stream closed, polling instead');
+                this.eventSource = null;
+                this.startPolling();
+            } else {
+                console.warn('Dashboard stream interrupted, reconnecting');
+            }
+        };
+    }
+    
+    // Periodic refresh for browsers or servers without the stream
+    startPolling() {
+        if (this.pollTimer) return;
+        this.pollTimer = setInterval(() => {
             this.loadDashboardData(true);
         }, this.config.refreshInterval);
     }
     
+    // Show the pushed numbers in the summary metrics
+    applyLiveData() {
+        const live = this.state.liveData;
+        if (!live || !live.summary) return;
+        
+        // Cached ranges are stale now
+        this.cache.dashboardData = {};
+        
+        if (!this.state.dashboardData) return;
+        
+        Object.assign(this.state.dashboardData.summary, {
+            newApplications: live.recent_activity.new_applications_week,
+            activeJobs: live.summary.active_jobs,
+            placementRate: live.hiring_metrics.hire_rate,
+            averageTimeToHire: live.hiring_metrics.avg_time_to_hire
+        });
+        this.updateSummaryMetrics();
+    }
+    
     // Handle date range change
     handleDateRangeChange(range) {
         this.state.dateRange = range;
@@ -947,6 +1018,8 @@ class MPSAnalytics {
 
 // Initialize analytics when DOM is loaded
 document.addEventListener('DOMContentLoaded', () => {
+    // Pages that hold the user's token create their own instance with
+    // { accessToken } to receive the stream; this default one polls
     const analyticsInstance = new MPSAnalytics();
     
     // Make instance available globally for debugging
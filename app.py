@@ -1,5 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, Float
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, Float, Index
 from sqlalchemy.orm import relationship
 import enum
 import datetime
@@ -16,8 +16,62 @@ class ApplicationStatus(enum.Enum):
     REJECTED = "rejected"
     WITHDRAWN = "withdrawn"
 
+# Candidate status that follows from each application status
+CANDIDATE_STATUSES = {status: CandidateStatus[status.name] for status in ApplicationStatus}
+
+# Stage timestamp set the first time an application reaches each status
+STAGE_TIMESTAMPS = {
+    ApplicationStatus.SCREENING: 'screened_at',
+    ApplicationStatus.INTERVIEW: 'interviewed_at',
+    ApplicationStatus.SHORTLISTED: 'shortlisted_at',
+    ApplicationStatus.CLIENT_REVIEW: 'client_reviewed_at',
+    ApplicationStatus.HIRED: 'hired_at',
+    ApplicationStatus.REJECTED: 'rejected_at',
+    ApplicationStatus.WITHDRAWN: 'withdrawn_at',
+}
+
+# Metric filled in with a stage timestamp: (metric, timestamp it is measured from)
+STAGE_METRICS = {
+    ApplicationStatus.SCREENING: ('time_to_screen', 'applied_at'),
+    ApplicationStatus.INTERVIEW: ('time_to_interview', 'screened_at'),
+    ApplicationStatus.HIRED: ('time_to_decision', 'interviewed_at'),
+    ApplicationStatus.REJECTED: ('time_to_decision', 'interviewed_at'),
+}
+
+
+def stage_transition(application, new_status, now):
+    """Return the column values that moving ``application`` to ``new_status`` at ``now`` sets.
+
+    ``application`` may be a model instance or any row with the timestamp columns.
+    """
+    values = {'status': new_status}
+    column = STAGE_TIMESTAMPS.get(new_status)
+    if column is None or getattr(application, column):
+        return values
+
+    values[column] = now
+    if new_status in STAGE_METRICS:
+        metric, since = STAGE_METRICS[new_status]
+        started_at = getattr(application, since)
+        if started_at:
+            values[metric] = int((now - started_at).total_seconds() / 3600)  # Hours
+    return values
+
 class Application(db.Model):
     __tablename__ = 'applications'
+    __table_args__ = (
+        Index('uq_applications_job_position_candidate', 'job_position_id', 'candidate_id', unique=True),
+        Index('ix_applications_candidate_id', 'candidate_id'),
+        Index('ix_applications_status_created_at', 'status', 'created_at'),
+        Index('ix_applications_created_at', 'created_at'),
+        # Funnel and time-to-hire range filters, one per stage timestamp
+        Index('ix_applications_applied_at', 'applied_at'),
+        Index('ix_applications_screened_at', 'screened_at'),
+        Index('ix_applications_interviewed_at', 'interviewed_at'),
+        Index('ix_applications_shortlisted_at', 'shortlisted_at'),
+        Index('ix_applications_client_reviewed_at', 'client_reviewed_at'),
+        Index('ix_applications_hired_at', 'hired_at'),
+    )
     
     id = Column(Integer, primary_key=True)
     candidate_id = Column(Integer, ForeignKey('candidates.id'), nullable=False)
@@ -68,19 +122,4 @@ class Application(db.Model):
     
     def update_candidate_status(self):
         """Update the candidate status based on application status"""
-        if self.status == ApplicationStatus.NEW:
-            self.candidate.status = CandidateStatus.NEW
-        elif self.status == ApplicationStatus.SCREENING:
-            self.candidate.status = CandidateStatus.SCREENING
-        elif self.status == ApplicationStatus.INTERVIEW:
-            self.candidate.status = CandidateStatus.INTERVIEW
-        elif self.status == ApplicationStatus.SHORTLISTED:
-            self.candidate.status = CandidateStatus.SHORTLISTED
-        elif self.status == ApplicationStatus.CLIENT_REVIEW:
-            self.candidate.status = CandidateStatus.CLIENT_REVIEW
-        elif self.status == ApplicationStatus.HIRED:
-            self.candidate.status = CandidateStatus.HIRED
-        elif self.status == ApplicationStatus.REJECTED:
-            self.candidate.status = CandidateStatus.REJECTED
-        elif self.status == ApplicationStatus.WITHDRAWN:
-            self.candidate.status = CandidateStatus.WITHDRAWN
+        self.candidate.status = CANDIDATE_STATUSES[self.status]
@@ -0,0 +1,24 @@
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Enum, Index
+from .user import db
+from .application import ApplicationStatus
+
+class ApplicationStageEvent(db.Model):
+    __tablename__ = 'application_stage_events'
+    __table_args__ = (
+        # Time-range scans, per-stage scans and "next event of this application" lookups
+        Index('ix_application_stage_events_at', 'at'),
+        Index('ix_application_stage_events_to_status_at', 'to_status', 'at'),
+        Index('ix_application_stage_events_application_id_at', 'application_id', 'at'),
+    )
+
+    # Append-only history of status changes, from_status is NULL for the creation
+    id = Column(Integer, primary_key=True)
+    application_id = Column(Integer, ForeignKey('applications.id', ondelete='CASCADE'), nullable=False)
+    from_status = Column(Enum(ApplicationStatus), nullable=True)
+    to_status = Column(Enum(ApplicationStatus), nullable=False)
+    at = Column(DateTime, nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=True)
+
+    def __repr__(self):
+        return f"<ApplicationStageEvent {self.application_id} - {self.to_status.value}>"
@@ -2,15 +2,24 @@ from flask import Blueprint, request, jsonify
 from src.models.user import db, User, UserRole
 from src.models.candidate import Candidate, CandidateStatus
 from src.models.job_position import JobPosition
-from src.models.application import Application, ApplicationStatus
-from src.models.activity import Activity, ActivityType
+from src.models.application import Application, ApplicationStatus, stage_transition
+from src.models.activity import ActivityType
 from src.routes.auth import token_required, role_required
+from src.services.read_routing import read_replica
+from src.services.pagination import paginate, InvalidCursor
+from src.services.loading import with_profile
+from src.services.aggregates import enum_counts
+from src.services.activity_log import log_activity
+from src.services.stage_events import backfill_stage_events
+from src.services.bulk_applications import transition_applications, create_applications, MAX_BULK_ITEMS
 from datetime import datetime
+import click
 
 applications_bp = Blueprint('applications', __name__)
 
 @applications_bp.route('/', methods=['GET'])
 @token_required
+@read_replica
 def get_applications(current_user):
     # Get query parameters for filtering
     status = request.args.get('status')
@@ -21,7 +30,7 @@ def get_applications(current_user):
     per_page = request.args.get('per_page', 20, type=int)
     
     # Base query
-    query = Application.query
+    query = with_profile(Application.query, 'applications.list')
     
     # Apply filters
     if status:
@@ -40,8 +49,11 @@ def get_applications(current_user):
     if recruiter_id:
         query = query.filter_by(recruiter_id=recruiter_id)
     
-    # Pagination
-    applications_pagination = query.order_by(Application.created_at.desc()).paginate(page=page, per_page=per_page)
+    # Pagination (by page number, or by keyset when cursor= is given)
+    try:
+        applications_pagination = paginate(query, Application.created_at, Application.id, page=page, per_page=per_page)
+    except InvalidCursor:
+        return jsonify({'message': 'Invalid cursor value'}), 400
     
     # Format response
     applications_list = []
@@ -63,15 +75,13 @@ def get_applications(current_user):
     
     return jsonify({
         'applications': applications_list,
-        'total': applications_pagination.total,
-        'pages': applications_pagination.pages,
-        'current_page': applications_pagination.page
+        **applications_pagination.meta
     })
 
 @applications_bp.route('/<int:application_id>', methods=['GET'])
 @token_required
 def get_application(current_user, application_id):
-    application = Application.query.get_or_404(application_id)
+    application = with_profile(Application.query, 'applications.detail').get_or_404(application_id)
     
     # Format response with all details
     application_data = {
@@ -165,15 +175,14 @@ def create_application(current_user):
     candidate.status = CandidateStatus.NEW
     
     # Log activity
-    activity = Activity(
+    log_activity(
         user_id=current_user.id,
         candidate_id=data['candidate_id'],
         job_position_id=data['job_position_id'],
-        application_id=new_application.id,
+        application_id=new_application,
         activity_type=ActivityType.SYSTEM_ACTION,
         description=f"Application created for {candidate.full_name} to {job_position.title}"
     )
-    db.session.add(activity)
     
     db.session.commit()
     
@@ -182,6 +191,72 @@ def create_application(current_user):
         'application_id': new_application.id
     }), 201
 
+@applications_bp.route('/bulk', methods=['POST'])
+@token_required
+@role_required([UserRole.ADMIN, UserRole.MANAGER, UserRole.RECRUITER])
+def bulk_create_applications(current_user):
+    data = request.get_json()
+    items = data.get('applications')
+    
+    if not data.get('job_position_id') or not isinstance(items, list) or not items:
+        return jsonify({'message': 'Job Position ID and a list of applications are required!'}), 400
+    
+    if len(items) > MAX_BULK_ITEMS:
+        return jsonify({'message': f'At most {MAX_BULK_ITEMS} applications per request!'}), 400
+    
+    if not all(isinstance(item, dict) and isinstance(item.get('candidate_id'), int) for item in items):
+        return jsonify({'message': 'Every application needs a numeric candidate_id!'}), 400
+    
+    try:
+        status = ApplicationStatus(data.get('status', ApplicationStatus.NEW.value))
+    except ValueError:
+        return jsonify({'message': 'Invalid status value!'}), 400
+    
+    job_position = db.session.get(JobPosition, data['job_position_id'])
+    if not job_position:
+        return jsonify({'message': 'Job position not found!'}), 404
+    
+    results = create_applications(current_user.id, job_position, items, status)
+    db.session.commit()
+    
+    created = sum(1 for result in results if result['result'] == 'created')
+    return jsonify({
+        'message': f'{created} applications created!',
+        'created': created,
+        'results': results
+    })
+
+@applications_bp.route('/bulk/status', methods=['PUT'])
+@token_required
+@role_required([UserRole.ADMIN, UserRole.MANAGER, UserRole.RECRUITER])
+def bulk_update_application_status(current_user):
+    data = request.get_json()
+    application_ids = data.get('application_ids')
+    
+    if not isinstance(application_ids, list) or not application_ids or not data.get('status'):
+        return jsonify({'message': 'A list of application IDs and a status are required!'}), 400
+    
+    if len(application_ids) > MAX_BULK_ITEMS:
+        return jsonify({'message': f'At most {MAX_BULK_ITEMS} applications per request!'}), 400
+    
+    if not all(isinstance(application_id, int) for application_id in application_ids):
+        return jsonify({'message': 'Application IDs must be numbers!'}), 400
+    
+    try:
+        new_status = ApplicationStatus(data['status'])
+    except ValueError:
+        return jsonify({'message': 'Invalid status value!'}), 400
+    
+    results = transition_applications(current_user.id, application_ids, new_status)
+    db.session.commit()
+    
+    updated = sum(1 for result in results if result['result'] == 'updated')
+    return jsonify({
+        'message': f'{updated} applications updated!',
+        'updated': updated,
+        'results': results
+    })
+
 @applications_bp.route('/<int:application_id>', methods=['PUT'])
 @token_required
 def update_application(current_user, application_id):
@@ -220,48 +295,16 @@ def update_application(current_user, application_id):
         try:
             new_status = ApplicationStatus(data['status'])
             
-            # Update status-specific timestamps
-            if new_status == ApplicationStatus.SCREENING and not application.screened_at:
-                application.screened_at = datetime.utcnow()
-                if application.applied_at:
-                    time_diff = application.screened_at - application.applied_at
-                    application.time_to_screen = int(time_diff.total_seconds() / 3600)  # Hours
-            
-            elif new_status == ApplicationStatus.INTERVIEW and not application.interviewed_at:
-                application.interviewed_at = datetime.utcnow()
-                if application.screened_at:
-                    time_diff = application.interviewed_at - application.screened_at
-                    application.time_to_interview = int(time_diff.total_seconds() / 3600)  # Hours
-            
-            elif new_status == ApplicationStatus.SHORTLISTED and not application.shortlisted_at:
-                application.shortlisted_at = datetime.utcnow()
-            
-            elif new_status == ApplicationStatus.CLIENT_REVIEW and not application.client_reviewed_at:
-                application.client_reviewed_at = datetime.utcnow()
-            
-            elif new_status == ApplicationStatus.HIRED and not application.hired_at:
-                application.hired_at = datetime.utcnow()
-                if application.interviewed_at:
-                    time_diff = application.hired_at - application.interviewed_at
-                    application.time_to_decision = int(time_diff.total_seconds() / 3600)  # Hours
-            
-            elif new_status == ApplicationStatus.REJECTED and not application.rejected_at:
-                application.rejected_at = datetime.utcnow()
-                if application.interviewed_at:
-                    time_diff = application.rejected_at - application.interviewed_at
-                    application.time_to_decision = int(time_diff.total_seconds() / 3600)  # Hours
-            
-            elif new_status == ApplicationStatus.WITHDRAWN and not application.withdrawn_at:
-                application.withdrawn_at = datetime.utcnow()
-            
-            application.status = new_status
+            # Update status-specific timestamps and metrics
+            for key, value in stage_transition(application, new_status, datetime.utcnow()).items():
+                setattr(application, key, value)
             
             # Update candidate status
             application.update_candidate_status()
             
             # Log status change
             if old_status != new_status:
-                activity = Activity(
+                log_activity(
                     user_id=current_user.id,
                     candidate_id=application.candidate_id,
                     job_position_id=application.job_position_id,
@@ -270,12 +313,11 @@ def update_application(current_user, application_id):
                     description=f"Application status changed from {old_status.value} to {new_status.value}",
                     details={"old_status": old_status.value, "new_status": new_status.value}
                 )
-                db.session.add(activity)
         except ValueError:
             return jsonify({'message': 'Invalid status value!'}), 400
     
     # Log activity
-    activity = Activity(
+    log_activity(
         user_id=current_user.id,
         candidate_id=application.candidate_id,
         job_position_id=application.job_position_id,
@@ -283,7 +325,6 @@ def update_application(current_user, application_id):
         activity_type=ActivityType.SYSTEM_ACTION,
         description=f"Application updated for {application.candidate.full_name}"
     )
-    db.session.add(activity)
     
     db.session.commit()
     
@@ -296,14 +337,13 @@ def delete_application(current_user, application_id):
     application = Application.query.get_or_404(application_id)
     
     # Log activity before deletion
-    activity = Activity(
+    log_activity(
         user_id=current_user.id,
         candidate_id=application.candidate_id,
         job_position_id=application.job_position_id,
         activity_type=ActivityType.SYSTEM_ACTION,
         description=f"Application deleted for {application.candidate.full_name} to {application.job_position.title}"
     )
-    db.session.add(activity)
     
     # Update job position applications count
     job_position = application.job_position
@@ -317,30 +357,37 @@ def delete_application(current_user, application_id):
 
 @applications_bp.route('/statistics', methods=['GET'])
 @token_required
+@read_replica
 def get_application_statistics(current_user):
-    # Count applications by status
-    status_counts = {}
-    for status in ApplicationStatus:
-        count = Application.query.filter_by(status=status).count()
-        status_counts[status.value] = count
+    # Count applications by status, with time and stage metrics, in one scan
+    counts = enum_counts(Application, {
+        'status_distribution': (Application.status, ApplicationStatus)
+    }, aggregates={
+        'avg_time_to_screen': db.func.avg(Application.time_to_screen),
+        'avg_time_to_interview': db.func.avg(Application.time_to_interview),
+        'avg_time_to_decision': db.func.avg(Application.time_to_decision),
+        'screened_count': db.func.count(Application.screened_at),
+        'interviewed_count': db.func.count(Application.interviewed_at),
+        'hired_count': db.func.count(Application.hired_at)
+    })
     
     # Calculate average times
-    avg_time_to_screen = db.session.query(db.func.avg(Application.time_to_screen)).scalar() or 0
-    avg_time_to_interview = db.session.query(db.func.avg(Application.time_to_interview)).scalar() or 0
-    avg_time_to_decision = db.session.query(db.func.avg(Application.time_to_decision)).scalar() or 0
+    avg_time_to_screen = counts['avg_time_to_screen'] or 0
+    avg_time_to_interview = counts['avg_time_to_interview'] or 0
+    avg_time_to_decision = counts['avg_time_to_decision'] or 0
     
     # Calculate conversion rates
-    total_applications = Application.query.count()
-    screened_count = Application.query.filter(Application.screened_at.isnot(None)).count()
-    interviewed_count = Application.query.filter(Application.interviewed_at.isnot(None)).count()
-    hired_count = Application.query.filter(Application.hired_at.isnot(None)).count()
+    total_applications = counts['total']
+    screened_count = counts['screened_count']
+    interviewed_count = counts['interviewed_count']
+    hired_count = counts['hired_count']
     
     screen_rate = (screened_count / total_applications) * 100 if total_applications > 0 else 0
     interview_rate = (interviewed_count / screened_count) * 100 if screened_count > 0 else 0
     hire_rate = (hired_count / interviewed_count) * 100 if interviewed_count > 0 else 0
     
     # Recent applications
-    recent_applications = Application.query.order_by(Application.created_at.desc()).limit(5).all()
+    recent_applications = with_profile(Application.query, 'applications.list').order_by(Application.created_at.desc()).limit(5).all()
     recent_data = [{
         'id': a.id,
         'candidate_name': a.candidate.full_name,
@@ -351,7 +398,7 @@ def get_application_statistics(current_user):
     
     return jsonify({
         'total_applications': total_applications,
-        'status_distribution': status_counts,
+        'status_distribution': counts['status_distribution'],
         'time_metrics': {
             'avg_time_to_screen': round(avg_time_to_screen, 1),  # Hours
             'avg_time_to_interview': round(avg_time_to_interview, 1),  # Hours
@@ -364,3 +411,10 @@ def get_application_statistics(current_user):
         },
         'recent_applications': recent_data
     })
+
+@applications_bp.cli.command('backfill-stage-events')
+def backfill_stage_events_command():
+    """Write the stage history missing from before stage events were recorded, from stage timestamps"""
+    applications, events = backfill_stage_events(db.session.connection())
+    db.session.commit()
+    click.echo(f"Backfilled {events} stage events for {applications} applications")
@@ -1,15 +1,44 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, g
 from werkzeug.security import generate_password_hash, check_password_hash
 import jwt
 from datetime import datetime, timedelta
 from functools import wraps
 import sys
 import os
+import time
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from src.models.user import db, User, UserRole
+from src.services.auth_cache import auth_cache
 
 auth_bp = Blueprint('auth', __name__)
 
+def authenticate(token):
+    """Return ``(principal, None)`` for a valid token, else ``(None, error response)``"""
+    if not token:
+        return None, (jsonify({'message': 'Token is missing!'}), 401)
+    
+    # Decoded tokens and principals are cached, so this is usually SQL-free
+    data = auth_cache.tokens.get(token)
+    if data is None:
+        try:
+            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=["HS256"])
+        except:
+            return None, (jsonify({'message': 'Token is invalid!'}), 401)
+        # Never serve a token from the cache past its expiry
+        expires_in = data['exp'] - time.time() if 'exp' in data else None
+        auth_cache.tokens.set(token, data, ttl=expires_in)
+    
+    current_user = auth_cache.principal(data.get('user_id'))
+    if current_user is None:
+        return None, (jsonify({'message': 'Token is invalid!'}), 401)
+    
+    if not current_user.is_active:
+        return None, (jsonify({'message': 'Account is deactivated!'}), 403)
+    
+    g.current_user = current_user
+    g.token_expires_at = data.get('exp')
+    return current_user, None
+
 # Authentication decorator
 def token_required(f):
     @wraps(f)
@@ -21,15 +50,10 @@ def token_required(f):
             if auth_header.startswith('Bearer '):
                 token = auth_header.split(' ')[1]
         
-        if not token:
-            return jsonify({'message': 'Token is missing!'}), 401
+        current_user, error = authenticate(token)
+        if error:
+            return error
         
-        try:
-            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=["HS256"])
-            current_user = User.query.filter_by(id=data['user_id']).first()
-        except:
-            return jsonify({'message': 'Token is invalid!'}), 401
-            
         return f(current_user, *args, **kwargs)
     
     return decorated
@@ -116,6 +140,8 @@ def login():
 @auth_bp.route('/profile', methods=['GET'])
 @token_required
 def get_profile(current_user):
+    current_user = User.query.get_or_404(current_user.id)
+    
     return jsonify({
         'id': current_user.id,
         'username': current_user.username,
@@ -129,6 +155,7 @@ def get_profile(current_user):
 @auth_bp.route('/profile', methods=['PUT'])
 @token_required
 def update_profile(current_user):
+    current_user = User.query.get_or_404(current_user.id)
     data = request.get_json()
     
     if 'full_name' in data:
@@ -144,6 +171,13 @@ def update_profile(current_user):
     
     return jsonify({'message': 'Profile updated successfully!'})
 
+@auth_bp.route('/cache-stats', methods=['GET'])
+@token_required
+@role_required([UserRole.ADMIN])
+def get_cache_stats(current_user):
+    """Hit/miss counters of this process's authentication cache"""
+    return jsonify(auth_cache.stats())
+
 @auth_bp.route('/users', methods=['GET'])
 @token_required
 @role_required([UserRole.ADMIN])
@@ -0,0 +1,161 @@
+from sqlalchemy import event
+from src.models.user import db, User
+from collections import OrderedDict, namedtuple
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+# What token_required hands to views instead of a User row. Views that need
+# more (the profile endpoints) load the row themselves.
+Principal = namedtuple('Principal', ('id', 'role', 'is_active', 'full_name'))
+
+
+class TTLCache:
+    """A thread-safe LRU cache whose entries also expire after ``ttl`` seconds"""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None
+            }
+
+
+class AuthCache:
+    """Decoded tokens and user principals, so most requests authenticate without SQL.
+
+    Committed user changes bump the user's generation, a small file in
+    ``AUTH_CACHE_DIR``, shared by every process of this instance and private
+    to its user (under the instance folder by default). Each hit compares the
+    cached principal's generation with the file, so a deactivated or demoted user
+    loses access in every gunicorn worker at once. Without a directory each
+    process only sees its own changes and others keep a principal for up to
+    ``AUTH_CACHE_TTL`` seconds.
+    """
+
+    def __init__(self):
+        self.tokens = TTLCache(1024, 60)
+        self.principals = TTLCache(1024, 60)
+        self.directory = None
+
+    def init_app(self, app):
+        app.config.setdefault('AUTH_CACHE_SIZE', 1024)
+        app.config.setdefault('AUTH_CACHE_TTL', 60)
+        app.config.setdefault('AUTH_CACHE_DIR', os.path.join(app.instance_path, 'mps-auth-cache'))
+
+        size, ttl = app.config['AUTH_CACHE_SIZE'], app.config['AUTH_CACHE_TTL']
+        self.tokens = TTLCache(size, ttl)
+        self.principals = TTLCache(size, ttl)
+        self.directory = app.config['AUTH_CACHE_DIR']
+        if self.directory:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+
+    def principal(self, user_id):
+        if user_id is None:
+            return None
+        generation = self.generation(user_id)
+        entry = self.principals.get(user_id)
+        if entry is not None and entry[1] == generation:
+            return entry[0]
+
+        # Stored with the generation read before the query, so a change
+        # committed meanwhile makes the next hit reload
+        row = db.session.query(
+            User.id, User.role, User.is_active, User.full_name
+        ).filter(User.id == user_id).first()
+        if row is None:
+            return None
+        principal = Principal(*row)
+        self.principals.set(user_id, (principal, generation))
+        return principal
+
+    def generation(self, user_id):
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(user_id)) as entry:
+                return entry.read()
+        except OSError:
+            return None
+
+    def invalidate_user(self, user_id):
+        self.principals.invalidate(user_id)
+        if self.directory:
+            # Renamed into place, so readers never see a partial generation
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as entry:
+                entry.write(uuid.uuid4().hex)
+            os.replace(temp_path, self._path(user_id))
+
+    def _path(self, user_id):
+        return os.path.join(self.directory, f'user-{int(user_id)}')
+
+    def stats(self):
+        return {'tokens': self.tokens.stats(), 'principals': self.principals.stats()}
+
+
+auth_cache = AuthCache()
+
+_PENDING_KEY = 'changed_user_ids'
+
+
+@event.listens_for(db.session, 'after_flush')
+def collect_changed_users(session, flush_context):
+    changed = session.info.setdefault(_PENDING_KEY, set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            changed.add(obj.id)
+
+
+@event.listens_for(db.session, 'after_commit')
+def invalidate_changed_users(session):
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        auth_cache.invalidate_user(user_id)
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def discard_changed_users(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,194 @@
+"""Benchmark the hot list/filter queries with and without the model indexes.
+
+Seeds a throwaway SQLite database (about 1M rows in total at the default
+scale), then prints the EXPLAIN QUERY PLAN and median latency of each query
+before and after the indexes declared on the models are created.
+
+    python benchmark_indexes.py [--scale 1.0] [--repeat 5] [--keep path.db]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))  # Same layout as main.py
+
+from flask import Flask
+from sqlalchemy import text
+
+from src.models.user import db, User, UserRole
+from src.models.client import Client
+from src.models.candidate import Candidate, CandidateStatus
+from src.models.job_position import JobPosition, JobStatus
+from src.models.application import Application, ApplicationStatus
+from src.models.interview import Interview, InterviewStatus
+from src.models.activity import Activity, ActivityType
+
+# Row counts at scale 1.0 (about 1M rows overall)
+ROW_COUNTS = {
+    'users': 50,
+    'clients': 500,
+    'job_positions': 5000,
+    'candidates': 200000,
+    'applications': 300000,
+    'interviews': 100000,
+    'activities': 400000,
+}
+
+CHUNK_SIZE = 20000
+NOW = datetime(2026, 1, 1)
+
+QUERIES = [
+    ('candidates by status, newest first',
+     "SELECT * FROM candidates WHERE status = 'SCREENING' ORDER BY created_at DESC LIMIT 20", {}),
+    ('candidate email duplicate check',
+     "SELECT * FROM candidates WHERE email = :email LIMIT 1", {'email': 'candidate123456@example.com'}),
+    ('applications by status, newest first',
+     "SELECT * FROM applications WHERE status = 'INTERVIEW' ORDER BY created_at DESC LIMIT 20", {}),
+    ('application duplicate check',
+     "SELECT * FROM applications WHERE candidate_id = :candidate_id AND job_position_id = :job_id LIMIT 1",
+     {'candidate_id': 4242, 'job_id': 42}),
+    ('funnel: hired in last 90 days',
+     "SELECT count(*) FROM applications WHERE hired_at >= :since AND hired_at <= :until",
+     {'since': NOW - timedelta(days=90), 'until': NOW}),
+    ('activities for one candidate',
+     "SELECT * FROM activities WHERE candidate_id = :candidate_id ORDER BY created_at DESC LIMIT 50",
+     {'candidate_id': 4242}),
+    ('activity statistics window count',
+     "SELECT count(*) FROM activities WHERE created_at >= :since", {'since': NOW - timedelta(days=30)}),
+    ('interview calendar week',
+     "SELECT * FROM interviews WHERE scheduled_at >= :since AND scheduled_at <= :until ORDER BY scheduled_at",
+     {'since': NOW, 'until': NOW + timedelta(days=7)}),
+    ('open jobs, newest first',
+     "SELECT * FROM job_positions WHERE status = 'OPEN' ORDER BY created_at DESC LIMIT 20", {}),
+]
+
+BENCHMARK_TABLES = [Candidate, Application, Interview, Activity, JobPosition]
+
+
+def random_time(days):
+    return NOW - timedelta(seconds=random.randint(0, days * 86400))
+
+
+def insert_rows(table, count, make_row):
+    for start in range(0, count, CHUNK_SIZE):
+        rows = [make_row(i) for i in range(start, min(start + CHUNK_SIZE, count))]
+        db.session.execute(table.insert(), rows)
+    db.session.commit()
+
+
+def seed(counts):
+    insert_rows(User.__table__, counts['users'], lambda i: {
+        'username': f'user{i}', 'email': f'user{i}@example.com', 'password_hash': '-',
+        'full_name': f'User {i}', 'role': UserRole.RECRUITER, 'is_active': True,
+        'created_at': NOW, 'updated_at': NOW
+    })
+    insert_rows(Client.__table__, counts['clients'], lambda i: {
+        'company_name': f'Client {i}', 'created_at': NOW, 'updated_at': NOW
+    })
+    insert_rows(JobPosition.__table__, counts['job_positions'], lambda i: {
+        'client_id': random.randint(1, counts['clients']), 'title': f'Job {i}', 'description': '-',
+        'status': random.choice(list(JobStatus)), 'created_at': random_time(720), 'updated_at': NOW
+    })
+    insert_rows(Candidate.__table__, counts['candidates'], lambda i: {
+        'full_name': f'Candidate {i}', 'email': f'candidate{i}@example.com',
+        'status': random.choice(list(CandidateStatus)), 'created_at': random_time(720), 'updated_at': NOW
+    })
+
+    seen_pairs = set()
+
+    def application_row(i):
+        while True:
+            pair = (random.randint(1, counts['candidates']), random.randint(1, counts['job_positions']))
+            if pair not in seen_pairs:
+                seen_pairs.add(pair)
+                break
+        applied_at = random_time(720)
+        status = random.choice(list(ApplicationStatus))
+        return {
+            'candidate_id': pair[0], 'job_position_id': pair[1], 'status': status,
+            'applied_at': applied_at, 'created_at': applied_at, 'updated_at': NOW,
+            'screened_at': applied_at + timedelta(days=2) if status != ApplicationStatus.NEW else None,
+            'hired_at': applied_at + timedelta(days=30) if status == ApplicationStatus.HIRED else None,
+        }
+
+    insert_rows(Application.__table__, counts['applications'], application_row)
+    insert_rows(Interview.__table__, counts['interviews'], lambda i: {
+        'application_id': random.randint(1, counts['applications']),
+        'candidate_id': random.randint(1, counts['candidates']),
+        'status': random.choice(list(InterviewStatus)),
+        'scheduled_at': NOW + timedelta(seconds=random.randint(-360 * 86400, 30 * 86400)),
+        'created_at': NOW, 'updated_at': NOW
+    })
+    insert_rows(Activity.__table__, counts['activities'], lambda i: {
+        'user_id': random.randint(1, counts['users']),
+        'candidate_id': random.randint(1, counts['candidates']),
+        'activity_type': random.choice(list(ActivityType)), 'description': '-',
+        'created_at': random_time(720)
+    })
+
+
+def model_indexes():
+    return [index for model in BENCHMARK_TABLES for index in model.__table__.indexes]
+
+
+def measure(repeat):
+    results = {}
+    for label, sql, params in QUERIES:
+        plan = db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}'), params).all()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            db.session.execute(text(sql), params).all()
+            timings.append((time.perf_counter() - started) * 1000)
+        results[label] = (' | '.join(row[-1] for row in plan), statistics.median(timings))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplier for the seeded row counts')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per query, the median is reported')
+    parser.add_argument('--keep', help='write the seeded database here instead of a temp file')
+    args = parser.parse_args()
+
+    random.seed(42)
+    path = args.keep or os.path.join(tempfile.mkdtemp(), 'benchmark.db')
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        for index in model_indexes():
+            index.drop(db.engine)
+
+        counts = {table: max(1, int(count * args.scale)) for table, count in ROW_COUNTS.items()}
+        started = time.perf_counter()
+        seed(counts)
+        print(f"Seeded {sum(counts.values()):,} rows into {path} in {time.perf_counter() - started:.1f}s")
+
+        db.session.execute(text('ANALYZE'))
+        before = measure(args.repeat)
+
+        started = time.perf_counter()
+        for index in model_indexes():
+            index.create(db.engine)
+        db.session.execute(text('ANALYZE'))
+        print(f"Created {len(model_indexes())} indexes in {time.perf_counter() - started:.1f}s\n")
+        after = measure(args.repeat)
+
+    for label, _, _ in QUERIES:
+        (plan_before, ms_before), (plan_after, ms_after) = before[label], after[label]
+        print(label)
+        print(f"  before {ms_before:9.2f} ms  {plan_before}")
+        print(f"  after  {ms_after:9.2f} ms  {plan_after}")
+
+
+if __name__ == '__main__':
+    main()
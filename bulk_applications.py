@@ -0,0 +1,203 @@
+from sqlalchemy import select, update, insert, bindparam
+from src.models.user import db
+from src.models.candidate import Candidate
+from src.models.job_position import JobPosition
+from src.models.application import Application, ApplicationStatus, CANDIDATE_STATUSES, STAGE_TIMESTAMPS, stage_transition
+from src.models.activity import ActivityType
+from src.services.activity_log import log_activity
+from src.services.dashboard import adjust_dashboard_counters, counter_deltas
+from src.services.stage_events import record_stage_events
+from src.services.quality_score import queue_quality_scores
+from datetime import datetime
+
+MAX_BULK_ITEMS = 500
+
+# Columns a status transition reads, besides the stage timestamps
+TRANSITION_COLUMNS = (Application.id, Application.status, Application.candidate_id, Application.job_position_id, Application.applied_at)
+
+
+def _update_candidate_statuses(candidates, status):
+    """Set ``status`` on the candidates given as ``{id: current status}``, returning their dashboard deltas"""
+    changed = [candidate_id for candidate_id, current in candidates.items() if current != status]
+    if not changed:
+        return {}
+
+    db.session.execute(update(Candidate).where(Candidate.id.in_(changed)).values(status=status))
+    return counter_deltas(Candidate, (({'status': candidates[candidate_id]}, {'status': status}) for candidate_id in changed))
+
+
+def transition_applications(user_id, application_ids, new_status):
+    """Move many applications to ``new_status`` within the current transaction.
+
+    One SELECT checks every id and reads the stage timestamps, then each group
+    of rows with the same changed columns is written by a single executemany
+    UPDATE, with the same timestamps and ``time_to_*`` metrics as
+    ``update_application``. Returns one result per distinct id, in order.
+    """
+    now = datetime.utcnow()
+    application_ids = list(dict.fromkeys(application_ids))
+    rows = {row.id: row for row in db.session.execute(
+        select(*TRANSITION_COLUMNS, *[getattr(Application, column) for column in STAGE_TIMESTAMPS.values()],
+               Candidate.status.label('candidate_status'))
+        .join(Candidate, Application.candidate_id == Candidate.id)
+        .where(Application.id.in_(application_ids))
+    )}
+
+    results, groups, changes, candidates = [], {}, [], {}
+    for application_id in application_ids:
+        row = rows.get(application_id)
+        if row is None:
+            results.append({'application_id': application_id, 'result': 'error', 'message': 'Application not found'})
+            continue
+        if row.status == new_status:
+            results.append({'application_id': application_id, 'result': 'unchanged'})
+            continue
+
+        values = stage_transition(row, new_status, now)
+        groups.setdefault(tuple(sorted(values)), []).append(dict(values, application_id=application_id))
+        changes.append((row._mapping, dict(row._mapping, **values)))
+        candidates[row.candidate_id] = row.candidate_status
+        results.append({'application_id': application_id, 'result': 'updated'})
+
+        log_activity(
+            user_id=user_id,
+            candidate_id=row.candidate_id,
+            job_position_id=row.job_position_id,
+            application_id=application_id,
+            activity_type=ActivityType.STATUS_CHANGE,
+            description=f"Application status changed from {row.status.value} to {new_status.value}",
+            details={"old_status": row.status.value, "new_status": new_status.value}
+        )
+
+    for columns, params in groups.items():
+        db.session.execute(
+            update(Application.__table__)
+            .where(Application.__table__.c.id == bindparam('application_id'))
+            .values({column: bindparam(column) for column in columns}),
+            params
+        )
+
+    if changes:
+        record_stage_events(db.session.connection(), [
+            (row['id'], row['status'], new_status, now, user_id) for row, _ in changes
+        ])
+        queue_quality_scores(db.session, candidates)
+
+        deltas = counter_deltas(Application, changes)
+        deltas.update(_update_candidate_statuses(candidates, CANDIDATE_STATUSES[new_status]))
+        if deltas:
+            adjust_dashboard_counters(db.session.connection(), **deltas)
+
+        log_activity(
+            user_id=user_id,
+            activity_type=ActivityType.SYSTEM_ACTION,
+            description=f"Bulk status change of {len(changes)} applications to {new_status.value}",
+            details={"new_status": new_status.value, "application_ids": [row['id'] for row, _ in changes]}
+        )
+
+    return results
+
+
+def create_applications(user_id, job_position, items, status=ApplicationStatus.NEW):
+    """Create applications of many candidates to ``job_position`` within the current transaction.
+
+    ``items`` are the bodies ``create_application`` accepts, without the job,
+    and ``user_id`` (a recruiter, manager or admin) becomes their recruiter.
+    Candidates and existing applications are checked with one query each and
+    the new rows are written by a single executemany INSERT. Returns one
+    result per item, in order.
+    """
+    now = datetime.utcnow()
+    candidate_ids = [item.get('candidate_id') for item in items]
+    candidates = {row.id: row for row in db.session.execute(
+        select(Candidate.id, Candidate.full_name, Candidate.status).where(Candidate.id.in_(candidate_ids))
+    )}
+    existing = set(db.session.execute(
+        select(Application.candidate_id).where(
+            Application.job_position_id == job_position.id, Application.candidate_id.in_(candidate_ids)
+        )
+    ).scalars())
+
+    # Every new row starts with the same stage values
+    stage_values = stage_transition(Application(applied_at=now), status, now)
+
+    results, rows = [], []
+    for item in items:
+        candidate_id = item.get('candidate_id')
+        if candidate_id not in candidates:
+            results.append({'candidate_id': candidate_id, 'result': 'error', 'message': 'Candidate not found'})
+            continue
+        if candidate_id in existing:
+            results.append({'candidate_id': candidate_id, 'result': 'error', 'message': 'Application already exists'})
+            continue
+
+        availability_date = None
+        if item.get('availability_date'):
+            try:
+                availability_date = datetime.fromisoformat(item['availability_date'])
+            except (TypeError, ValueError):
+                results.append({'candidate_id': candidate_id, 'result': 'error', 'message': 'Invalid date format for availability_date'})
+                continue
+
+        existing.add(candidate_id)
+        rows.append(dict(
+            stage_values,
+            candidate_id=candidate_id,
+            job_position_id=job_position.id,
+            cover_letter=item.get('cover_letter'),
+            expected_salary=item.get('expected_salary'),
+            availability_date=availability_date,
+            recruiter_id=user_id,
+            recruiter_notes=item.get('recruiter_notes'),
+            candidate_score=item.get('candidate_score'),
+            current_stage="Applied",
+            is_active=True,
+            applied_at=now,
+            created_at=now,
+            updated_at=now
+        ))
+        results.append({'candidate_id': candidate_id, 'result': 'created'})
+
+    if not rows:
+        return results
+
+    db.session.execute(insert(Application.__table__), rows)
+    # Read the new ids back by (job, candidate): RETURNING in parameter order
+    # makes SQLite fall back to one INSERT per row
+    created = [row['candidate_id'] for row in rows]
+    ids = dict(db.session.execute(
+        select(Application.candidate_id, Application.id).where(
+            Application.job_position_id == job_position.id, Application.candidate_id.in_(created)
+        )
+    ).all())
+    for result in results:
+        if result['result'] == 'created':
+            result['application_id'] = ids[result['candidate_id']]
+
+    record_stage_events(db.session.connection(), [
+        (ids[candidate_id], None, status, now, user_id) for candidate_id in created
+    ])
+    queue_quality_scores(db.session, created)
+
+    db.session.execute(
+        update(JobPosition).where(JobPosition.id == job_position.id)
+        .values(applications_count=JobPosition.applications_count + len(rows))
+    )
+
+    deltas = counter_deltas(Application, ((None, row) for row in rows))
+    deltas.update(_update_candidate_statuses(
+        {candidate_id: candidates[candidate_id].status for candidate_id in created}, CANDIDATE_STATUSES[status]
+    ))
+    adjust_dashboard_counters(db.session.connection(), **deltas)
+
+    for candidate_id in created:
+        log_activity(
+            user_id=user_id,
+            candidate_id=candidate_id,
+            job_position_id=job_position.id,
+            application_id=ids[candidate_id],
+            activity_type=ActivityType.SYSTEM_ACTION,
+            description=f"Application created for {candidates[candidate_id].full_name} to {job_position.title}"
+        )
+
+    return results
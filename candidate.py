@@ -1,5 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, Float, Date
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, Float, Date, Index
 from sqlalchemy.orm import relationship
 import enum
 import datetime
@@ -34,6 +34,12 @@ class CandidateStatus(enum.Enum):
 
 class Candidate(db.Model):
     __tablename__ = 'candidates'
+    __table_args__ = (
+        Index('ix_candidates_status_created_at', 'status', 'created_at'),
+        Index('ix_candidates_created_at', 'created_at'),
+        Index('ix_candidates_email', 'email'),
+        Index('ix_candidates_quality_score', 'quality_score'),
+    )
     
     id = Column(Integer, primary_key=True)
     full_name = Column(String(100), nullable=False)
@@ -67,10 +73,10 @@ class Candidate(db.Model):
     # Recruitment data
     status = Column(Enum(CandidateStatus), default=CandidateStatus.NEW)
     source = Column(String(100))  # Where the candidate came from
-    notes = Column(Text)
+    notes_count = Column(Integer, nullable=False, default=0, server_default='0')  # Rows in candidate_notes
     
     # Metrics for analytics
-    quality_score = Column(Float)  # Calculated score based on various factors
+    quality_score = Column(Float)  # 0-100, computed in batches by services.quality_score
     last_contact_date = Column(DateTime)
     
     # Timestamps for data-aging analysis
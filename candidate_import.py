@@ -0,0 +1,387 @@
+from sqlalchemy import select, insert, func
+from src.models.user import db, User
+from src.models.candidate import Candidate, CandidateStatus, Gender, EducationLevel
+from src.models.candidate_note import CandidateNote
+from src.models.activity import ActivityType
+from src.services.activity_log import log_activity
+from src.services.dashboard import adjust_dashboard_counters, counter_deltas
+from src.services.search_index import CANDIDATE_SEARCH
+from src.services.quality_score import queue_quality_scores
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date
+from itertools import islice
+import csv
+import json
+import logging
+import os
+import tempfile
+import uuid
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+
+# Rows with problems listed in the job status, the counters keep counting past it
+MAX_REPORTED_ERRORS = 100
+
+FORMATS = {'.csv': 'csv', '.xlsx': 'xlsx', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+
+TEXT_COLUMNS = (
+    'full_name', 'email', 'phone', 'address', 'city', 'province', 'country', 'major', 'university',
+    'skills', 'languages', 'resume_url', 'portfolio_url', 'current_employer', 'current_position',
+    'source'
+)
+NUMBER_COLUMNS = ('years_of_experience', 'current_salary', 'expected_salary')
+
+# Enum columns, looked up by value as in create_candidate
+ENUM_COLUMNS = {
+    'gender': {member.value: member for member in Gender},
+    'education_level': {member.value: member for member in EducationLevel},
+    'status': {member.value: member for member in CandidateStatus},
+}
+
+
+class InvalidImport(ValueError):
+    pass
+
+
+def file_format(filename, requested=None):
+    """Resolve the format of an upload from an explicit ``format`` or the file extension"""
+    fmt = requested or FORMATS.get(os.path.splitext(filename or '')[1].lower())
+    if fmt not in FORMATS.values():
+        raise InvalidImport('Unsupported file format, expected csv, xlsx or jsonl!')
+    return fmt
+
+
+def _header(name):
+    return str(name or '').strip().lower().replace(' ', '_')
+
+
+def read_rows(path, fmt):
+    """Yield ``(row_number, values)`` pairs from a file without loading it into memory"""
+    if fmt == 'csv':
+        with open(path, newline='', encoding='utf-8-sig') as source:
+            reader = csv.reader(source)
+            headers = [_header(name) for name in next(reader, [])]
+            for row_number, row in enumerate(reader, start=2):
+                if any(row):
+                    yield row_number, dict(zip(headers, row))
+
+    elif fmt == 'xlsx':
+        from openpyxl import load_workbook
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            headers = [_header(name) for name in next(rows, ())]
+            for row_number, row in enumerate(rows, start=2):
+                if any(value is not None for value in row):
+                    yield row_number, dict(zip(headers, row))
+        finally:
+            workbook.close()
+
+    else:
+        with open(path, encoding='utf-8') as source:
+            for row_number, line in enumerate(source, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    values = json.loads(line)
+                except ValueError:
+                    values = None
+                if not isinstance(values, dict):
+                    # Left to validation, so one bad line does not stop the import
+                    values = {'_invalid': 'Line is not a JSON object'}
+                yield row_number, {_header(name): value for name, value in values.items()}
+
+
+def _text(value):
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        # Spreadsheets hand back phone numbers and the like as floats
+        value = int(value)
+    return str(value).strip() or None
+
+
+def _number(value):
+    if value is None or isinstance(value, (int, float)):
+        return value
+    value = str(value).strip()
+    return float(value) if value else None
+
+
+def _date(value):
+    if value is None or isinstance(value, datetime):
+        return value.date() if value else None
+    if isinstance(value, date):
+        return value
+    value = str(value).strip()
+    return datetime.fromisoformat(value).date() if value else None
+
+
+def validate_row(values):
+    """Return ``(row, None)`` with the insert values of a candidate, or ``(None, message)``"""
+    if '_invalid' in values:
+        return None, values['_invalid']
+
+    row = {column: _text(values.get(column)) for column in TEXT_COLUMNS}
+    if not row['full_name'] or not row['email']:
+        return None, 'Full name and email are required'
+    row['country'] = row['country'] or 'Vietnam'
+
+    table = Candidate.__table__
+    for column in TEXT_COLUMNS:
+        length = table.c[column].type.length
+        if length and row[column] and len(row[column]) > length:
+            return None, f'{column} is longer than {length} characters'
+
+    for column, members in ENUM_COLUMNS.items():
+        value = _text(values.get(column))
+        if value is None:
+            row[column] = CandidateStatus.NEW if column == 'status' else None
+        elif value.lower() in members:
+            row[column] = members[value.lower()]
+        else:
+            return None, f'Invalid {column} value {value!r}'
+
+    for column in NUMBER_COLUMNS:
+        try:
+            row[column] = _number(values.get(column))
+        except ValueError:
+            return None, f'Invalid number for {column}'
+
+    try:
+        row['date_of_birth'] = _date(values.get('date_of_birth'))
+    except (TypeError, ValueError):
+        return None, 'Invalid date format for date_of_birth'
+
+    # Written to candidate_notes once the candidate has an id
+    row['note'] = _text(values.get('notes'))
+    row['notes_count'] = 1 if row['note'] else 0
+
+    return row, None
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _existing_emails(connection, emails):
+    """One set-based duplicate lookup for a whole chunk"""
+    if not emails:
+        return set()
+    return set(connection.execute(select(Candidate.email).where(Candidate.email.in_(emails))).scalars())
+
+
+def _insert_candidates(connection, rows, author):
+    """Bulk insert a chunk with its notes, keeping the search index, dashboard counters and
+    quality score queue in step.
+
+    Core inserts skip the ORM flush hooks that maintain them for single rows.
+    """
+    table = Candidate.__table__
+    now = datetime.utcnow()
+    notes = [row.pop('note') for row in rows]
+    rows = [dict(row, created_at=now, updated_at=now) for row in rows]
+    ids = _insert_returning_ids(connection, table, rows)
+
+    CANDIDATE_SEARCH.index_rows(connection, [dict(row, id=candidate_id) for row, candidate_id in zip(rows, ids)])
+
+    note_rows = [
+        {'candidate_id': candidate_id, 'user_id': author.id if author else None,
+         'author_name': author.full_name if author else None, 'body': note, 'created_at': now}
+        for candidate_id, note in zip(ids, notes) if note
+    ]
+    if note_rows:
+        connection.execute(insert(CandidateNote.__table__), note_rows)
+
+    deltas = counter_deltas(Candidate, ((None, row) for row in rows))
+    if deltas:
+        adjust_dashboard_counters(connection, **deltas)
+
+    queue_quality_scores(db.session, ids)
+
+
+def _insert_returning_ids(connection, table, rows):
+    """Bulk insert ``rows`` and return their new ids, in row order"""
+    if connection.dialect.name != 'sqlite':
+        return connection.execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+
+    # RETURNING in parameter order makes SQLite fall back to one INSERT per
+    # row. The transaction holds the write lock from the first row on, so the
+    # chunk got the highest, consecutive rowids.
+    connection.execute(insert(table), rows)
+    last_id = connection.execute(select(func.max(table.c.id))).scalar()
+    return list(range(last_id - len(rows) + 1, last_id + 1))
+
+
+def import_candidates(path, fmt, user_id=None, filename=None, on_progress=None, chunk_size=CHUNK_SIZE):
+    """Import the candidates of a CSV, XLSX or JSONL file chunk by chunk.
+
+    Every chunk is validated, checked for duplicate emails (against the
+    database and earlier rows of the file), bulk inserted and committed.
+    ``on_progress`` is called with the running totals after each chunk and
+    one summary activity is logged at the end. Returns the totals.
+    """
+    summary = {'rows': 0, 'imported': 0, 'duplicates': 0, 'invalid': 0, 'errors': []}
+    seen = set()
+    author = db.session.execute(select(User.id, User.full_name).where(User.id == user_id)).first() if user_id else None
+
+    try:
+        for chunk in _chunks(read_rows(path, fmt), chunk_size):
+            valid, rejected = [], []
+            for row_number, values in chunk:
+                row, message = validate_row(values)
+                if message:
+                    summary['invalid'] += 1
+                    rejected.append((row_number, message))
+                elif row['email'] in seen:
+                    summary['duplicates'] += 1
+                    rejected.append((row_number, f"Duplicate email {row['email']} in file"))
+                else:
+                    seen.add(row['email'])
+                    valid.append((row_number, row))
+
+            connection = db.session.connection()
+            existing = _existing_emails(connection, [row['email'] for _, row in valid])
+            rows = []
+            for row_number, row in valid:
+                if row['email'] in existing:
+                    summary['duplicates'] += 1
+                    rejected.append((row_number, f"Candidate with email {row['email']} already exists"))
+                else:
+                    rows.append(row)
+
+            if rows:
+                _insert_candidates(connection, rows, author)
+            db.session.commit()
+
+            summary['rows'] += len(chunk)
+            summary['imported'] += len(rows)
+            summary['errors'].extend(
+                {'row': row_number, 'message': message} for row_number, message in sorted(rejected)
+            )
+            del summary['errors'][MAX_REPORTED_ERRORS:]
+            if on_progress:
+                on_progress(summary)
+    except Exception as error:
+        db.session.rollback()
+        _log_summary(user_id, filename or os.path.basename(path), summary, error)
+        raise
+
+    _log_summary(user_id, filename or os.path.basename(path), summary)
+    return summary
+
+
+def _log_summary(user_id, filename, summary, error=None):
+    description = f"Imported {summary['imported']} candidates from {filename}"
+    if error is not None:
+        description += ' (failed)'
+    log_activity(
+        user_id=user_id,
+        activity_type=ActivityType.SYSTEM_ACTION,
+        description=description,
+        details={key: summary[key] for key in ('rows', 'imported', 'duplicates', 'invalid')}
+    )
+    db.session.commit()
+
+
+class CandidateImports:
+    """Runs uploaded imports in the background and tracks their progress.
+
+    Uploads and status files live in ``CANDIDATE_IMPORT_DIR``, so any server
+    worker can answer a status request. Imports run one at a time per
+    process, which keeps them from competing for the database write lock.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._executor = None
+        self._pid = None
+
+    def init_app(self, app):
+        app.config.setdefault('CANDIDATE_IMPORT_DIR', os.path.join(app.instance_path, 'candidate-imports'))
+        app.config.setdefault('CANDIDATE_IMPORT_CHUNK_SIZE', CHUNK_SIZE)
+        self._app = app
+        self.directory = app.config['CANDIDATE_IMPORT_DIR']
+        self.chunk_size = app.config['CANDIDATE_IMPORT_CHUNK_SIZE']
+
+    def start(self, upload, fmt, user_id):
+        """Save ``upload`` and queue its import, returning the initial job status"""
+        os.makedirs(self.directory, exist_ok=True)
+        job_id = uuid.uuid4().hex
+        path = os.path.join(self.directory, f'{job_id}.{fmt}')
+        upload.save(path)
+
+        job = {
+            'id': job_id,
+            'status': 'queued',
+            'filename': upload.filename,
+            'user_id': user_id,
+            'rows': 0, 'imported': 0, 'duplicates': 0, 'invalid': 0, 'errors': [],
+            'created_at': datetime.utcnow().isoformat(),
+            'finished_at': None,
+            'message': None
+        }
+        self._save(job)
+        self._ensure_executor().submit(self._run, job, path, fmt)
+        return job
+
+    def get(self, job_id):
+        if not job_id.isalnum():
+            return None
+        try:
+            with open(self._path(job_id)) as status:
+                return json.load(status)
+        except (OSError, ValueError):
+            return None
+
+    def _ensure_executor(self):
+        # Per process, so that forked server workers each get their own thread
+        if self._executor is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='candidate-import')
+        return self._executor
+
+    def _run(self, job, path, fmt):
+        def progress(summary):
+            job.update(summary)
+            self._save(job)
+
+        job['status'] = 'running'
+        self._save(job)
+        try:
+            with self._app.app_context():
+                progress(import_candidates(
+                    path, fmt, user_id=job['user_id'], filename=job['filename'],
+                    on_progress=progress, chunk_size=self.chunk_size
+                ))
+            job['status'] = 'completed'
+        except Exception as error:
+            logger.exception("Candidate import %s failed", job['id'])
+            job['status'] = 'failed'
+            job['message'] = str(error)
+        finally:
+            job['finished_at'] = datetime.utcnow().isoformat()
+            self._save(job)
+            os.remove(path)
+
+    def _save(self, job):
+        # Write then rename, so status readers never see a partial file
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as status:
+            json.dump(job, status)
+        os.replace(temp_path, self._path(job['id']))
+
+    def _path(self, job_id):
+        return os.path.join(self.directory, f'{job_id}.json')
+
+
+candidate_imports = CandidateImports()
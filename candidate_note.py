@@ -0,0 +1,25 @@
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
+from sqlalchemy.orm import relationship
+import datetime
+from .user import db
+
+class CandidateNote(db.Model):
+    __tablename__ = 'candidate_notes'
+    __table_args__ = (
+        Index('ix_candidate_notes_candidate_id_created_at', 'candidate_id', 'created_at'),
+    )
+
+    # Append-only, one row per note; Candidate.notes_count counts them
+    id = Column(Integer, primary_key=True)
+    candidate_id = Column(Integer, ForeignKey('candidates.id', ondelete='CASCADE'), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=True)
+    author_name = Column(String(100))  # As shown when the note was written
+    body = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    # Relationships
+    candidate = relationship("Candidate")
+
+    def __repr__(self):
+        return f"<CandidateNote {self.id} - {self.candidate_id}>"
@@ -0,0 +1,17 @@
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+import datetime
+from .user import db
+
+class CandidateScoreQueue(db.Model):
+    __tablename__ = 'candidate_score_queue'
+
+    # Dirty set of candidates whose quality_score needs recomputing. Rows are
+    # only ever appended and deleted, so marking never conflicts; the same
+    # candidate may be queued more than once until the next drain.
+    id = Column(Integer, primary_key=True)
+    candidate_id = Column(Integer, ForeignKey('candidates.id', ondelete='CASCADE'), nullable=False)
+    marked_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    def __repr__(self):
+        return f"<CandidateScoreQueue {self.candidate_id}>"
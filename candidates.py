@@ -1,19 +1,34 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import db, User, UserRole
 from src.models.candidate import Candidate, CandidateStatus, Gender, EducationLevel
+from src.models.candidate_note import CandidateNote
+from src.models.candidate_score_queue import CandidateScoreQueue
+from src.models.job_position import JobPosition
 from src.models.activity import Activity, ActivityType
 from src.routes.auth import token_required, role_required
+from src.services.response_cache import response_cache, cached_response
+from src.services.read_routing import read_replica
+from src.services.pagination import paginate, InvalidCursor
+from src.services.search_index import CANDIDATE_SEARCH
+from src.services.aggregates import enum_counts, group_counts
+from src.services.activity_log import log_activity
+from src.services.candidate_import import candidate_imports, import_candidates, file_format, InvalidImport, CHUNK_SIZE
+from src.services.matching import MATCHING_ENGINE, MAX_MATCHES
+from src.services.quality_score import drain_quality_queue, rebuild_quality_scores, BATCH_SIZE
 from datetime import datetime
 import os
+import click
 
 candidates_bp = Blueprint('candidates', __name__)
 
 @candidates_bp.route('/', methods=['GET'])
 @token_required
+@read_replica
 def get_candidates(current_user):
     # Get query parameters for filtering
     status = request.args.get('status')
     search = request.args.get('search')
+    sort = request.args.get('sort', 'created')
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
     
@@ -29,16 +44,22 @@ def get_candidates(current_user):
             return jsonify({'message': 'Invalid status value'}), 400
     
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            (Candidate.full_name.ilike(search_term)) | 
-            (Candidate.email.ilike(search_term)) |
-            (Candidate.phone.ilike(search_term)) |
-            (Candidate.skills.ilike(search_term))
-        )
+        query = CANDIDATE_SEARCH.apply(query, search)
+    
+    if sort == 'created':
+        sort_column = Candidate.created_at
+    elif sort == 'quality':
+        # Best first; candidates the scorer has not reached yet are left out
+        sort_column = Candidate.quality_score
+        query = query.filter(Candidate.quality_score.isnot(None))
+    else:
+        return jsonify({'message': 'Invalid sort value'}), 400
     
-    # Pagination
-    candidates_pagination = query.order_by(Candidate.created_at.desc()).paginate(page=page, per_page=per_page)
+    # Pagination (by page number, or by keyset when cursor= is given)
+    try:
+        candidates_pagination = paginate(query, sort_column, Candidate.id, page=page, per_page=per_page)
+    except InvalidCursor:
+        return jsonify({'message': 'Invalid cursor value'}), 400
     
     # Format response
     candidates_list = []
@@ -52,18 +73,22 @@ def get_candidates(current_user):
             'years_of_experience': candidate.years_of_experience,
             'skills': candidate.skills,
             'current_position': candidate.current_position,
+            'quality_score': candidate.quality_score,
             'created_at': candidate.created_at.isoformat()
         })
     
     return jsonify({
         'candidates': candidates_list,
-        'total': candidates_pagination.total,
-        'pages': candidates_pagination.pages,
-        'current_page': candidates_pagination.page
+        **candidates_pagination.meta
     })
 
+def candidate_version(candidate_id):
+    # quality_score is rewritten without touching updated_at
+    return db.select(Candidate.updated_at, Candidate.quality_score).where(Candidate.id == candidate_id)
+
 @candidates_bp.route('/<int:candidate_id>', methods=['GET'])
 @token_required
+@cached_response('candidate:{candidate_id}', candidate_version)
 def get_candidate(current_user, candidate_id):
     candidate = Candidate.query.get_or_404(candidate_id)
     
@@ -93,7 +118,7 @@ def get_candidate(current_user, candidate_id):
         'expected_salary': candidate.expected_salary,
         'status': candidate.status.value,
         'source': candidate.source,
-        'notes': candidate.notes,
+        'notes_count': candidate.notes_count,
         'quality_score': candidate.quality_score,
         'last_contact_date': candidate.last_contact_date.isoformat() if candidate.last_contact_date else None,
         'created_at': candidate.created_at.isoformat(),
@@ -170,19 +195,27 @@ def create_candidate(current_user):
         expected_salary=data.get('expected_salary'),
         status=status,
         source=data.get('source'),
-        notes=data.get('notes')
+        notes_count=1 if data.get('notes') else 0
     )
     
     db.session.add(new_candidate)
     
+    # Initial notes become the first note
+    if data.get('notes'):
+        db.session.add(CandidateNote(
+            candidate=new_candidate,
+            user_id=current_user.id,
+            author_name=current_user.full_name,
+            body=data['notes']
+        ))
+    
     # Log activity
-    activity = Activity(
+    log_activity(
         user_id=current_user.id,
-        candidate_id=new_candidate.id,
+        candidate_id=new_candidate,
         activity_type=ActivityType.SYSTEM_ACTION,
         description=f"Candidate {data['full_name']} created"
     )
-    db.session.add(activity)
     
     db.session.commit()
     
@@ -228,14 +261,13 @@ def update_candidate(current_user, candidate_id):
             
             # Log status change
             if old_status != new_status:
-                activity = Activity(
+                log_activity(
                     user_id=current_user.id,
                     candidate_id=candidate.id,
                     activity_type=ActivityType.STATUS_CHANGE,
                     description=f"Candidate status changed from {old_status.value} to {new_status.value}",
                     details={"old_status": old_status.value, "new_status": new_status.value}
                 )
-                db.session.add(activity)
         except ValueError:
             return jsonify({'message': 'Invalid status value!'}), 400
     
@@ -251,21 +283,21 @@ def update_candidate(current_user, candidate_id):
         'address', 'city', 'province', 'country', 'major', 'university', 
         'skills', 'languages', 'years_of_experience', 'resume_url', 
         'portfolio_url', 'current_employer', 'current_position', 
-        'current_salary', 'expected_salary', 'source', 'notes'
+        'current_salary', 'expected_salary', 'source'
     ]:
         if field in data:
             setattr(candidate, field, data[field])
     
     # Log activity
-    activity = Activity(
+    log_activity(
         user_id=current_user.id,
         candidate_id=candidate.id,
         activity_type=ActivityType.SYSTEM_ACTION,
         description=f"Candidate {candidate.full_name} updated"
     )
-    db.session.add(activity)
     
     db.session.commit()
+    response_cache.invalidate(f'candidate:{candidate_id}')
     
     return jsonify({'message': 'Candidate updated successfully!'})
 
@@ -276,18 +308,80 @@ def delete_candidate(current_user, candidate_id):
     candidate = Candidate.query.get_or_404(candidate_id)
     
     # Log activity before deletion
-    activity = Activity(
+    log_activity(
         user_id=current_user.id,
         activity_type=ActivityType.SYSTEM_ACTION,
         description=f"Candidate {candidate.full_name} deleted"
     )
-    db.session.add(activity)
     
+    CandidateNote.query.filter_by(candidate_id=candidate_id).delete(synchronize_session=False)
+    CandidateScoreQueue.query.filter_by(candidate_id=candidate_id).delete(synchronize_session=False)
+    # The candidate's history stays in the activity feed, detached from the row
+    Activity.query.filter_by(candidate_id=candidate_id).update({'candidate_id': None}, synchronize_session=False)
     db.session.delete(candidate)
     db.session.commit()
+    response_cache.invalidate(f'candidate:{candidate_id}')
     
     return jsonify({'message': 'Candidate deleted successfully!'})
 
+@candidates_bp.route('/<int:candidate_id>/matching-jobs', methods=['GET'])
+@token_required
+@read_replica
+@role_required([UserRole.ADMIN, UserRole.MANAGER, UserRole.RECRUITER])
+def get_matching_jobs(current_user, candidate_id):
+    """Best matching open jobs for a candidate, scored from memory"""
+    k = request.args.get('k', 20, type=int)
+    if not 1 <= k <= MAX_MATCHES:
+        return jsonify({'message': f'k must be between 1 and {MAX_MATCHES}'}), 400
+    
+    matches = MATCHING_ENGINE.candidate_matches(candidate_id, k)
+    if matches is None:
+        return jsonify({'message': 'Candidate not found!'}), 404
+    
+    jobs = {job.id: job for job in db.session.execute(
+        db.select(JobPosition.id, JobPosition.title, JobPosition.location, JobPosition.client_id)
+        .where(JobPosition.id.in_([match['id'] for match in matches]))
+    )}
+    
+    return jsonify({
+        'candidate_id': candidate_id,
+        'matches': [{
+            'job_id': match['id'],
+            'title': jobs[match['id']].title,
+            'location': jobs[match['id']].location,
+            'client_id': jobs[match['id']].client_id,
+            'score': match['score'],
+            'components': match['components']
+        } for match in matches if match['id'] in jobs]
+    })
+
+@candidates_bp.route('/<int:candidate_id>/notes', methods=['GET'])
+@token_required
+def get_candidate_notes(current_user, candidate_id):
+    if db.session.get(Candidate, candidate_id) is None:
+        return jsonify({'message': 'Candidate not found!'}), 404
+    
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+    
+    # Newest first, by page number, or by keyset when cursor= is given
+    query = CandidateNote.query.filter_by(candidate_id=candidate_id)
+    try:
+        notes_page = paginate(query, CandidateNote.created_at, CandidateNote.id, page=page, per_page=per_page)
+    except InvalidCursor:
+        return jsonify({'message': 'Invalid cursor value'}), 400
+    
+    return jsonify({
+        'notes': [{
+            'id': note.id,
+            'body': note.body,
+            'user_id': note.user_id,
+            'author_name': note.author_name,
+            'created_at': note.created_at.isoformat()
+        } for note in notes_page.items],
+        **notes_page.meta
+    })
+
 @candidates_bp.route('/<int:candidate_id>/notes', methods=['POST'])
 @token_required
 def add_candidate_note(current_user, candidate_id):
@@ -297,47 +391,73 @@ def add_candidate_note(current_user, candidate_id):
     if not data.get('note'):
         return jsonify({'message': 'Note content is required!'}), 400
     
-    # Update candidate notes
-    if candidate.notes:
-        candidate.notes += f"\n\n[{datetime.utcnow().strftime('%Y-%m-%d %H:%M')} by {current_user.full_name}]\n{data['note']}"
-    else:
-        candidate.notes = f"[{datetime.utcnow().strftime('%Y-%m-%d %H:%M')} by {current_user.full_name}]\n{data['note']}"
+    # Append the note; the candidate row only gets its counter bumped
+    note = CandidateNote(
+        candidate_id=candidate.id,
+        user_id=current_user.id,
+        author_name=current_user.full_name,
+        body=data['note']
+    )
+    db.session.add(note)
+    candidate.notes_count = Candidate.notes_count + 1
+    db.session.flush()
     
     # Log activity
-    activity = Activity(
+    log_activity(
         user_id=current_user.id,
         candidate_id=candidate.id,
         activity_type=ActivityType.NOTE_ADDED,
         description=f"Note added to candidate {candidate.full_name}",
-        details={"note": data['note']}
+        details={"note_id": note.id}
     )
-    db.session.add(activity)
     
     db.session.commit()
+    response_cache.invalidate(f'candidate:{candidate_id}')
+    
+    return jsonify({'message': 'Note added successfully!', 'note_id': note.id})
+
+@candidates_bp.route('/import', methods=['POST'])
+@token_required
+@role_required([UserRole.ADMIN, UserRole.MANAGER, UserRole.RECRUITER])
+def import_candidates_file(current_user):
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return jsonify({'message': 'A CSV, XLSX or JSONL file is required!'}), 400
+    
+    try:
+        fmt = file_format(upload.filename, request.form.get('format'))
+    except InvalidImport as error:
+        return jsonify({'message': str(error)}), 400
+    
+    job = candidate_imports.start(upload, fmt, current_user.id)
+    
+    return jsonify({
+        'message': 'Candidate import started!',
+        'job': job
+    }), 202
+
+@candidates_bp.route('/import/<job_id>', methods=['GET'])
+@token_required
+def get_import_status(current_user, job_id):
+    job = candidate_imports.get(job_id)
+    # Imports, and the rows they rejected, are visible to whoever started them and to admins
+    if job is None or (job['user_id'] != current_user.id and current_user.role != UserRole.ADMIN):
+        return jsonify({'message': 'Import job not found!'}), 404
     
-    return jsonify({'message': 'Note added successfully!'})
+    return jsonify({'job': job})
 
 @candidates_bp.route('/statistics', methods=['GET'])
 @token_required
+@read_replica
 def get_candidate_statistics(current_user):
-    # Count candidates by status
-    status_counts = {}
-    for status in CandidateStatus:
-        count = Candidate.query.filter_by(status=status).count()
-        status_counts[status.value] = count
+    # Count candidates by status and education level in one scan
+    counts = enum_counts(Candidate, {
+        'status_distribution': (Candidate.status, CandidateStatus),
+        'education_distribution': (Candidate.education_level, EducationLevel)
+    })
     
     # Count candidates by source
-    source_counts = db.session.query(
-        Candidate.source, db.func.count(Candidate.id)
-    ).group_by(Candidate.source).all()
-    
-    source_data = {source: count for source, count in source_counts if source}
-    
-    # Count candidates by education level
-    education_counts = {}
-    for level in EducationLevel:
-        count = Candidate.query.filter_by(education_level=level).count()
-        education_counts[level.value] = count
+    source_data = group_counts(Candidate.source)
     
     # Recent activity
     recent_candidates = Candidate.query.order_by(Candidate.created_at.desc()).limit(5).all()
@@ -350,9 +470,49 @@ def get_candidate_statistics(current_user):
     } for c in recent_candidates]
     
     return jsonify({
-        'total_candidates': Candidate.query.count(),
-        'status_distribution': status_counts,
+        'total_candidates': counts['total'],
+        'status_distribution': counts['status_distribution'],
         'source_distribution': source_data,
-        'education_distribution': education_counts,
+        'education_distribution': counts['education_distribution'],
         'recent_candidates': recent_data
     })
+
+@candidates_bp.cli.command('reindex')
+def reindex_command():
+    """Rebuild the full-text search index for candidates"""
+    total = CANDIDATE_SEARCH.rebuild(db.session.connection())
+    db.session.commit()
+    click.echo(f"Indexed {total} candidates")
+
+@candidates_bp.cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'xlsx', 'jsonl']), help='File format, by default from the extension')
+@click.option('--chunk-size', type=int, default=CHUNK_SIZE, show_default=True, help='Rows validated and inserted per batch')
+def import_command(path, fmt, chunk_size):
+    """Import candidates from a CSV, XLSX or JSONL file"""
+    try:
+        fmt = file_format(path, fmt)
+    except InvalidImport as error:
+        raise click.UsageError(str(error))
+    
+    def progress(summary):
+        click.echo(f"{summary['rows']} rows read, {summary['imported']} imported")
+    
+    summary = import_candidates(path, fmt, on_progress=progress, chunk_size=chunk_size)
+    click.echo(
+        f"Imported {summary['imported']} of {summary['rows']} rows "
+        f"({summary['duplicates']} duplicates, {summary['invalid']} invalid)"
+    )
+    for error in summary['errors']:
+        click.echo(f"  row {error['row']}: {error['message']}")
+
+@candidates_bp.cli.command('score-quality')
+@click.option('--full', is_flag=True, help='Rescore every candidate instead of the queued ones')
+@click.option('--batch-size', type=int, default=BATCH_SIZE, show_default=True, help='Candidates scored per batch')
+def score_quality_command(full, batch_size):
+    """Compute candidate quality scores"""
+    if full:
+        total = rebuild_quality_scores(batch_size, on_progress=lambda scored: click.echo(f"{scored} candidates scored"))
+    else:
+        total = drain_quality_queue(batch_size)
+    click.echo(f"Scored {total} candidates")
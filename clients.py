@@ -1,13 +1,19 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import db, User, UserRole
 from src.models.client import Client, ClientType, ClientStatus
-from src.models.activity import Activity, ActivityType
+from src.models.activity import ActivityType
 from src.routes.auth import token_required, role_required
+from src.services.response_cache import response_cache, cached_response
+from src.services.read_routing import read_replica
+from src.services.pagination import paginate, InvalidCursor
+from src.services.aggregates import enum_counts, group_counts
+from src.services.activity_log import log_activity
 
 clients_bp = Blueprint('clients', __name__)
 
 @clients_bp.route('/', methods=['GET'])
 @token_required
+@read_replica
 def get_clients(current_user):
     # Get query parameters for filtering
     status = request.args.get('status')
@@ -42,8 +48,11 @@ def get_clients(current_user):
             (Client.primary_contact_email.ilike(search_term))
         )
     
-    # Pagination
-    clients_pagination = query.order_by(Client.created_at.desc()).paginate(page=page, per_page=per_page)
+    # Pagination (by page number, or by keyset when cursor= is given)
+    try:
+        clients_pagination = paginate(query, Client.created_at, Client.id, page=page, per_page=per_page)
+    except InvalidCursor:
+        return jsonify({'message': 'Invalid cursor value'}), 400
     
     # Format response
     clients_list = []
@@ -63,13 +72,15 @@ def get_clients(current_user):
     
     return jsonify({
         'clients': clients_list,
-        'total': clients_pagination.total,
-        'pages': clients_pagination.pages,
-        'current_page': clients_pagination.page
+        **clients_pagination.meta
     })
 
+def client_version(client_id):
+    return db.select(Client.updated_at).where(Client.id == client_id)
+
 @clients_bp.route('/<int:client_id>', methods=['GET'])
 @token_required
+@cached_response('client:{client_id}', client_version)
 def get_client(current_user, client_id):
     client = Client.query.get_or_404(client_id)
     
@@ -152,12 +163,11 @@ def create_client(current_user):
     db.session.add(new_client)
     
     # Log activity
-    activity = Activity(
+    log_activity(
         user_id=current_user.id,
         activity_type=ActivityType.SYSTEM_ACTION,
         description=f"Client {data['company_name']} created"
     )
-    db.session.add(activity)
     
     db.session.commit()
     
@@ -213,14 +223,14 @@ def update_client(current_user, client_id):
             client.user_id = None
     
     # Log activity
-    activity = Activity(
+    log_activity(
         user_id=current_user.id,
         activity_type=ActivityType.SYSTEM_ACTION,
         description=f"Client {client.company_name} updated"
     )
-    db.session.add(activity)
     
     db.session.commit()
+    response_cache.invalidate(f'client:{client_id}', 'jobs')
     
     return jsonify({'message': 'Client updated successfully!'})
 
@@ -231,39 +241,30 @@ def delete_client(current_user, client_id):
     client = Client.query.get_or_404(client_id)
     
     # Log activity before deletion
-    activity = Activity(
+    log_activity(
         user_id=current_user.id,
         activity_type=ActivityType.SYSTEM_ACTION,
         description=f"Client {client.company_name} deleted"
     )
-    db.session.add(activity)
     
     db.session.delete(client)
     db.session.commit()
+    response_cache.invalidate(f'client:{client_id}', 'jobs')
     
     return jsonify({'message': 'Client deleted successfully!'})
 
 @clients_bp.route('/statistics', methods=['GET'])
 @token_required
+@read_replica
 def get_client_statistics(current_user):
-    # Count clients by type
-    type_counts = {}
-    for client_type in ClientType:
-        count = Client.query.filter_by(client_type=client_type).count()
-        type_counts[client_type.value] = count
-    
-    # Count clients by status
-    status_counts = {}
-    for status in ClientStatus:
-        count = Client.query.filter_by(status=status).count()
-        status_counts[status.value] = count
+    # Count clients by type and status in one scan
+    counts = enum_counts(Client, {
+        'type_distribution': (Client.client_type, ClientType),
+        'status_distribution': (Client.status, ClientStatus)
+    })
     
     # Count clients by industry
-    industry_counts = db.session.query(
-        Client.industry, db.func.count(Client.id)
-    ).group_by(Client.industry).all()
-    
-    industry_data = {industry: count for industry, count in industry_counts if industry}
+    industry_data = group_counts(Client.industry)
     
     # Recent clients
     recent_clients = Client.query.order_by(Client.created_at.desc()).limit(5).all()
@@ -276,9 +277,9 @@ def get_client_statistics(current_user):
     } for c in recent_clients]
     
     return jsonify({
-        'total_clients': Client.query.count(),
-        'type_distribution': type_counts,
-        'status_distribution': status_counts,
+        'total_clients': counts['total'],
+        'type_distribution': counts['type_distribution'],
+        'status_distribution': counts['status_distribution'],
         'industry_distribution': industry_data,
         'recent_clients': recent_data
     })
@@ -0,0 +1,214 @@
+from sqlalchemy import event, inspect, select, update, insert, func
+from src.models.user import db
+from src.models.candidate import Candidate, CandidateStatus
+from src.models.client import Client
+from src.models.job_position import JobPosition, JobStatus
+from src.models.application import Application, ApplicationStatus
+from src.models.interview import Interview, InterviewStatus
+from src.models.dashboard_summary import DashboardSummary
+from src.services.read_routing import use_primary
+from src.services.sql_dates import days_between
+from datetime import datetime, timedelta
+
+INACTIVE_CANDIDATE_STATUSES = (CandidateStatus.REJECTED, CandidateStatus.BLACKLISTED)
+CLOSED_APPLICATION_STATUSES = (ApplicationStatus.HIRED, ApplicationStatus.REJECTED, ApplicationStatus.WITHDRAWN)
+
+COUNTER_COLUMNS = (
+    'active_candidates', 'open_jobs', 'active_clients', 'total_applications',
+    'pending_applications', 'hired_applications', 'hire_days_sum', 'hire_days_count'
+)
+
+
+def _counters(model, get):
+    """Return the dashboard counters a single row of ``model`` contributes, reading attributes through ``get``"""
+    if issubclass(model, Candidate):
+        status = get('status')
+        return {'active_candidates': int(status is not None and status not in INACTIVE_CANDIDATE_STATUSES)}
+
+    if issubclass(model, JobPosition):
+        return {'open_jobs': int(get('status') == JobStatus.OPEN)}
+
+    if issubclass(model, Client):
+        return {'active_clients': 1}
+
+    if issubclass(model, Application):
+        status = get('status')
+        counters = {
+            'total_applications': 1,
+            'pending_applications': int(status is not None and status not in CLOSED_APPLICATION_STATUSES),
+            'hired_applications': int(status == ApplicationStatus.HIRED)
+        }
+        hired_at, applied_at = get('hired_at'), get('applied_at')
+        if hired_at and applied_at:
+            counters['hire_days_sum'] = (hired_at - applied_at).total_seconds() / 86400
+            counters['hire_days_count'] = 1
+        return counters
+
+    return {}
+
+
+def _current_value(obj):
+    return lambda key: getattr(obj, key)
+
+
+def _previous_value(obj):
+    """Read attribute values as they were before the pending flush"""
+    attrs = inspect(obj).attrs
+
+    def get(key):
+        history = attrs[key].history
+        if history.deleted:
+            return history.deleted[0]
+        if history.unchanged:
+            return history.unchanged[0]
+        return None
+
+    return get
+
+
+def _accumulate(deltas, counters, sign):
+    for key, value in counters.items():
+        deltas[key] = deltas.get(key, 0) + sign * value
+
+
+def counter_deltas(model, changes):
+    """Sum the counter deltas of rows of ``model`` going from ``before`` to ``after``.
+
+    ``changes`` yields ``(before, after)`` mappings of column values, with None
+    for the missing side of an insert or delete. For bulk writes that bypass
+    the ORM, together with ``adjust_dashboard_counters``.
+    """
+    deltas = {}
+    for before, after in changes:
+        if before is not None:
+            _accumulate(deltas, _counters(model, before.get), -1)
+        if after is not None:
+            _accumulate(deltas, _counters(model, after.get), 1)
+    return {key: value for key, value in deltas.items() if value}
+
+
+def compute_dashboard_counters(connection):
+    """Compute every dashboard counter from the base tables"""
+    def count(model, *criteria):
+        return select(func.count()).select_from(model).where(*criteria).scalar_subquery()
+
+    hire_days = days_between(Application.hired_at, Application.applied_at)
+    hired_with_dates = (Application.hired_at.isnot(None), Application.applied_at.isnot(None))
+
+    row = connection.execute(select(
+        count(Candidate, Candidate.status.notin_(INACTIVE_CANDIDATE_STATUSES)).label('active_candidates'),
+        count(JobPosition, JobPosition.status == JobStatus.OPEN).label('open_jobs'),
+        count(Client).label('active_clients'),
+        count(Application).label('total_applications'),
+        count(Application, Application.status.notin_(CLOSED_APPLICATION_STATUSES)).label('pending_applications'),
+        count(Application, Application.status == ApplicationStatus.HIRED).label('hired_applications'),
+        select(func.coalesce(func.sum(hire_days), 0.0)).where(*hired_with_dates).scalar_subquery().label('hire_days_sum'),
+        count(Application, *hired_with_dates).label('hire_days_count')
+    )).one()._mapping
+
+    return {key: row[key] for key in COUNTER_COLUMNS}
+
+
+def rebuild_dashboard_summary(connection=None):
+    """Recompute the summary row from scratch, reconciling any drift in the counters"""
+    connection = connection or db.session.connection()
+    values = compute_dashboard_counters(connection)
+    values['rebuilt_at'] = datetime.utcnow()
+
+    table = DashboardSummary.__table__
+    result = connection.execute(
+        update(table).where(table.c.id == DashboardSummary.SUMMARY_ID).values(**values)
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(table).values(id=DashboardSummary.SUMMARY_ID, **values))
+
+    return values
+
+
+def dashboard_analytics():
+    """The dashboard numbers: maintained counters plus the time-windowed counts, in one query"""
+    now = datetime.utcnow()
+    today = datetime.combine(now.date(), datetime.min.time())
+    week_ago = today - timedelta(days=7)
+
+    def count(model, *criteria):
+        return db.session.query(func.count()).select_from(model).filter(*criteria).scalar_subquery()
+
+    dashboard_query = db.session.query(
+        DashboardSummary,
+        count(Interview, Interview.scheduled_at > now, Interview.status == InterviewStatus.SCHEDULED),
+        count(Candidate, Candidate.created_at >= today),
+        count(Candidate, Candidate.created_at >= week_ago),
+        count(Application, Application.created_at >= week_ago)
+    ).filter(DashboardSummary.id == DashboardSummary.SUMMARY_ID)
+
+    row = dashboard_query.first()
+    if row is None:
+        # Summary table not populated yet
+        with use_primary():
+            rebuild_dashboard_summary()
+            db.session.commit()
+            row = dashboard_query.first()
+
+    summary, upcoming_interviews, new_candidates_today, new_candidates_week, new_applications_week = row
+
+    total_applications = summary.total_applications
+    hire_rate = (summary.hired_applications / total_applications * 100) if total_applications > 0 else 0
+
+    # Average applied -> hired duration in days
+    avg_time_to_hire = (summary.hire_days_sum / summary.hire_days_count) if summary.hire_days_count > 0 else 0
+
+    return {
+        'summary': {
+            'active_candidates': summary.active_candidates,
+            'active_jobs': summary.open_jobs,
+            'active_clients': summary.active_clients,
+            'pending_applications': summary.pending_applications,
+            'upcoming_interviews': upcoming_interviews
+        },
+        'hiring_metrics': {
+            'hire_rate': round(hire_rate, 1),
+            'avg_time_to_hire': round(avg_time_to_hire, 1)
+        },
+        'recent_activity': {
+            'new_candidates_today': new_candidates_today,
+            'new_candidates_week': new_candidates_week,
+            'new_applications_week': new_applications_week
+        }
+    }
+
+
+@event.listens_for(db.session, 'after_flush')
+def apply_dashboard_deltas(session, flush_context):
+    """Fold the rows written by this flush into the summary row, inside the same transaction"""
+    deltas = {}
+
+    for obj in session.new:
+        _accumulate(deltas, _counters(type(obj), _current_value(obj)), 1)
+
+    for obj in session.dirty:
+        if session.is_modified(obj):
+            _accumulate(deltas, _counters(type(obj), _previous_value(obj)), -1)
+            _accumulate(deltas, _counters(type(obj), _current_value(obj)), 1)
+
+    for obj in session.deleted:
+        _accumulate(deltas, _counters(type(obj), _previous_value(obj)), -1)
+
+    deltas = {key: value for key, value in deltas.items() if value}
+    if deltas:
+        adjust_dashboard_counters(session.connection(), **deltas)
+
+
+def adjust_dashboard_counters(connection, **deltas):
+    """Apply counter deltas directly, for write paths that bypass the ORM unit of work"""
+    table = DashboardSummary.__table__
+    result = connection.execute(
+        update(table).where(table.c.id == DashboardSummary.SUMMARY_ID).values(
+            **{key: table.c[key] + value for key, value in deltas.items()}
+        )
+    )
+
+    # First write against an empty summary table: the flushed rows are already
+    # visible to this connection, so a full rebuild gives the correct totals
+    if result.rowcount == 0:
+        rebuild_dashboard_summary(connection)
@@ -0,0 +1,254 @@
+from sqlalchemy import event, select, func
+from src.models.user import db, User
+from src.models.candidate import Candidate
+from src.models.client import Client
+from src.models.job_position import JobPosition
+from src.models.application import Application
+from src.models.interview import Interview
+from src.models.activity import Activity
+from src.models.dashboard_summary import DashboardSummary
+from src.services.dashboard import dashboard_analytics
+from src.services.auth_cache import auth_cache
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Rows whose commits can change what the dashboard shows
+WATCHED_MODELS = (Activity, Application, Candidate, Client, Interview, JobPosition)
+
+RECENT_ACTIVITY_LIMIT = 10
+
+_CHANGED_KEY = 'dashboard_changed'
+
+
+def dashboard_payload():
+    """Everything the dashboard stream publishes: the dashboard numbers plus the latest activities"""
+    payload = dashboard_analytics()
+    rows = db.session.execute(
+        select(Activity.id, Activity.activity_type, Activity.description, Activity.created_at, User.full_name)
+        .outerjoin(User, Activity.user_id == User.id)
+        .order_by(Activity.created_at.desc(), Activity.id.desc())
+        .limit(RECENT_ACTIVITY_LIMIT)
+    ).all()
+    payload['latest_activities'] = [{
+        'id': row.id,
+        'activity_type': row.activity_type.value,
+        'description': row.description,
+        'created_at': row.created_at.isoformat(),
+        'user_name': row.full_name
+    } for row in rows]
+    return payload
+
+
+def payload_delta(previous, current):
+    """The sections and keys of ``current`` that differ from ``previous``"""
+    delta = {}
+    for section, value in current.items():
+        old = previous.get(section)
+        if isinstance(value, dict) and isinstance(old, dict):
+            changed = {key: item for key, item in value.items() if old.get(key) != item}
+            if changed:
+                delta[section] = changed
+        elif old != value:
+            delta[section] = value
+    return delta
+
+
+def _event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+class DashboardBroadcaster:
+    """Computes the dashboard once per change and fans it out to every open stream.
+
+    Commits in this process that touch ``WATCHED_MODELS``, and batches from the
+    activity writer, wake the broadcaster thread. It recomputes the payload at
+    most every ``DASHBOARD_STREAM_MIN_INTERVAL`` seconds and sends each
+    subscriber only the keys that changed. Writes from other processes are
+    noticed through a cheap change signature checked every
+    ``DASHBOARD_STREAM_POLL_INTERVAL`` seconds while anyone is subscribed.
+
+    Each open stream holds a server thread, so a process accepts at most
+    ``DASHBOARD_STREAM_MAX_SUBSCRIBERS`` of them and leaves the remaining
+    threads to the API. A stream ends when its token expires or its user is
+    deactivated; clients then reconnect and authenticate again.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._payload = None
+        self._signature = None
+
+    def init_app(self, app):
+        app.config.setdefault('DASHBOARD_STREAM_MIN_INTERVAL', 1.0)
+        app.config.setdefault('DASHBOARD_STREAM_POLL_INTERVAL', 5.0)
+        app.config.setdefault('DASHBOARD_STREAM_KEEPALIVE', 15.0)
+        app.config.setdefault('DASHBOARD_STREAM_QUEUE_SIZE', 20)
+        # Half of gunicorn's default 4 threads per worker
+        app.config.setdefault('DASHBOARD_STREAM_MAX_SUBSCRIBERS', 2)
+        self._app = app
+        self.min_interval = app.config['DASHBOARD_STREAM_MIN_INTERVAL']
+        self.poll_interval = app.config['DASHBOARD_STREAM_POLL_INTERVAL']
+        self.keepalive = app.config['DASHBOARD_STREAM_KEEPALIVE']
+        self.queue_size = app.config['DASHBOARD_STREAM_QUEUE_SIZE']
+        self.max_subscribers = app.config['DASHBOARD_STREAM_MAX_SUBSCRIBERS']
+
+    def notify(self):
+        """Mark the dashboard as changed, cheap enough to call on every commit"""
+        if self._subscribers:
+            self._changed.set()
+
+    def subscribe(self):
+        """A queue for a new subscriber, or None when this process already has its fill"""
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            self._ensure_worker()
+            subscriber = queue.Queue(maxsize=self.queue_size)
+            self._subscribers.add(subscriber)
+            return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+            if not self._subscribers:
+                # Nobody keeps it fresh any more, the next subscriber recomputes it
+                self._payload, self._signature = None, None
+
+    def stream(self, subscriber, user_id, expires_at=None):
+        """Yield server-sent events for one subscriber: a snapshot, then deltas.
+
+        Ends once ``expires_at`` (the token's ``exp``) passes or the user is no
+        longer active.
+        """
+        try:
+            with self._lock:
+                payload = self._payload
+            if payload is None:
+                payload = self._refresh(force=True)
+            yield _event('snapshot', payload)
+
+            while True:
+                timeout = self.keepalive
+                if expires_at is not None:
+                    timeout = min(timeout, expires_at - time.time())
+                try:
+                    message = subscriber.get(timeout=max(timeout, 0))
+                except queue.Empty:
+                    message = None
+
+                if not self._authorized(user_id, expires_at):
+                    return
+                if message is None:
+                    # Comment line, keeps proxies from closing an idle stream
+                    yield ': keepalive\n\n'
+                else:
+                    yield _event(*message)
+        finally:
+            self.unsubscribe(subscriber)
+
+    def _authorized(self, user_id, expires_at):
+        if expires_at is not None and time.time() >= expires_at:
+            return False
+        # A file read while the principal is cached, see AuthCache
+        with self._app.app_context():
+            principal = auth_cache.principal(user_id)
+        return principal is not None and principal.is_active
+
+    def _ensure_worker(self):
+        # Per process, so that forked server workers each get their own thread
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        self._pid = os.getpid()
+        self._payload, self._signature = None, None
+        self._thread = threading.Thread(target=self._run, name='dashboard-broadcaster', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            changed = self._changed.wait(self.poll_interval)
+            if not self._subscribers:
+                self._changed.clear()
+                continue
+
+            try:
+                with self._app.app_context():
+                    if changed or self._signature != self._current_signature():
+                        self._changed.clear()
+                        self._refresh()
+            except Exception:
+                logger.exception("Dashboard stream update failed")
+
+            # Coalesce bursts of commits into one computation
+            time.sleep(self.min_interval)
+
+    def _refresh(self, force=False):
+        with self._app.app_context():
+            signature = self._current_signature()
+            payload = dashboard_payload()
+
+        with self._lock:
+            previous, self._payload, self._signature = self._payload, payload, signature
+            subscribers = list(self._subscribers)
+
+        if previous is None or force:
+            return payload
+
+        delta = payload_delta(previous, payload)
+        if delta:
+            for subscriber in subscribers:
+                self._publish(subscriber, ('delta', delta), payload)
+        return payload
+
+    @staticmethod
+    def _publish(subscriber, message, payload):
+        try:
+            subscriber.put_nowait(message)
+        except queue.Full:
+            # A slow client missed deltas, start it over from a full snapshot
+            while True:
+                try:
+                    subscriber.get_nowait()
+                except queue.Empty:
+                    break
+            subscriber.put_nowait(('snapshot', payload))
+
+    @staticmethod
+    def _current_signature():
+        return tuple(db.session.execute(select(
+            select(func.max(Activity.id)).scalar_subquery(),
+            select(DashboardSummary.updated_at).where(DashboardSummary.id == DashboardSummary.SUMMARY_ID).scalar_subquery(),
+            select(func.max(Application.updated_at)).scalar_subquery(),
+            select(func.max(Interview.updated_at)).scalar_subquery(),
+            select(func.max(Candidate.updated_at)).scalar_subquery()
+        )).one())
+
+
+dashboard_broadcaster = DashboardBroadcaster()
+
+
+@event.listens_for(db.session, 'after_flush')
+def collect_dashboard_changes(session, flush_context):
+    if any(isinstance(obj, WATCHED_MODELS) for obj in list(session.new) + list(session.dirty) + list(session.deleted)):
+        session.info[_CHANGED_KEY] = True
+
+
+@event.listens_for(db.session, 'after_commit')
+def notify_dashboard_changes(session):
+    if session.info.pop(_CHANGED_KEY, None):
+        dashboard_broadcaster.notify()
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def discard_dashboard_changes(session, previous_transaction):
+    session.info.pop(_CHANGED_KEY, None)
@@ -0,0 +1,33 @@
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import Column, Integer, DateTime, Float
+import datetime
+from .user import db
+
+class DashboardSummary(db.Model):
+    __tablename__ = 'dashboard_summary'
+
+    # Single-row rollup table, always stored under SUMMARY_ID
+    SUMMARY_ID = 1
+
+    id = Column(Integer, primary_key=True)
+
+    # Entity counters
+    active_candidates = Column(Integer, nullable=False, default=0)  # Not rejected or blacklisted
+    open_jobs = Column(Integer, nullable=False, default=0)
+    active_clients = Column(Integer, nullable=False, default=0)
+
+    # Application counters
+    total_applications = Column(Integer, nullable=False, default=0)
+    pending_applications = Column(Integer, nullable=False, default=0)  # Not hired, rejected or withdrawn
+    hired_applications = Column(Integer, nullable=False, default=0)
+
+    # Running totals for the applied -> hired duration average (in days)
+    hire_days_sum = Column(Float, nullable=False, default=0.0)
+    hire_days_count = Column(Integer, nullable=False, default=0)
+
+    # Timestamps
+    rebuilt_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+    def __repr__(self):
+        return f"<DashboardSummary {self.id}>"
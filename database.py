@@ -0,0 +1,75 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from src.models.user import db
+import os
+
+DEFAULT_DATABASE_URL = 'sqlite:///database/app.db'
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _database_url(value):
+    # Heroku style URLs are not accepted by SQLAlchemy 1.4+
+    if value and value.startswith('postgres://'):
+        return 'postgresql://' + value[len('postgres://'):]
+    return value
+
+
+def _engine_options(url):
+    url = make_url(url)
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        # In-memory databases use a single connection, not a sized pool
+        return {}
+
+    return {
+        'pool_size': _env_int('DB_POOL_SIZE', 5),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': True,
+    }
+
+
+def configure_database(app):
+    """Fill the database settings of ``app`` from the environment.
+
+    ``DATABASE_URL`` selects the primary database (SQLite or PostgreSQL) and
+    ``DATABASE_REPLICA_URL`` adds a read-only ``replica`` bind. Pool sizes come
+    from ``DB_POOL_SIZE``, ``DB_MAX_OVERFLOW``, ``DB_POOL_TIMEOUT`` and
+    ``DB_POOL_RECYCLE``. Values already in ``app.config`` win.
+    """
+    url = app.config.setdefault(
+        'SQLALCHEMY_DATABASE_URI', _database_url(os.environ.get('DATABASE_URL')) or DEFAULT_DATABASE_URL
+    )
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', _engine_options(url))
+    app.config.setdefault('SQLITE_BUSY_TIMEOUT', _env_int('SQLITE_BUSY_TIMEOUT', 5000))
+
+    replica_url = _database_url(os.environ.get('DATABASE_REPLICA_URL'))
+    if replica_url:
+        binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+        binds.setdefault('replica', {'url': replica_url, **_engine_options(replica_url)})
+
+
+def init_sqlite_pragmas(app):
+    """Apply the SQLite pragmas on every new connection of the app's engines.
+
+    WAL lets readers proceed while a writer commits, busy_timeout makes
+    writers wait for the lock instead of failing at once, and
+    synchronous=NORMAL is durable in WAL mode but skips an fsync per commit.
+    """
+    busy_timeout = int(app.config['SQLITE_BUSY_TIMEOUT'])
+
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute(f'PRAGMA busy_timeout={busy_timeout}')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.close()
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                event.listen(engine, 'connect', set_pragmas)
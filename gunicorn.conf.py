@@ -0,0 +1,15 @@
+# Gunicorn settings, read from the environment so each deploy can size them
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Threaded workers: requests mostly wait on the database, and SQLite in WAL
+# mode lets readers in other threads and processes run alongside a writer
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+
+# Not preloaded: every worker opens its own connection pool after the fork
+preload_app = False
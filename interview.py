@@ -1,5 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, Float
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, Float, Index
 from sqlalchemy.orm import relationship
 import enum
 import datetime
@@ -22,6 +22,12 @@ class InterviewStatus(enum.Enum):
 
 class Interview(db.Model):
     __tablename__ = 'interviews'
+    __table_args__ = (
+        Index('ix_interviews_scheduled_at', 'scheduled_at'),
+        Index('ix_interviews_status_scheduled_at', 'status', 'scheduled_at'),
+        Index('ix_interviews_application_id', 'application_id'),
+        Index('ix_interviews_candidate_id', 'candidate_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     application_id = Column(Integer, ForeignKey('applications.id'), nullable=False)
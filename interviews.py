@@ -1,16 +1,22 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import db, User, UserRole
 from src.models.candidate import Candidate
-from src.models.application import Application
+from src.models.application import Application, ApplicationStatus
 from src.models.interview import Interview, InterviewType, InterviewStatus
-from src.models.activity import Activity, ActivityType
+from src.models.activity import ActivityType
 from src.routes.auth import token_required, role_required
+from src.services.read_routing import read_replica
+from src.services.pagination import paginate, InvalidCursor
+from src.services.loading import with_profile
+from src.services.aggregates import enum_counts
+from src.services.activity_log import log_activity
 from datetime import datetime, timedelta
 
 interviews_bp = Blueprint('interviews', __name__)
 
 @interviews_bp.route('/', methods=['GET'])
 @token_required
+@read_replica
 def get_interviews(current_user):
     # Get query parameters for filtering
     status = request.args.get('status')
@@ -23,7 +29,7 @@ def get_interviews(current_user):
     per_page = request.args.get('per_page', 20, type=int)
     
     # Base query
-    query = Interview.query
+    query = with_profile(Interview.query, 'interviews.list')
     
     # Apply filters
     if status:
@@ -58,8 +64,11 @@ def get_interviews(current_user):
         except ValueError:
             return jsonify({'message': 'Invalid date format for date_to!'}), 400
     
-    # Pagination
-    interviews_pagination = query.order_by(Interview.scheduled_at).paginate(page=page, per_page=per_page)
+    # Pagination (by page number, or by keyset when cursor= is given)
+    try:
+        interviews_pagination = paginate(query, Interview.scheduled_at, Interview.id, page=page, per_page=per_page, descending=False)
+    except InvalidCursor:
+        return jsonify({'message': 'Invalid cursor value'}), 400
     
     # Format response
     interviews_list = []
@@ -86,15 +95,13 @@ def get_interviews(current_user):
     
     return jsonify({
         'interviews': interviews_list,
-        'total': interviews_pagination.total,
-        'pages': interviews_pagination.pages,
-        'current_page': interviews_pagination.page
+        **interviews_pagination.meta
     })
 
 @interviews_bp.route('/<int:interview_id>', methods=['GET'])
 @token_required
 def get_interview(current_user, interview_id):
-    interview = Interview.query.get_or_404(interview_id)
+    interview = with_profile(Interview.query, 'interviews.detail').get_or_404(interview_id)
     
     # Format response with all details
     interview_data = {
@@ -180,7 +187,7 @@ def create_interview(current_user):
         application.update_candidate_status()
     
     # Log activity
-    activity = Activity(
+    log_activity(
         user_id=current_user.id,
         candidate_id=application.candidate_id,
         application_id=application.id,
@@ -193,7 +200,6 @@ def create_interview(current_user):
             "duration_minutes": data.get('duration_minutes', 60)
         }
     )
-    db.session.add(activity)
     
     db.session.commit()
     
@@ -233,7 +239,7 @@ def update_interview(current_user, interview_id):
                 interview.completed_at = datetime.utcnow()
                 
                 # Log activity for interview completion
-                activity = Activity(
+                log_activity(
                     user_id=current_user.id,
                     candidate_id=interview.candidate_id,
                     application_id=interview.application_id,
@@ -244,11 +250,10 @@ def update_interview(current_user, interview_id):
                         "overall_score": interview.overall_score
                     }
                 )
-                db.session.add(activity)
             
             # Log status change
             if old_status != new_status:
-                activity = Activity(
+                log_activity(
                     user_id=current_user.id,
                     candidate_id=interview.candidate_id,
                     application_id=interview.application_id,
@@ -256,7 +261,6 @@ def update_interview(current_user, interview_id):
                     description=f"Interview status changed from {old_status.value} to {new_status.value}",
                     details={"old_status": old_status.value, "new_status": new_status.value}
                 )
-                db.session.add(activity)
         except ValueError:
             return jsonify({'message': 'Invalid status value!'}), 400
     
@@ -271,14 +275,13 @@ def update_interview(current_user, interview_id):
             setattr(interview, field, data[field])
     
     # Log activity
-    activity = Activity(
+    log_activity(
         user_id=current_user.id,
         candidate_id=interview.candidate_id,
         application_id=interview.application_id,
         activity_type=ActivityType.SYSTEM_ACTION,
         description=f"Interview updated for {interview.candidate.full_name}"
     )
-    db.session.add(activity)
     
     db.session.commit()
     
@@ -291,14 +294,13 @@ def delete_interview(current_user, interview_id):
     interview = Interview.query.get_or_404(interview_id)
     
     # Log activity before deletion
-    activity = Activity(
+    log_activity(
         user_id=current_user.id,
         candidate_id=interview.candidate_id,
         application_id=interview.application_id,
         activity_type=ActivityType.SYSTEM_ACTION,
         description=f"Interview deleted for {interview.candidate.full_name} scheduled on {interview.scheduled_at.strftime('%Y-%m-%d %H:%M')}"
     )
-    db.session.add(activity)
     
     db.session.delete(interview)
     db.session.commit()
@@ -330,7 +332,7 @@ def get_interview_calendar(current_user):
         return jsonify({'message': 'Invalid date format!'}), 400
     
     # Get interviews in date range
-    interviews = Interview.query.filter(
+    interviews = with_profile(Interview.query, 'interviews.calendar').filter(
         Interview.scheduled_at >= from_date,
         Interview.scheduled_at <= to_date
     ).order_by(Interview.scheduled_at).all()
@@ -358,32 +360,32 @@ def get_interview_calendar(current_user):
 
 @interviews_bp.route('/statistics', methods=['GET'])
 @token_required
+@read_replica
 def get_interview_statistics(current_user):
-    # Count interviews by status
-    status_counts = {}
-    for status in InterviewStatus:
-        count = Interview.query.filter_by(status=status).count()
-        status_counts[status.value] = count
-    
-    # Count interviews by type
-    type_counts = {}
-    for interview_type in InterviewType:
-        count = Interview.query.filter_by(interview_type=interview_type).count()
-        type_counts[interview_type.value] = count
+    # Count interviews by status and type, with average scores, in one scan
+    counts = enum_counts(Interview, {
+        'status_distribution': (Interview.status, InterviewStatus),
+        'type_distribution': (Interview.interview_type, InterviewType)
+    }, aggregates={
+        'avg_technical': db.func.avg(Interview.technical_score),
+        'avg_communication': db.func.avg(Interview.communication_score),
+        'avg_culture_fit': db.func.avg(Interview.culture_fit_score),
+        'avg_overall': db.func.avg(Interview.overall_score)
+    })
     
     # Calculate average scores
-    avg_technical = db.session.query(db.func.avg(Interview.technical_score)).scalar() or 0
-    avg_communication = db.session.query(db.func.avg(Interview.communication_score)).scalar() or 0
-    avg_culture_fit = db.session.query(db.func.avg(Interview.culture_fit_score)).scalar() or 0
-    avg_overall = db.session.query(db.func.avg(Interview.overall_score)).scalar() or 0
+    avg_technical = counts['avg_technical'] or 0
+    avg_communication = counts['avg_communication'] or 0
+    avg_culture_fit = counts['avg_culture_fit'] or 0
+    avg_overall = counts['avg_overall'] or 0
     
     # Calculate no-show rate
-    total_interviews = Interview.query.count()
-    no_show_count = Interview.query.filter_by(status=InterviewStatus.NO_SHOW).count()
+    total_interviews = counts['total']
+    no_show_count = counts['status_distribution'][InterviewStatus.NO_SHOW.value]
     no_show_rate = (no_show_count / total_interviews) * 100 if total_interviews > 0 else 0
     
     # Upcoming interviews
-    upcoming_interviews = Interview.query.filter(
+    upcoming_interviews = with_profile(Interview.query, 'interviews.calendar').filter(
         Interview.scheduled_at > datetime.utcnow(),
         Interview.status == InterviewStatus.SCHEDULED
     ).order_by(Interview.scheduled_at).limit(5).all()
@@ -398,9 +400,9 @@ def get_interview_statistics(current_user):
     
     return jsonify({
         'total_interviews': total_interviews,
-        'completed_interviews': Interview.query.filter_by(status=InterviewStatus.COMPLETED).count(),
-        'status_distribution': status_counts,
-        'type_distribution': type_counts,
+        'completed_interviews': counts['status_distribution'][InterviewStatus.COMPLETED.value],
+        'status_distribution': counts['status_distribution'],
+        'type_distribution': counts['type_distribution'],
         'average_scores': {
             'technical': round(avg_technical, 1),
             'communication': round(avg_communication, 1),
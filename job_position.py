@@ -1,5 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, Float, Date
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, Float, Date, Index
 from sqlalchemy.orm import relationship
 import enum
 import datetime
@@ -30,6 +30,11 @@ class JobStatus(enum.Enum):
 
 class JobPosition(db.Model):
     __tablename__ = 'job_positions'
+    __table_args__ = (
+        Index('ix_job_positions_status_created_at', 'status', 'created_at'),
+        Index('ix_job_positions_created_at', 'created_at'),
+        Index('ix_job_positions_client_id', 'client_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     client_id = Column(Integer, ForeignKey('clients.id'), nullable=False)
@@ -2,14 +2,25 @@ from flask import Blueprint, request, jsonify
 from src.models.user import db, User, UserRole
 from src.models.job_position import JobPosition, JobType, JobLevel, JobStatus
 from src.models.client import Client
-from src.models.activity import Activity, ActivityType
+from src.models.candidate import Candidate
+from src.models.activity import ActivityType
 from src.routes.auth import token_required, role_required
+from src.services.response_cache import response_cache, cached_response
+from src.services.read_routing import read_replica
+from src.services.pagination import paginate, InvalidCursor
+from src.services.search_index import JOB_SEARCH
+from src.services.loading import with_profile
+from src.services.aggregates import enum_counts, group_counts
+from src.services.activity_log import log_activity
+from src.services.matching import MATCHING_ENGINE, MAX_MATCHES
 from datetime import datetime
+import click
 
 jobs_bp = Blueprint('jobs', __name__)
 
 @jobs_bp.route('/', methods=['GET'])
 @token_required
+@read_replica
 def get_jobs(current_user):
     # Get query parameters for filtering
     status = request.args.get('status')
@@ -21,7 +32,7 @@ def get_jobs(current_user):
     per_page = request.args.get('per_page', 20, type=int)
     
     # Base query
-    query = JobPosition.query
+    query = with_profile(JobPosition.query, 'jobs.list')
     
     # Apply filters
     if status:
@@ -49,15 +60,13 @@ def get_jobs(current_user):
         query = query.filter_by(client_id=client_id)
     
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            (JobPosition.title.ilike(search_term)) | 
-            (JobPosition.description.ilike(search_term)) |
-            (JobPosition.location.ilike(search_term))
-        )
+        query = JOB_SEARCH.apply(query, search)
     
-    # Pagination
-    jobs_pagination = query.order_by(JobPosition.created_at.desc()).paginate(page=page, per_page=per_page)
+    # Pagination (by page number, or by keyset when cursor= is given)
+    try:
+        jobs_pagination = paginate(query, JobPosition.created_at, JobPosition.id, page=page, per_page=per_page)
+    except InvalidCursor:
+        return jsonify({'message': 'Invalid cursor value'}), 400
     
     # Format response
     jobs_list = []
@@ -79,15 +88,19 @@ def get_jobs(current_user):
     
     return jsonify({
         'jobs': jobs_list,
-        'total': jobs_pagination.total,
-        'pages': jobs_pagination.pages,
-        'current_page': jobs_pagination.page
+        **jobs_pagination.meta
     })
 
+def job_version(job_id):
+    return db.select(JobPosition.updated_at, Client.updated_at).outerjoin(
+        Client, JobPosition.client_id == Client.id
+    ).where(JobPosition.id == job_id)
+
 @jobs_bp.route('/<int:job_id>', methods=['GET'])
 @token_required
+@cached_response('job:{job_id}', job_version)
 def get_job(current_user, job_id):
-    job = JobPosition.query.get_or_404(job_id)
+    job = with_profile(JobPosition.query, 'jobs.detail').get_or_404(job_id)
     
     # Format response with all details
     job_data = {
@@ -122,6 +135,37 @@ def get_job(current_user, job_id):
     
     return jsonify({'job': job_data})
 
+@jobs_bp.route('/<int:job_id>/matches', methods=['GET'])
+@token_required
+@read_replica
+@role_required([UserRole.ADMIN, UserRole.MANAGER, UserRole.RECRUITER])
+def get_job_matches(current_user, job_id):
+    """Best matching active candidates for a job, scored from memory"""
+    k = request.args.get('k', 20, type=int)
+    if not 1 <= k <= MAX_MATCHES:
+        return jsonify({'message': f'k must be between 1 and {MAX_MATCHES}'}), 400
+    
+    matches = MATCHING_ENGINE.job_matches(job_id, k)
+    if matches is None:
+        return jsonify({'message': 'Job position not found!'}), 404
+    
+    candidates = {candidate.id: candidate for candidate in db.session.execute(
+        db.select(Candidate.id, Candidate.full_name, Candidate.email, Candidate.status)
+        .where(Candidate.id.in_([match['id'] for match in matches]))
+    )}
+    
+    return jsonify({
+        'job_id': job_id,
+        'matches': [{
+            'candidate_id': match['id'],
+            'full_name': candidates[match['id']].full_name,
+            'email': candidates[match['id']].email,
+            'status': candidates[match['id']].status.value,
+            'score': match['score'],
+            'components': match['components']
+        } for match in matches if match['id'] in candidates]
+    })
+
 @jobs_bp.route('/', methods=['POST'])
 @token_required
 @role_required([UserRole.ADMIN, UserRole.MANAGER, UserRole.RECRUITER])
@@ -201,15 +245,15 @@ def create_job(current_user):
     db.session.add(new_job)
     
     # Log activity
-    activity = Activity(
+    log_activity(
         user_id=current_user.id,
-        job_position_id=new_job.id,
+        job_position_id=new_job,
         activity_type=ActivityType.SYSTEM_ACTION,
         description=f"Job position '{data['title']}' created"
     )
-    db.session.add(activity)
     
     db.session.commit()
+    response_cache.invalidate('jobs')
     
     return jsonify({
         'message': 'Job position created successfully!',
@@ -251,14 +295,13 @@ def update_job(current_user, job_id):
             
             # Log status change
             if old_status != new_status:
-                activity = Activity(
+                log_activity(
                     user_id=current_user.id,
                     job_position_id=job.id,
                     activity_type=ActivityType.STATUS_CHANGE,
                     description=f"Job status changed from {old_status.value} to {new_status.value}",
                     details={"old_status": old_status.value, "new_status": new_status.value}
                 )
-                db.session.add(activity)
         except ValueError:
             return jsonify({'message': 'Invalid status value!'}), 400
     
@@ -285,15 +328,15 @@ def update_job(current_user, job_id):
             setattr(job, field, data[field])
     
     # Log activity
-    activity = Activity(
+    log_activity(
         user_id=current_user.id,
         job_position_id=job.id,
         activity_type=ActivityType.SYSTEM_ACTION,
         description=f"Job position '{job.title}' updated"
     )
-    db.session.add(activity)
     
     db.session.commit()
+    response_cache.invalidate(f'job:{job_id}', 'jobs')
     
     return jsonify({'message': 'Job position updated successfully!'})
 
@@ -304,48 +347,34 @@ def delete_job(current_user, job_id):
     job = JobPosition.query.get_or_404(job_id)
     
     # Log activity before deletion
-    activity = Activity(
+    log_activity(
         user_id=current_user.id,
         activity_type=ActivityType.SYSTEM_ACTION,
         description=f"Job position '{job.title}' deleted"
     )
-    db.session.add(activity)
     
     db.session.delete(job)
     db.session.commit()
+    response_cache.invalidate(f'job:{job_id}', 'jobs')
     
     return jsonify({'message': 'Job position deleted successfully!'})
 
 @jobs_bp.route('/statistics', methods=['GET'])
 @token_required
+@read_replica
 def get_job_statistics(current_user):
-    # Count jobs by status
-    status_counts = {}
-    for status in JobStatus:
-        count = JobPosition.query.filter_by(status=status).count()
-        status_counts[status.value] = count
-    
-    # Count jobs by type
-    type_counts = {}
-    for job_type in JobType:
-        count = JobPosition.query.filter_by(job_type=job_type).count()
-        type_counts[job_type.value] = count
-    
-    # Count jobs by level
-    level_counts = {}
-    for level in JobLevel:
-        count = JobPosition.query.filter_by(job_level=level).count()
-        level_counts[level.value] = count
+    # Count jobs by status, type and level in one scan
+    counts = enum_counts(JobPosition, {
+        'status_distribution': (JobPosition.status, JobStatus),
+        'type_distribution': (JobPosition.job_type, JobType),
+        'level_distribution': (JobPosition.job_level, JobLevel)
+    })
     
     # Top locations
-    location_counts = db.session.query(
-        JobPosition.location, db.func.count(JobPosition.id)
-    ).group_by(JobPosition.location).order_by(db.func.count(JobPosition.id).desc()).limit(5).all()
-    
-    location_data = {location: count for location, count in location_counts if location}
+    location_data = group_counts(JobPosition.location, limit=5)
     
     # Recent jobs
-    recent_jobs = JobPosition.query.order_by(JobPosition.created_at.desc()).limit(5).all()
+    recent_jobs = with_profile(JobPosition.query, 'jobs.list').order_by(JobPosition.created_at.desc()).limit(5).all()
     recent_data = [{
         'id': j.id,
         'title': j.title,
@@ -355,11 +384,18 @@ def get_job_statistics(current_user):
     } for j in recent_jobs]
     
     return jsonify({
-        'total_jobs': JobPosition.query.count(),
-        'open_jobs': JobPosition.query.filter_by(status=JobStatus.OPEN).count(),
-        'status_distribution': status_counts,
-        'type_distribution': type_counts,
-        'level_distribution': level_counts,
+        'total_jobs': counts['total'],
+        'open_jobs': counts['status_distribution'][JobStatus.OPEN.value],
+        'status_distribution': counts['status_distribution'],
+        'type_distribution': counts['type_distribution'],
+        'level_distribution': counts['level_distribution'],
         'top_locations': location_data,
         'recent_jobs': recent_data
     })
+
+@jobs_bp.cli.command('reindex')
+def reindex_command():
+    """Rebuild the full-text search index for job positions"""
+    total = JOB_SEARCH.rebuild(db.session.connection())
+    db.session.commit()
+    click.echo(f"Indexed {total} job positions")
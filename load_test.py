@@ -0,0 +1,172 @@
+"""Measure API throughput under gunicorn at several worker counts.
+
+Seeds a throwaway SQLite database, then for each worker count starts gunicorn
+(gthread workers, configured like production through the environment) and
+runs concurrent clients against a read-heavy mix of list, analytics and
+application update requests for a fixed time. Raise ``--warmup`` when many
+workers boot on few cores.
+
+    python load_test.py [--workers 1,4,16] [--clients 32] [--duration 15] [--scale 0.02]
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import secrets
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))  # Same layout as main.py
+
+import jwt
+from sqlalchemy import update
+
+# (weight, method, path) of the request mix, {application_id} is filled per request
+REQUEST_MIX = [
+    (30, 'GET', '/api/candidates/?page={page}'),
+    (20, 'GET', '/api/applications/?page={page}'),
+    (15, 'GET', '/api/jobs/'),
+    (15, 'GET', '/api/analytics/dashboard'),
+    (10, 'GET', '/api/activities/recent'),
+    (10, 'PUT', '/api/applications/{application_id}'),
+]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def seed_database(env, scale):
+    """Create the schema through the app itself, then bulk insert the benchmark rows"""
+    os.environ.update(env)
+    from src.main import app
+    from src.models.user import db, User, UserRole
+    from src.benchmark_indexes import ROW_COUNTS, seed
+    from src.services.dashboard import rebuild_dashboard_summary
+
+    counts = {table: max(1, int(count * scale)) for table, count in ROW_COUNTS.items()}
+    with app.app_context():
+        seed(counts)
+        db.session.execute(update(User).where(User.id == 1).values(role=UserRole.ADMIN))
+        rebuild_dashboard_summary()
+        db.session.commit()
+    return counts
+
+
+def wait_for_server(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('gunicorn exited during startup')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'gunicorn did not listen on {port} within {timeout}s')
+
+
+def run_clients(port, token, clients, duration, counts):
+    weights = [weight for weight, _, _ in REQUEST_MIX]
+    headers = {'Authorization': f'Bearer {token}', 'Content-Type': 'application/json'}
+    latencies, errors = [], []
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client():
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        own_latencies, own_errors = [], 0
+        while time.monotonic() < stop_at:
+            _, method, path = random.choices(REQUEST_MIX, weights)[0]
+            path = path.format(page=random.randint(1, 20), application_id=random.randint(1, counts['applications']))
+            body = json.dumps({'recruiter_notes': secrets.token_hex(8)}) if method == 'PUT' else None
+
+            started = time.perf_counter()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 500:
+                    own_errors += 1
+            except (OSError, http.client.HTTPException):
+                own_errors += 1
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                continue
+            own_latencies.append((time.perf_counter() - started) * 1000)
+
+        connection.close()
+        with lock:
+            latencies.extend(own_latencies)
+            errors.append(own_errors)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return latencies, sum(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', default='1,4,16', help='comma separated gunicorn worker counts')
+    parser.add_argument('--threads', type=int, default=4, help='threads per gunicorn worker')
+    parser.add_argument('--clients', type=int, default=32, help='concurrent client connections')
+    parser.add_argument('--duration', type=float, default=15, help='seconds per worker count')
+    parser.add_argument('--warmup', type=float, default=10, help='seconds of unmeasured load while the workers boot')
+    parser.add_argument('--scale', type=float, default=0.02, help='multiplier for the seeded row counts')
+    parser.add_argument('--app', default='src.main:app', help='gunicorn application path')
+    args = parser.parse_args()
+
+    random.seed(42)
+    path = os.path.join(tempfile.mkdtemp(), 'load_test.db')
+    env = {
+        'DATABASE_URL': f'sqlite:///{path}',
+        'SECRET_KEY': secrets.token_hex(32),
+    }
+
+    started = time.perf_counter()
+    counts = seed_database(env, args.scale)
+    print(f"Seeded {sum(counts.values()):,} rows into {path} in {time.perf_counter() - started:.1f}s\n")
+
+    token = jwt.encode(
+        {'user_id': 1, 'exp': datetime.utcnow() + timedelta(hours=1)}, env['SECRET_KEY'], algorithm='HS256'
+    )
+
+    print(f"{'workers':>7} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for workers in [int(value) for value in args.workers.split(',')]:
+        port = free_port()
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}',
+             '--workers', str(workers), '--threads', str(args.threads), '--log-level', 'warning', args.app],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            env={**os.environ, **env, 'PYTHONPATH': os.path.dirname(os.path.dirname(os.path.abspath(__file__)))}
+        )
+        try:
+            wait_for_server(port, process)
+            # Workers load the app after the port opens, so let them all boot first
+            run_clients(port, token, args.clients, args.warmup, counts)
+            latencies, errors = run_clients(port, token, args.clients, args.duration, counts)
+        finally:
+            process.send_signal(signal.SIGTERM)
+            process.wait()
+
+        p50, p95 = (statistics.quantiles(latencies, n=20)[i] for i in (9, 18)) if len(latencies) > 1 else (0, 0)
+        print(f"{workers:>7} {len(latencies):>9} {len(latencies) / args.duration:>8.1f} "
+              f"{p50:>8.1f} {p95:>8.1f} {errors:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+from sqlalchemy.orm import joinedload
+from src.models.user import User
+from src.models.client import Client
+from src.models.candidate import Candidate
+from src.models.job_position import JobPosition
+from src.models.application import Application
+from src.models.interview import Interview
+from src.models.activity import Activity
+
+# Relationship loading profiles, keyed by "<blueprint>.<view>". Every related
+# row a view serializes must be loaded here, otherwise each result row lazy-loads
+# it with its own SELECT. Profiles narrow related rows with load_only(), so they
+# are meant for read-only views only.
+LOAD_PROFILES = {
+    'jobs.list': (
+        joinedload(JobPosition.client).load_only(Client.company_name),
+    ),
+    'jobs.detail': (
+        joinedload(JobPosition.client).load_only(Client.company_name),
+    ),
+    'applications.list': (
+        joinedload(Application.candidate).load_only(Candidate.full_name),
+        joinedload(Application.job_position).load_only(JobPosition.title),
+        joinedload(Application.recruiter).load_only(User.full_name),
+    ),
+    'applications.detail': (
+        joinedload(Application.candidate).load_only(Candidate.full_name),
+        joinedload(Application.job_position).load_only(JobPosition.title),
+        joinedload(Application.recruiter).load_only(User.full_name),
+    ),
+    'interviews.list': (
+        joinedload(Interview.candidate).load_only(Candidate.full_name),
+        joinedload(Interview.application).joinedload(Application.job_position).load_only(JobPosition.title),
+        joinedload(Interview.interviewer).load_only(User.full_name),
+        joinedload(Interview.client_interviewer).load_only(User.full_name),
+    ),
+    'interviews.detail': (
+        joinedload(Interview.candidate).load_only(Candidate.full_name),
+        joinedload(Interview.application).joinedload(Application.job_position).load_only(JobPosition.title),
+        joinedload(Interview.interviewer).load_only(User.full_name),
+        joinedload(Interview.client_interviewer).load_only(User.full_name),
+    ),
+    'interviews.calendar': (
+        joinedload(Interview.candidate).load_only(Candidate.full_name),
+        joinedload(Interview.application).joinedload(Application.job_position).load_only(JobPosition.title),
+        joinedload(Interview.interviewer).load_only(User.full_name),
+    ),
+    'activities.list': (
+        joinedload(Activity.user).load_only(User.full_name),
+    ),
+}
+
+
+def with_profile(query, name):
+    """Attach the loading options of profile ``name`` to ``query``"""
+    return query.options(*LOAD_PROFILES[name])
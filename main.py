@@ -8,16 +8,22 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))  # DON'T CHANGE T
 
 from flask import Flask, jsonify
 from flask_cors import CORS
+from flask_migrate import Migrate
 
 # Import models
 from src.models.user import db, User
 from src.models.client import Client
 from src.models.candidate import Candidate
+from src.models.candidate_note import CandidateNote
+from src.models.candidate_score_queue import CandidateScoreQueue
 from src.models.job_position import JobPosition
 from src.models.application import Application
+from src.models.application_stage_event import ApplicationStageEvent
 from src.models.interview import Interview
 from src.models.partner import Partner
 from src.models.activity import Activity
+from src.models.activity_daily_count import ActivityDailyCount
+from src.models.dashboard_summary import DashboardSummary
 
 # Import routes
 from src.routes.auth import auth_bp
@@ -28,22 +34,46 @@ from src.routes.applications import applications_bp
 from src.routes.interviews import interviews_bp
 from src.routes.partners import partners_bp
 from src.routes.analytics import analytics_bp
+from src.routes.activities import activities_bp
+from src.routes.search import search_bp
 from src.routes.landing import landing_bp
 
+# Import services
+from src.services.search_index import create_search_indexes
+from src.services.activity_log import activity_sink
+from src.services.auth_cache import auth_cache
+from src.services.response_cache import response_cache
+from src.services.dashboard_stream import dashboard_broadcaster
+from src.services.candidate_import import candidate_imports
+from src.services.quality_score import quality_scorer
+from src.services.database import configure_database, init_sqlite_pragmas
+from src.services.read_routing import init_read_routing
+
 def create_app(test_config=None):
     # Create and configure the app
     app = Flask(__name__, instance_relative_config=True)
     
-    # Configure database
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///database/app.db'
+    if test_config:
+        app.config.update(test_config)
+    
+    # Configure database (DATABASE_URL, pool sizes and replica from the environment)
+    configure_database(app)
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev_key_for_development')
     
     # Enable CORS
     CORS(app)
     
-    # Initialize database
+    # Initialize database and migrations
     db.init_app(app)
+    init_sqlite_pragmas(app)
+    init_read_routing(app)
+    auth_cache.init_app(app)
+    response_cache.init_app(app)
+    dashboard_broadcaster.init_app(app)
+    candidate_imports.init_app(app)
+    quality_scorer.init_app(app)
+    Migrate(app, db, render_as_batch=True)
     
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -54,6 +84,8 @@ def create_app(test_config=None):
     app.register_blueprint(interviews_bp, url_prefix='/api/interviews')
     app.register_blueprint(partners_bp, url_prefix='/api/partners')
     app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
+    app.register_blueprint(activities_bp, url_prefix='/api/activities')
+    app.register_blueprint(search_bp, url_prefix='/api')
     app.register_blueprint(landing_bp, url_prefix='/')
     
     # Error handlers
@@ -81,9 +113,13 @@ def create_app(test_config=None):
             'message': 'Internal server error'
         }), 500
     
-    # Create database tables
+    # Create database tables and search indexes
     with app.app_context():
         db.create_all()
+        create_search_indexes()
+    
+    # Write activity logs in the background
+    activity_sink.init_app(app)
     
     return app
 
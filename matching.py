@@ -0,0 +1,521 @@
+from sqlalchemy import event, select, func
+from src.models.user import db
+from src.models.candidate import Candidate, EducationLevel
+from src.models.job_position import JobPosition, JobLevel, JobStatus
+from src.services.search_index import fold
+from src.services.dashboard import INACTIVE_CANDIDATE_STATUSES
+from src.services.read_routing import use_primary
+from scipy import sparse
+from datetime import timedelta
+import numpy as np
+import re
+import threading
+import time
+import zlib
+
+# Skill terms are hashed into a fixed number of buckets, so the matrices never
+# need a vocabulary rebuild when new words show up
+TERM_BUCKETS = 1 << 18
+
+# How often a process checks whether other processes changed candidates or jobs
+REFRESH_INTERVAL = 30
+
+# How far behind the last watermark each check rescans, for rows stamped at
+# flush whose transaction committed after a later one
+LATE_COMMIT_MARGIN = timedelta(seconds=REFRESH_INTERVAL)
+
+# Tombstoned rows are compacted away once they make up this share of a pool
+COMPACT_RATIO = 0.25
+
+MAX_MATCHES = 200
+
+MATCH_WEIGHTS = {'skills': 0.55, 'experience': 0.2, 'salary': 0.1, 'location': 0.1, 'education': 0.05}
+
+# Score of a component whose inputs are missing on either side
+NEUTRAL = 0.5
+
+# Years of experience expected at each job level
+LEVEL_YEARS = {
+    JobLevel.ENTRY: 0, JobLevel.JUNIOR: 1, JobLevel.MID_LEVEL: 3, JobLevel.SENIOR: 5,
+    JobLevel.MANAGER: 7, JobLevel.DIRECTOR: 10, JobLevel.EXECUTIVE: 12
+}
+
+EDUCATION_RANK = {
+    EducationLevel.PRIMARY: 0, EducationLevel.SECONDARY: 1, EducationLevel.HIGH_SCHOOL: 2,
+    EducationLevel.VOCATIONAL: 3, EducationLevel.COLLEGE: 4, EducationLevel.BACHELOR: 5,
+    EducationLevel.MASTER: 6, EducationLevel.PHD: 7
+}
+
+# Education expected at each job level, bachelor when not listed
+LEVEL_EDUCATION = {
+    JobLevel.ENTRY: EDUCATION_RANK[EducationLevel.HIGH_SCHOOL],
+    JobLevel.JUNIOR: EDUCATION_RANK[EducationLevel.COLLEGE],
+}
+
+# Filler words of requirements texts (English and folded Vietnamese)
+STOP_WORDS = frozenset((
+    'and', 'or', 'the', 'with', 'of', 'in', 'to', 'for', 'an', 'on', 'at', 'as', 'is', 'be', 'are',
+    'year', 'years', 'experience', 'experienced', 'knowledge', 'skill', 'skills', 'good', 'strong',
+    'ability', 'able', 'work', 'working', 'plus', 'least', 'preferred', 'required', 'degree',
+    'nam', 'kinh', 'nghiem', 'va', 'co', 'ky', 'nang', 'tot', 'biet', 'su', 'dung', 'lam', 'viec',
+    'tro', 'len', 'uu', 'tien', 'kha', 'hieu', 'cac', 'trong', 'tren', 'it', 'nhat'
+))
+
+CANDIDATE_COLUMNS = (
+    Candidate.id, Candidate.status, Candidate.skills, Candidate.years_of_experience,
+    Candidate.education_level, Candidate.expected_salary, Candidate.city
+)
+JOB_COLUMNS = (
+    JobPosition.id, JobPosition.status, JobPosition.title, JobPosition.requirements, JobPosition.job_level,
+    JobPosition.salary_min, JobPosition.salary_max, JobPosition.location, JobPosition.remote_option
+)
+
+
+def skill_terms(*texts):
+    """Sorted, distinct term buckets of free text"""
+    buckets = {
+        zlib.crc32(token.encode()) % TERM_BUCKETS
+        for text in texts
+        for token in re.findall(r'\w+', fold(text))
+        if len(token) > 1 and not token.isdigit() and token not in STOP_WORDS
+    }
+    return np.array(sorted(buckets), dtype=np.int32)
+
+
+def _place(value):
+    """Fold a city or location so "Hà Nội" and "Hanoi" compare equal"""
+    return fold(value).replace(' ', '') if value and value.strip() else ''
+
+
+# Candidate cities are stored as codes into this table, -1 when unknown,
+# so that a job's location is compared once per distinct city. PLACE_NAMES
+# maps codes back to places; both only grow, as pools built earlier keep
+# their codes, and are bounded by the number of distinct cities.
+PLACES = {}
+PLACE_NAMES = []
+_places_lock = threading.Lock()
+
+
+def _place_code(value):
+    place = _place(value)
+    if not place:
+        return -1
+    code = PLACES.get(place)
+    if code is None:
+        with _places_lock:
+            code = PLACES.get(place)
+            if code is None:
+                # Name first, so a code seen by readers always has one
+                PLACE_NAMES.append(place)
+                code = PLACES[place] = len(PLACE_NAMES) - 1
+    return code
+
+
+def _number(value):
+    return np.nan if value is None else float(value)
+
+
+def candidate_features(row, active_only=True):
+    """``(terms, fields)`` of a candidate row, or None when the candidate is not matched"""
+    if active_only and row.status in INACTIVE_CANDIDATE_STATUSES:
+        return None
+    return skill_terms(row.skills), {
+        'years': _number(row.years_of_experience),
+        'education': _number(EDUCATION_RANK.get(row.education_level)),
+        'salary': _number(row.expected_salary),
+        'city': _place_code(row.city),
+    }
+
+
+def job_features(row, open_only=True):
+    """``(terms, fields)`` of a job row, or None when the job is not matched"""
+    if open_only and row.status != JobStatus.OPEN:
+        return None
+    level = row.job_level
+    return skill_terms(row.title, row.requirements), {
+        'required_years': _number(LEVEL_YEARS.get(level)),
+        'expected_education': float(LEVEL_EDUCATION.get(level, EDUCATION_RANK[EducationLevel.BACHELOR])),
+        'salary_ceiling': _number(row.salary_max if row.salary_max is not None else row.salary_min),
+        'location': _place(row.location),
+        'remote': bool(row.remote_option),
+    }
+
+
+class _Growable:
+    """A 1-D array with amortized appends; views taken earlier stay valid"""
+
+    def __init__(self, dtype, values=()):
+        self._data = np.array(values, dtype=dtype)
+        self.size = len(self._data)
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype)
+        end = self.size + len(values)
+        if end > len(self._data):
+            grown = np.empty(max(end, 2 * len(self._data), 16), dtype=self._data.dtype)
+            grown[:self.size] = self._data[:self.size]
+            self._data = grown
+        self._data[self.size:end] = values
+        self.size = end
+
+    def __setitem__(self, index, value):
+        self._data[index] = value
+
+    @property
+    def values(self):
+        return self._data[:self.size]
+
+
+class FeaturePool:
+    """Term rows (CSR) and numeric feature columns of one side of the match, by model id.
+
+    Rows are append-only: an update tombstones the old row and appends a new
+    one, and the pool compacts itself once too many rows are dead. ``df``
+    counts the live rows containing each term bucket.
+    """
+
+    def __init__(self, dtypes, rows=()):
+        self.dtypes = dtypes
+        self.rows = {}
+        self.version = 0
+        self._ids = _Growable(np.int64)
+        self._alive = _Growable(bool)
+        # int32 like scipy's own index arrays, so snapshots never copy them
+        self._indptr = _Growable(np.int32, [0])
+        self._indices = _Growable(np.int32)
+        self._ones = np.ones(0, dtype=np.float32)
+        self._columns = {name: _Growable(dtype) for name, dtype in dtypes.items()}
+        self.df = np.zeros(TERM_BUCKETS, dtype=np.int32)
+        self.upsert(rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def upsert(self, rows):
+        """Add or replace ``(id, features)`` rows, where None features remove the row"""
+        removed, added = [], []
+        for row_id, features in rows:
+            removed.append(row_id)
+            if features is not None:
+                added.append((row_id, features))
+        self.remove(removed, compact=False)
+
+        if added:
+            start = self._ids.size
+            terms = [features[0] for _, features in added]
+            self._ids.extend([row_id for row_id, _ in added])
+            self._alive.extend(np.ones(len(added), dtype=bool))
+            self._indptr.extend(self._indptr.values[-1] + np.cumsum([len(row_terms) for row_terms in terms]))
+            if any(len(row_terms) for row_terms in terms):
+                all_terms = np.concatenate(terms)
+                self._indices.extend(all_terms)
+                np.add.at(self.df, all_terms, 1)
+            for name, column in self._columns.items():
+                column.extend([features[1][name] for _, features in added])
+            for offset, (row_id, _) in enumerate(added):
+                self.rows[row_id] = start + offset
+
+        self.version += 1
+        self._compact_if_sparse()
+
+    def remove(self, row_ids, compact=True):
+        indptr, indices = self._indptr.values, self._indices.values
+        for row_id in row_ids:
+            row = self.rows.pop(row_id, None)
+            if row is not None:
+                self._alive[row] = False
+                np.subtract.at(self.df, indices[indptr[row]:indptr[row + 1]], 1)
+        if compact:
+            self.version += 1
+            self._compact_if_sparse()
+
+    def snapshot(self):
+        """Consistent views of the pool for scoring outside the lock"""
+        size, nnz = self._ids.size, self._indices.size
+        if len(self._ones) < nnz:
+            self._ones = np.ones(max(nnz, 2 * len(self._ones)), dtype=np.float32)
+        matrix = sparse.csr_matrix(
+            (self._ones[:nnz], self._indices.values, self._indptr.values), shape=(size, TERM_BUCKETS)
+        )
+        columns = {name: column.values[:size] for name, column in self._columns.items()}
+        return self._ids.values[:size], self._alive.values[:size].copy(), matrix, columns
+
+    def _compact_if_sparse(self):
+        size = self._ids.size
+        if size < 1024 or size - len(self.rows) < COMPACT_RATIO * size:
+            return
+
+        ids, alive, matrix, columns = self.snapshot()
+        matrix = matrix[alive]
+        self._ids = _Growable(np.int64, ids[alive])
+        self._alive = _Growable(bool, np.ones(len(self.rows), dtype=bool))
+        self._indptr = _Growable(np.int32, matrix.indptr)
+        self._indices = _Growable(np.int32, matrix.indices)
+        self._columns = {name: _Growable(self.dtypes[name], values[alive]) for name, values in columns.items()}
+        self.rows = {row_id: row for row, row_id in enumerate(self._ids.values.tolist())}
+
+
+CANDIDATE_DTYPES = {'years': np.float32, 'education': np.float32, 'salary': np.float32, 'city': np.int32}
+JOB_DTYPES = {
+    'required_years': np.float32, 'expected_education': np.float32, 'salary_ceiling': np.float32,
+    'location': object, 'remote': bool
+}
+
+
+def _ratio_scores(have, want):
+    """min(have / want, 1), 1 when nothing is wanted and NEUTRAL when either side is unknown"""
+    have, want = np.asarray(have, dtype=np.float32), np.asarray(want, dtype=np.float32)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = np.where(want > 0, np.clip(have / want, 0, 1), 1.0)
+    return np.where(np.isnan(have) | np.isnan(want), NEUTRAL, scores).astype(np.float32)
+
+
+def _location_scores(cities, locations, remote):
+    """1 when the candidate's city is part of the job location (or the job is remote), else 0"""
+    if np.ndim(cities):
+        # One job against many candidates
+        location = str(locations)
+        # A snapshot: other threads append places meanwhile
+        names = PLACE_NAMES[:]
+        matched = np.zeros(len(names) + 1, dtype=bool)
+        for code, place in enumerate(names):
+            matched[code] = place in location
+        # Code -1 picks the trailing False
+        matched = matched[cities]
+        known = (cities >= 0) & bool(location)
+    else:
+        # One candidate against many jobs
+        city = PLACE_NAMES[cities] if cities >= 0 else ''
+        matched = np.array([bool(city) and city in location for location in locations], dtype=bool)
+        known = (locations != '') & bool(city)
+    scores = np.where(known, matched.astype(np.float32), NEUTRAL)
+    return np.where(remote, 1.0, scores).astype(np.float32)
+
+
+def _field_scores(candidate, job):
+    """Numeric component scores, broadcasting one side's scalars over the other side's columns"""
+    return {
+        'experience': _ratio_scores(candidate['years'], job['required_years']),
+        'education': _ratio_scores(candidate['education'], job['expected_education']),
+        # Candidates asking for more than the ceiling score ceiling / expected
+        'salary': _ratio_scores(job['salary_ceiling'], candidate['salary']),
+        'location': _location_scores(candidate['city'], job['location'], job['remote']),
+    }
+
+
+class MatchingEngine:
+    """Scores candidates against jobs over in-memory feature matrices.
+
+    The candidate pool (all active candidates) and the job pool (open jobs)
+    are built on first use and kept in step with this process's commits.
+    Other processes' writes are folded in from rows updated since the last
+    check, at most every ``REFRESH_INTERVAL`` seconds, and deletions trigger
+    a rebuild. Those refresh queries always read the primary. Skill terms
+    are weighted by their IDF over the candidate pool and compared by cosine
+    similarity; each match scans the whole pool with one sparse
+    matrix-vector product plus a few vectorized numeric columns.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self.candidates = None
+        self.jobs = None
+        self._checked_at = 0
+        self._watermarks = {}
+        self._weights_cache = None
+
+    def job_matches(self, job_id, k):
+        """Top ``k`` candidates for a job, None when the job does not exist"""
+        row = db.session.execute(select(*JOB_COLUMNS).where(JobPosition.id == job_id)).first()
+        if row is None:
+            return None
+        terms, fields = job_features(row, open_only=False)
+
+        self._refresh()
+        with self._lock:
+            ids, alive, matrix, columns = self.candidates.snapshot()
+            weights, norms = self._weights()
+
+        skills = _skill_scores(matrix, norms, terms, weights)
+        return _top(ids, alive, skills, _field_scores(columns, fields), k)
+
+    def candidate_matches(self, candidate_id, k):
+        """Top ``k`` open jobs for a candidate, None when the candidate does not exist"""
+        row = db.session.execute(select(*CANDIDATE_COLUMNS).where(Candidate.id == candidate_id)).first()
+        if row is None:
+            return None
+        terms, fields = candidate_features(row, active_only=False)
+
+        self._refresh()
+        with self._lock:
+            ids, alive, matrix, columns = self.jobs.snapshot()
+            weights, _ = self._weights()
+            # The job pool is small, so its norms are computed per request
+            norms = np.sqrt(matrix @ weights)
+
+        skills = _skill_scores(matrix, norms, terms, weights)
+        return _top(ids, alive, skills, _field_scores(fields, columns), k)
+
+    def rebuild(self):
+        candidate_rows = db.session.execute(select(*CANDIDATE_COLUMNS)).all()
+        job_rows = db.session.execute(select(*JOB_COLUMNS)).all()
+        watermarks = self._current_watermarks()
+
+        candidates = FeaturePool(CANDIDATE_DTYPES, ((row.id, candidate_features(row)) for row in candidate_rows))
+        jobs = FeaturePool(JOB_DTYPES, ((row.id, job_features(row)) for row in job_rows))
+
+        with self._lock:
+            self.candidates, self.jobs = candidates, jobs
+            self._watermarks, self._checked_at = watermarks, time.monotonic()
+            self._weights_cache = None
+
+        return len(candidates), len(jobs)
+
+    def apply(self, candidates=(), jobs=()):
+        """Fold committed ``(id, features)`` changes into the pools"""
+        with self._lock:
+            if self.candidates is None:
+                return
+            if candidates:
+                self.candidates.upsert(candidates)
+            if jobs:
+                self.jobs.upsert(jobs)
+
+    @property
+    def built(self):
+        return self.candidates is not None
+
+    def _weights(self):
+        """IDF² of every term bucket over the candidate pool, and the candidate row norms under it"""
+        version = self.candidates.version
+        if self._weights_cache is None or self._weights_cache[0] != version:
+            df = self.candidates.df
+            idf = np.log((len(self.candidates) + 1) / (df + 1), dtype=np.float32) + 1
+            # Terms no candidate has cannot match, leave them out of every norm
+            weights = np.where(df > 0, idf * idf, 0).astype(np.float32)
+            _, _, matrix, _ = self.candidates.snapshot()
+            self._weights_cache = (version, weights, np.sqrt(matrix @ weights))
+        return self._weights_cache[1], self._weights_cache[2]
+
+    def _refresh(self):
+        # A lagging replica would hide rows behind the watermark for good
+        if self.candidates is None:
+            with self._refresh_lock, use_primary():
+                if self.candidates is None:
+                    self.rebuild()
+            return
+        if time.monotonic() - self._checked_at <= REFRESH_INTERVAL or not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            self._checked_at = time.monotonic()
+            with use_primary():
+                self._fold_recent_changes()
+        finally:
+            self._refresh_lock.release()
+
+    def _fold_recent_changes(self):
+        watermarks = self._current_watermarks()
+
+        # updated_at is stamped at flush, so a transaction that commits late
+        # can land rows behind the last watermark, even with an unchanged
+        # maximum: rescan a margin behind it on every check
+        candidate_rows = db.session.execute(
+            select(*CANDIDATE_COLUMNS).where(Candidate.updated_at >= self._watermarks['candidates'][1] - LATE_COMMIT_MARGIN)
+        ).all() if self._watermarks['candidates'][1] else []
+        job_rows = db.session.execute(
+            select(*JOB_COLUMNS).where(JobPosition.updated_at >= self._watermarks['jobs'][1] - LATE_COMMIT_MARGIN)
+        ).all() if self._watermarks['jobs'][1] else []
+        self.apply(
+            [(row.id, candidate_features(row)) for row in candidate_rows],
+            [(row.id, job_features(row)) for row in job_rows]
+        )
+
+        # Fewer matchable rows than the database has means rows were deleted
+        # (or the delta missed something), so start over
+        if (len(self.candidates), len(self.jobs)) != (watermarks['candidates'][0], watermarks['jobs'][0]):
+            self.rebuild()
+        else:
+            self._watermarks = watermarks
+
+    @staticmethod
+    def _current_watermarks():
+        """Matchable row count and latest ``updated_at`` of candidates and jobs"""
+        candidates = db.session.execute(select(
+            select(func.count()).where(Candidate.status.notin_(INACTIVE_CANDIDATE_STATUSES)).scalar_subquery(),
+            select(func.max(Candidate.updated_at)).scalar_subquery()
+        )).one()
+        jobs = db.session.execute(select(
+            select(func.count()).where(JobPosition.status == JobStatus.OPEN).scalar_subquery(),
+            select(func.max(JobPosition.updated_at)).scalar_subquery()
+        )).one()
+        return {'candidates': tuple(candidates), 'jobs': tuple(jobs)}
+
+
+def _skill_scores(matrix, norms, terms, weights):
+    """IDF-weighted cosine between one term set and every row of ``matrix``"""
+    terms = terms[weights[terms] > 0] if len(terms) else terms
+    if not len(terms):
+        return np.zeros(matrix.shape[0], dtype=np.float32)
+
+    query = np.zeros(TERM_BUCKETS, dtype=np.float32)
+    query[terms] = weights[terms]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = (matrix @ query) / (norms * np.sqrt(query.sum()))
+    return np.nan_to_num(scores, nan=0.0, posinf=0.0).astype(np.float32)
+
+
+def _top(ids, alive, skills, fields, k):
+    """The ``k`` best live rows by weighted score, with their component scores"""
+    components = {'skills': skills, **{name: np.broadcast_to(values, skills.shape) for name, values in fields.items()}}
+    total = sum(MATCH_WEIGHTS[name] * values for name, values in components.items())
+    total = np.where(alive, total, -np.inf)
+
+    k = min(k, int(alive.sum()))
+    if k <= 0:
+        return []
+    best = np.argpartition(-total, k - 1)[:k]
+    best = best[np.lexsort((ids[best], -total[best]))]
+
+    return [{
+        'id': int(ids[row]),
+        'score': round(float(total[row]), 4),
+        'components': {name: round(float(values[row]), 4) for name, values in components.items()}
+    } for row in best]
+
+
+MATCHING_ENGINE = MatchingEngine()
+
+_PENDING_KEY = 'matching_changes'
+
+
+@event.listens_for(db.session, 'after_flush')
+def collect_matching_changes(session, flush_context):
+    """Remember the features of flushed candidates and jobs until the transaction commits"""
+    if not MATCHING_ENGINE.built:
+        return
+    pending = session.info.setdefault(_PENDING_KEY, ({}, {}))
+
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Candidate):
+            pending[0][obj.id] = candidate_features(obj)
+        elif isinstance(obj, JobPosition):
+            pending[1][obj.id] = job_features(obj)
+
+    for obj in session.deleted:
+        if isinstance(obj, Candidate):
+            pending[0][obj.id] = None
+        elif isinstance(obj, JobPosition):
+            pending[1][obj.id] = None
+
+
+@event.listens_for(db.session, 'after_commit')
+def apply_matching_changes(session):
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes:
+        MATCHING_ENGINE.apply(list(changes[0].items()), list(changes[1].items()))
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def discard_matching_changes(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,57 @@
+"""add indexes for hot filter and sort columns
+
+Revision ID: 3f1c2a9d8b47
+Revises: 
+Create Date: 2026-10-17 09:12:41.208833
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d8b47'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns, unique)
+INDEXES = [
+    ('ix_candidates_status_created_at', 'candidates', ['status', 'created_at'], False),
+    ('ix_candidates_created_at', 'candidates', ['created_at'], False),
+    ('ix_candidates_email', 'candidates', ['email'], False),
+    ('uq_applications_job_position_candidate', 'applications', ['job_position_id', 'candidate_id'], True),
+    ('ix_applications_candidate_id', 'applications', ['candidate_id'], False),
+    ('ix_applications_status_created_at', 'applications', ['status', 'created_at'], False),
+    ('ix_applications_created_at', 'applications', ['created_at'], False),
+    ('ix_applications_applied_at', 'applications', ['applied_at'], False),
+    ('ix_applications_screened_at', 'applications', ['screened_at'], False),
+    ('ix_applications_interviewed_at', 'applications', ['interviewed_at'], False),
+    ('ix_applications_shortlisted_at', 'applications', ['shortlisted_at'], False),
+    ('ix_applications_client_reviewed_at', 'applications', ['client_reviewed_at'], False),
+    ('ix_applications_hired_at', 'applications', ['hired_at'], False),
+    ('ix_interviews_scheduled_at', 'interviews', ['scheduled_at'], False),
+    ('ix_interviews_status_scheduled_at', 'interviews', ['status', 'scheduled_at'], False),
+    ('ix_interviews_application_id', 'interviews', ['application_id'], False),
+    ('ix_interviews_candidate_id', 'interviews', ['candidate_id'], False),
+    ('ix_activities_created_at', 'activities', ['created_at'], False),
+    ('ix_activities_candidate_id_created_at', 'activities', ['candidate_id', 'created_at'], False),
+    ('ix_activities_user_id_created_at', 'activities', ['user_id', 'created_at'], False),
+    ('ix_activities_activity_type_created_at', 'activities', ['activity_type', 'created_at'], False),
+    ('ix_activities_application_id', 'activities', ['application_id'], False),
+    ('ix_job_positions_status_created_at', 'job_positions', ['status', 'created_at'], False),
+    ('ix_job_positions_created_at', 'job_positions', ['created_at'], False),
+    ('ix_job_positions_client_id', 'job_positions', ['client_id'], False),
+]
+
+
+def upgrade():
+    # Tables are created by db.create_all(), which also creates these indexes
+    # on a fresh database, so only add the ones that are missing
+    for name, table, columns, unique in INDEXES:
+        op.create_index(name, table, columns, unique=unique, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, columns, unique in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,44 @@
+"""add the activity_daily_counts rollup table
+
+Revision ID: 8d24e6b1c5a3
+Revises: 3f1c2a9d8b47
+Create Date: 2026-10-17 14:03:27.541092
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d24e6b1c5a3'
+down_revision = '3f1c2a9d8b47'
+branch_labels = None
+depends_on = None
+
+ACTIVITY_TYPES = (
+    'STATUS_CHANGE', 'NOTE_ADDED', 'DOCUMENT_ADDED', 'INTERVIEW_SCHEDULED',
+    'INTERVIEW_COMPLETED', 'EMAIL_SENT', 'SYSTEM_ACTION', 'OTHER'
+)
+
+
+def upgrade():
+    # db.create_all() already creates the table on a fresh database
+    if sa.inspect(op.get_bind()).has_table('activity_daily_counts'):
+        return
+
+    op.create_table(
+        'activity_daily_counts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('activity_type', sa.Enum(*ACTIVITY_TYPES, name='activitytype'), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('day', 'activity_type', 'user_id', name='uq_activity_daily_counts_day_type_user')
+    )
+    # Run `flask activities rebuild-rollup` afterwards to count existing activities
+
+
+def downgrade():
+    op.drop_table('activity_daily_counts')
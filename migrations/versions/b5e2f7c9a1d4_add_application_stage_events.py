@@ -0,0 +1,61 @@
+"""add the append-only application_stage_events table
+
+Revision ID: b5e2f7c9a1d4
+Revises: 8d24e6b1c5a3
+Create Date: 2026-10-17 16:41:09.318520
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e2f7c9a1d4'
+down_revision = '8d24e6b1c5a3'
+branch_labels = None
+depends_on = None
+
+APPLICATION_STATUSES = (
+    'NEW', 'SCREENING', 'INTERVIEW', 'SHORTLISTED', 'CLIENT_REVIEW', 'HIRED', 'REJECTED', 'WITHDRAWN'
+)
+
+# The applications table already created the PostgreSQL enum type
+APPLICATION_STATUS = sa.Enum(*APPLICATION_STATUSES, name='applicationstatus').with_variant(
+    postgresql.ENUM(*APPLICATION_STATUSES, name='applicationstatus', create_type=False), 'postgresql'
+)
+
+INDEXES = (
+    ('ix_application_stage_events_at', ['at']),
+    ('ix_application_stage_events_to_status_at', ['to_status', 'at']),
+    ('ix_application_stage_events_application_id_at', ['application_id', 'at']),
+)
+
+
+def upgrade():
+    # db.create_all() already creates the table on a fresh database
+    if sa.inspect(op.get_bind()).has_table('application_stage_events'):
+        return
+
+    op.create_table(
+        'application_stage_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('application_id', sa.Integer(), nullable=False),
+        sa.Column('from_status', APPLICATION_STATUS, nullable=True),
+        sa.Column('to_status', APPLICATION_STATUS, nullable=False),
+        sa.Column('at', sa.DateTime(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['application_id'], ['applications.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    for name, columns in INDEXES:
+        op.create_index(name, 'application_stage_events', columns)
+    # Run `flask applications backfill-stage-events` afterwards to rebuild the history of existing applications
+
+
+def downgrade():
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name='application_stage_events')
+
+    op.drop_table('application_stage_events')
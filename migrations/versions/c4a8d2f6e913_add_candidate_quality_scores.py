@@ -0,0 +1,40 @@
+"""index candidates.quality_score and add the candidate_score_queue dirty set
+
+Revision ID: c4a8d2f6e913
+Revises: e91c3b7d5f20
+Create Date: 2026-10-17 19:36:52.604118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4a8d2f6e913'
+down_revision = 'e91c3b7d5f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    # db.create_all() already creates both on a fresh database
+    if not inspector.has_table('candidate_score_queue'):
+        op.create_table(
+            'candidate_score_queue',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('candidate_id', sa.Integer(), nullable=False),
+            sa.Column('marked_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['candidate_id'], ['candidates.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'ix_candidates_quality_score' not in {index['name'] for index in inspector.get_indexes('candidates')}:
+        op.create_index('ix_candidates_quality_score', 'candidates', ['quality_score'])
+    # Run `flask candidates score-quality --full` afterwards to score existing candidates
+
+
+def downgrade():
+    op.drop_index('ix_candidates_quality_score', table_name='candidates')
+    op.drop_table('candidate_score_queue')
@@ -0,0 +1,156 @@
+"""move candidate notes from candidates.notes into candidate_notes
+
+Revision ID: e91c3b7d5f20
+Revises: b5e2f7c9a1d4
+Create Date: 2026-10-17 18:12:45.907311
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime
+import re
+
+
+# revision identifiers, used by Alembic.
+revision = 'e91c3b7d5f20'
+down_revision = 'b5e2f7c9a1d4'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# add_candidate_note appended "\n\n[YYYY-MM-DD HH:MM by Full Name]\n<note>"
+NOTE_HEADER = re.compile(r'(?:^|\n\n)\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}) by ([^\]\n]*)\]\n')
+HEADER_FORMAT = '%Y-%m-%d %H:%M'
+
+candidates = sa.table(
+    'candidates',
+    sa.column('id', sa.Integer),
+    sa.column('notes', sa.Text),
+    sa.column('notes_count', sa.Integer),
+    sa.column('created_at', sa.DateTime)
+)
+candidate_notes = sa.table(
+    'candidate_notes',
+    sa.column('candidate_id', sa.Integer),
+    sa.column('user_id', sa.Integer),
+    sa.column('author_name', sa.String),
+    sa.column('body', sa.Text),
+    sa.column('created_at', sa.DateTime)
+)
+users = sa.table('users', sa.column('id', sa.Integer), sa.column('full_name', sa.String))
+
+
+def split_notes(blob, created_at):
+    """Split a notes blob into (created_at, author_name, body) entries.
+
+    Text before the first header (notes given when the candidate was created)
+    becomes an entry without author, dated with the candidate.
+    """
+    parts = NOTE_HEADER.split(blob)
+    entries = []
+    if parts[0].strip():
+        entries.append((created_at, None, parts[0].strip()))
+    for i in range(1, len(parts), 3):
+        entries.append((datetime.strptime(parts[i], HEADER_FORMAT), parts[i + 1], parts[i + 2].strip()))
+    return entries
+
+
+def _move_notes(bind):
+    # Headers only carry the author's name, resolve the unambiguous ones to users
+    user_ids = {}
+    for user_id, full_name in bind.execute(sa.select(users.c.id, users.c.full_name)):
+        user_ids[full_name] = None if full_name in user_ids else user_id
+
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(candidates.c.id, candidates.c.notes, candidates.c.created_at)
+            .where(candidates.c.id > last_id, candidates.c.notes.isnot(None), candidates.c.notes != '')
+            .order_by(candidates.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+
+        notes, counts = [], []
+        for candidate_id, blob, created_at in rows:
+            entries = split_notes(blob, created_at)
+            notes.extend({
+                'candidate_id': candidate_id,
+                'user_id': user_ids.get(author),
+                'author_name': author,
+                'body': body,
+                'created_at': at
+            } for at, author, body in entries)
+            counts.append({'candidate_id': candidate_id, 'count': len(entries)})
+
+        if notes:
+            bind.execute(candidate_notes.insert(), notes)
+        bind.execute(
+            candidates.update().where(candidates.c.id == sa.bindparam('candidate_id'))
+            .values(notes_count=sa.bindparam('count')),
+            counts
+        )
+        last_id = rows[-1].id
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    # db.create_all() already creates the table on a fresh database
+    if not inspector.has_table('candidate_notes'):
+        op.create_table(
+            'candidate_notes',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('candidate_id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('author_name', sa.String(length=100), nullable=True),
+            sa.Column('body', sa.Text(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['candidate_id'], ['candidates.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_candidate_notes_candidate_id_created_at', 'candidate_notes', ['candidate_id', 'created_at'])
+
+    columns = {column['name'] for column in inspector.get_columns('candidates')}
+    if 'notes_count' not in columns:
+        with op.batch_alter_table('candidates', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('notes_count', sa.Integer(), nullable=False, server_default='0'))
+
+    if 'notes' in columns:
+        _move_notes(bind)
+        with op.batch_alter_table('candidates', schema=None) as batch_op:
+            batch_op.drop_column('notes')
+
+
+def downgrade():
+    bind = op.get_bind()
+    with op.batch_alter_table('candidates', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('notes', sa.Text(), nullable=True))
+
+    # Rebuild the blobs in the format add_candidate_note used to write
+    rows = bind.execute(
+        sa.select(candidate_notes.c.candidate_id, candidate_notes.c.author_name,
+                  candidate_notes.c.body, candidate_notes.c.created_at)
+        .order_by(candidate_notes.c.candidate_id, candidate_notes.c.created_at)
+    )
+    blobs = {}
+    for candidate_id, author, body, created_at in rows:
+        entry = body if author is None else f"[{created_at.strftime(HEADER_FORMAT)} by {author}]\n{body}"
+        blobs.setdefault(candidate_id, []).append(entry)
+
+    if blobs:
+        bind.execute(
+            candidates.update().where(candidates.c.id == sa.bindparam('candidate_id'))
+            .values(notes=sa.bindparam('blob')),
+            [{'candidate_id': candidate_id, 'blob': '\n\n'.join(entries)} for candidate_id, entries in blobs.items()]
+        )
+
+    with op.batch_alter_table('candidates', schema=None) as batch_op:
+        batch_op.drop_column('notes_count')
+
+    op.drop_index('ix_candidate_notes_candidate_id_created_at', table_name='candidate_notes')
+    op.drop_table('candidate_notes')
@@ -0,0 +1,60 @@
+"""unique index for activity_daily_counts rows without a user
+
+Revision ID: f2b7a4c81d06
+Revises: c4a8d2f6e913
+Create Date: 2026-10-17 21:12:40.318275
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b7a4c81d06'
+down_revision = 'c4a8d2f6e913'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'uq_activity_daily_counts_day_type_no_user'
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    # db.create_all() already creates the index on a fresh database
+    if INDEX_NAME in {index['name'] for index in inspector.get_indexes('activity_daily_counts')}:
+        return
+
+    # Merge the duplicate rows the old update-then-insert could leave for
+    # activities without a user, keeping the lowest id of each day and type
+    op.execute("""
+        UPDATE activity_daily_counts SET count = (
+            SELECT SUM(other.count) FROM activity_daily_counts other
+            WHERE other.day = activity_daily_counts.day
+              AND other.activity_type = activity_daily_counts.activity_type
+              AND other.user_id IS NULL
+        )
+        WHERE user_id IS NULL AND id = (
+            SELECT MIN(other.id) FROM activity_daily_counts other
+            WHERE other.day = activity_daily_counts.day
+              AND other.activity_type = activity_daily_counts.activity_type
+              AND other.user_id IS NULL
+        )
+    """)
+    op.execute("""
+        DELETE FROM activity_daily_counts
+        WHERE user_id IS NULL AND id > (
+            SELECT MIN(other.id) FROM activity_daily_counts other
+            WHERE other.day = activity_daily_counts.day
+              AND other.activity_type = activity_daily_counts.activity_type
+              AND other.user_id IS NULL
+        )
+    """)
+
+    op.create_index(
+        INDEX_NAME, 'activity_daily_counts', ['day', 'activity_type'], unique=True,
+        sqlite_where=sa.text('user_id IS NULL'), postgresql_where=sa.text('user_id IS NULL')
+    )
+
+
+def downgrade():
+    op.drop_index(INDEX_NAME, table_name='activity_daily_counts')
@@ -0,0 +1,105 @@
+from flask import request, abort
+from sqlalchemy import and_, or_
+from datetime import datetime
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class Page:
+    def __init__(self, items, meta):
+        self.items = items
+        self.meta = meta
+
+
+def encode_cursor(value, row_id, direction):
+    if isinstance(value, datetime):
+        value = {'dt': value.isoformat()}
+    payload = json.dumps({'v': value, 'id': row_id, 'd': direction}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        value, row_id, direction = payload['v'], int(payload['id']), payload['d']
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value['dt'])
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursor(cursor)
+
+    if direction not in ('next', 'prev'):
+        raise InvalidCursor(cursor)
+
+    return value, row_id, direction
+
+
+def paginate(query, sort_column, id_column, page, per_page, descending=True):
+    """Paginate ``query`` by page number, or by keyset when the request has ``cursor=``.
+
+    Page mode keeps the existing ``total``/``pages``/``current_page`` response.
+    Cursor mode seeks on ``(sort_column, id_column)`` instead of scanning an
+    OFFSET, returns opaque ``next_cursor``/``prev_cursor`` values and only counts
+    the filtered set when ``with_total=true`` is passed. An empty ``cursor=``
+    starts at the first page.
+    """
+    cursor = request.args.get('cursor')
+
+    if cursor is None:
+        order = sort_column.desc() if descending else sort_column.asc()
+        pagination = query.order_by(order).paginate(page=page, per_page=per_page)
+        return Page(pagination.items, {
+            'total': pagination.total,
+            'pages': pagination.pages,
+            'current_page': pagination.page
+        })
+
+    if per_page < 1:
+        abort(404)
+
+    base_query = query
+    direction = 'next'
+    if cursor:
+        value, row_id, direction = decode_cursor(cursor)
+
+        # Walking backwards flips the comparison, the order is flipped below
+        before = descending if direction == 'next' else not descending
+        if before:
+            query = query.filter(or_(sort_column < value, and_(sort_column == value, id_column < row_id)))
+        else:
+            query = query.filter(or_(sort_column > value, and_(sort_column == value, id_column > row_id)))
+
+    reverse = descending if direction == 'next' else not descending
+    if reverse:
+        ordered = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        ordered = query.order_by(sort_column.asc(), id_column.asc())
+
+    # Fetch one extra row to learn whether another page exists
+    rows = ordered.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    items = rows[:per_page]
+
+    sort_key, id_key = sort_column.key, id_column.key
+
+    if direction == 'next':
+        next_cursor = encode_cursor(getattr(items[-1], sort_key), getattr(items[-1], id_key), 'next') if has_more else None
+        prev_cursor = encode_cursor(getattr(items[0], sort_key), getattr(items[0], id_key), 'prev') if cursor and items else None
+    else:
+        items.reverse()
+        prev_cursor = encode_cursor(getattr(items[0], sort_key), getattr(items[0], id_key), 'prev') if has_more else None
+        next_cursor = encode_cursor(getattr(items[-1], sort_key), getattr(items[-1], id_key), 'next') if items else None
+
+    meta = {
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor,
+        'per_page': per_page
+    }
+
+    if request.args.get('with_total', 'false').lower() in ('1', 'true'):
+        meta['total'] = base_query.order_by(None).count()
+
+    return Page(items, meta)
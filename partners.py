@@ -1,13 +1,19 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import db, User, UserRole
 from src.models.partner import Partner, PartnerType, PartnerStatus
-from src.models.activity import Activity, ActivityType
+from src.models.activity import ActivityType
 from src.routes.auth import token_required, role_required
+from src.services.response_cache import response_cache, cached_response
+from src.services.read_routing import read_replica
+from src.services.pagination import paginate, InvalidCursor
+from src.services.aggregates import enum_counts
+from src.services.activity_log import log_activity
 
 partners_bp = Blueprint('partners', __name__)
 
 @partners_bp.route('/', methods=['GET'])
 @token_required
+@read_replica
 def get_partners(current_user):
     # Get query parameters for filtering
     status = request.args.get('status')
@@ -42,8 +48,11 @@ def get_partners(current_user):
             (Partner.primary_contact_email.ilike(search_term))
         )
     
-    # Pagination
-    partners_pagination = query.order_by(Partner.created_at.desc()).paginate(page=page, per_page=per_page)
+    # Pagination (by page number, or by keyset when cursor= is given)
+    try:
+        partners_pagination = paginate(query, Partner.created_at, Partner.id, page=page, per_page=per_page)
+    except InvalidCursor:
+        return jsonify({'message': 'Invalid cursor value'}), 400
     
     # Format response
     partners_list = []
@@ -63,13 +72,15 @@ def get_partners(current_user):
     
     return jsonify({
         'partners': partners_list,
-        'total': partners_pagination.total,
-        'pages': partners_pagination.pages,
-        'current_page': partners_pagination.page
+        **partners_pagination.meta
     })
 
+def partner_version(partner_id):
+    return db.select(Partner.updated_at).where(Partner.id == partner_id)
+
 @partners_bp.route('/<int:partner_id>', methods=['GET'])
 @token_required
+@cached_response('partner:{partner_id}', partner_version)
 def get_partner(current_user, partner_id):
     partner = Partner.query.get_or_404(partner_id)
     
@@ -156,12 +167,11 @@ def create_partner(current_user):
     db.session.add(new_partner)
     
     # Log activity
-    activity = Activity(
+    log_activity(
         user_id=current_user.id,
         activity_type=ActivityType.SYSTEM_ACTION,
         description=f"Partner {data['name']} created"
     )
-    db.session.add(activity)
     
     db.session.commit()
     
@@ -215,14 +225,14 @@ def update_partner(current_user, partner_id):
             partner.user_id = None
     
     # Log activity
-    activity = Activity(
+    log_activity(
         user_id=current_user.id,
         activity_type=ActivityType.SYSTEM_ACTION,
         description=f"Partner {partner.name} updated"
     )
-    db.session.add(activity)
     
     db.session.commit()
+    response_cache.invalidate(f'partner:{partner_id}')
     
     return jsonify({'message': 'Partner updated successfully!'})
 
@@ -233,36 +243,32 @@ def delete_partner(current_user, partner_id):
     partner = Partner.query.get_or_404(partner_id)
     
     # Log activity before deletion
-    activity = Activity(
+    log_activity(
         user_id=current_user.id,
         activity_type=ActivityType.SYSTEM_ACTION,
         description=f"Partner {partner.name} deleted"
     )
-    db.session.add(activity)
     
     db.session.delete(partner)
     db.session.commit()
+    response_cache.invalidate(f'partner:{partner_id}')
     
     return jsonify({'message': 'Partner deleted successfully!'})
 
 @partners_bp.route('/statistics', methods=['GET'])
 @token_required
+@read_replica
 def get_partner_statistics(current_user):
-    # Count partners by type
-    type_counts = {}
-    for partner_type in PartnerType:
-        count = Partner.query.filter_by(partner_type=partner_type).count()
-        type_counts[partner_type.value] = count
-    
-    # Count partners by status
-    status_counts = {}
-    for status in PartnerStatus:
-        count = Partner.query.filter_by(status=status).count()
-        status_counts[status.value] = count
-    
-    # Calculate average metrics
-    avg_quality_rating = db.session.query(db.func.avg(Partner.quality_rating)).scalar() or 0
-    avg_success_rate = db.session.query(db.func.avg(Partner.success_rate)).scalar() or 0
+    # Count partners by type and status, with average metrics, in one scan
+    counts = enum_counts(Partner, {
+        'type_distribution': (Partner.partner_type, PartnerType),
+        'status_distribution': (Partner.status, PartnerStatus)
+    }, aggregates={
+        'avg_quality_rating': db.func.avg(Partner.quality_rating),
+        'avg_success_rate': db.func.avg(Partner.success_rate)
+    })
+    avg_quality_rating = counts['avg_quality_rating'] or 0
+    avg_success_rate = counts['avg_success_rate'] or 0
     
     # Top performing partners
     top_partners = Partner.query.order_by(Partner.success_rate.desc()).limit(5).all()
@@ -276,10 +282,10 @@ def get_partner_statistics(current_user):
     } for p in top_partners]
     
     return jsonify({
-        'total_partners': Partner.query.count(),
-        'active_partners': Partner.query.filter_by(status=PartnerStatus.ACTIVE).count(),
-        'type_distribution': type_counts,
-        'status_distribution': status_counts,
+        'total_partners': counts['total'],
+        'active_partners': counts['status_distribution'][PartnerStatus.ACTIVE.value],
+        'type_distribution': counts['type_distribution'],
+        'status_distribution': counts['status_distribution'],
         'average_metrics': {
             'quality_rating': round(avg_quality_rating, 1),
             'success_rate': round(avg_success_rate, 1)
@@ -0,0 +1,259 @@
+from sqlalchemy import event, inspect, select, update, insert, delete, bindparam
+from src.models.user import db
+from src.models.candidate import Candidate
+from src.models.candidate_score_queue import CandidateScoreQueue
+from src.models.application import Application, ApplicationStatus
+from src.models.interview import Interview, InterviewStatus
+from src.services.matching import EDUCATION_RANK
+from datetime import datetime
+import numpy as np
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 2000
+
+# Share of the score of each component; components without data for a
+# candidate (no interviews yet, say) are left out and the rest reweighted
+QUALITY_WEIGHTS = {'completeness': 0.2, 'experience': 0.2, 'education': 0.15, 'interviews': 0.3, 'outcomes': 0.15}
+
+# Profile fields counted for completeness, also the candidate columns that
+# put a candidate back in the dirty set when they change
+PROFILE_COLUMNS = (
+    'phone', 'date_of_birth', 'city', 'education_level', 'major', 'university', 'skills',
+    'languages', 'years_of_experience', 'resume_url', 'current_position', 'expected_salary'
+)
+
+# Years of experience that earn the full experience component
+FULL_EXPERIENCE_YEARS = 10
+
+# How far an application got; NEW and WITHDRAWN say nothing about the candidate
+OUTCOME_VALUES = {
+    ApplicationStatus.SCREENING: 0.4,
+    ApplicationStatus.INTERVIEW: 0.6,
+    ApplicationStatus.SHORTLISTED: 0.7,
+    ApplicationStatus.CLIENT_REVIEW: 0.8,
+    ApplicationStatus.HIRED: 1.0,
+    ApplicationStatus.REJECTED: 0.0,
+}
+
+# 0-5 ratings; a no-show counts as a 0 even without one
+RATING_COLUMNS = (Interview.technical_score, Interview.communication_score, Interview.culture_fit_score)
+MAX_RATING = 5
+
+
+def _group_means(index, values, size):
+    """Mean of ``values`` per position in ``index``, NaN where a position has none"""
+    known = ~np.isnan(values)
+    counts = np.bincount(index[known], minlength=size)
+    sums = np.bincount(index[known], weights=values[known], minlength=size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def compute_quality_scores(connection, candidate_ids):
+    """``{candidate_id: score}`` from 0 to 100 for existing candidates, in three queries.
+
+    Each component is a 0-1 column over the whole batch: profile completeness,
+    experience, education, the mean interview rating and the mean outcome of
+    the candidate's applications.
+    """
+    table = Candidate.__table__
+    profiles = connection.execute(
+        select(table.c.id, *[table.c[column] for column in PROFILE_COLUMNS]).where(table.c.id.in_(candidate_ids))
+    ).all()
+    if not profiles:
+        return {}
+
+    ids = [row.id for row in profiles]
+    position = {candidate_id: i for i, candidate_id in enumerate(ids)}
+    size = len(ids)
+
+    filled = np.array([[value is not None and value != '' for value in row[1:]] for row in profiles])
+    years = np.array([row.years_of_experience for row in profiles], dtype=float)
+    education = np.array([EDUCATION_RANK.get(row.education_level) for row in profiles], dtype=float)
+
+    interviews = connection.execute(
+        select(Interview.candidate_id, Interview.status, Interview.overall_score, *RATING_COLUMNS)
+        .where(Interview.candidate_id.in_(ids), Interview.status.in_((InterviewStatus.COMPLETED, InterviewStatus.NO_SHOW)))
+    ).all()
+    ratings = np.array([row[2:] for row in interviews], dtype=float).reshape(-1, 1 + len(RATING_COLUMNS))
+    # The overall score, else the mean of the detailed ones that were given
+    detailed = ratings[:, 1:]
+    given = (~np.isnan(detailed)).sum(axis=1)
+    detailed_mean = np.where(given > 0, np.nansum(detailed, axis=1) / np.maximum(given, 1), np.nan)
+    rating = np.where(np.isnan(ratings[:, 0]), detailed_mean, ratings[:, 0])
+    no_show = np.array([row.status == InterviewStatus.NO_SHOW for row in interviews], dtype=bool)
+    rating = np.where(no_show, 0, rating) / MAX_RATING
+
+    applications = connection.execute(
+        select(Application.candidate_id, Application.status)
+        .where(Application.candidate_id.in_(ids), Application.status.in_(list(OUTCOME_VALUES)))
+    ).all()
+    outcomes = np.array([OUTCOME_VALUES[row.status] for row in applications], dtype=float)
+
+    components = np.column_stack([
+        filled.mean(axis=1),
+        np.clip(years / FULL_EXPERIENCE_YEARS, 0, 1),
+        education / max(EDUCATION_RANK.values()),
+        _group_means(np.array([position[row.candidate_id] for row in interviews], dtype=int), rating, size),
+        _group_means(np.array([position[row.candidate_id] for row in applications], dtype=int), outcomes, size),
+    ])
+    weights = np.array(list(QUALITY_WEIGHTS.values()))
+    known = ~np.isnan(components)
+    scores = 100 * np.where(known, components, 0) @ weights / (known @ weights)
+
+    return dict(zip(ids, np.round(scores, 1).tolist()))
+
+
+def write_quality_scores(connection, scores):
+    """Store ``{candidate_id: score}`` with one executemany UPDATE.
+
+    ``updated_at`` is kept as it was: a recomputed score is not a profile
+    edit, and bumping it would make every batch look like fresh activity.
+    """
+    if not scores:
+        return
+    table = Candidate.__table__
+    connection.execute(
+        update(table).where(table.c.id == bindparam('candidate_id'))
+        .values(quality_score=bindparam('score'), updated_at=table.c.updated_at),
+        [{'candidate_id': candidate_id, 'score': score} for candidate_id, score in scores.items()]
+    )
+
+
+def queue_quality_scores(session, candidate_ids):
+    """Add candidates to the dirty set in the session's transaction, the scorer is woken on commit"""
+    candidate_ids = set(candidate_ids) - {None}
+    if candidate_ids:
+        now = datetime.utcnow()
+        session.connection().execute(insert(CandidateScoreQueue.__table__), [
+            {'candidate_id': candidate_id, 'marked_at': now} for candidate_id in sorted(candidate_ids)
+        ])
+        session.info[_QUEUED_KEY] = True
+
+
+def drain_quality_queue(batch_size=BATCH_SIZE):
+    """Rescore the queued candidates batch by batch, committing each; returns the number scored"""
+    table = CandidateScoreQueue.__table__
+    scored = 0
+    while True:
+        rows = db.session.execute(select(table.c.id, table.c.candidate_id).order_by(table.c.id).limit(batch_size)).all()
+        if not rows:
+            return scored
+
+        connection = db.session.connection()
+        scores = compute_quality_scores(connection, list({row.candidate_id for row in rows}))
+        write_quality_scores(connection, scores)
+        # By id, so candidates queued again meanwhile stay queued
+        connection.execute(delete(table).where(table.c.id.in_([row.id for row in rows])))
+        db.session.commit()
+        scored += len(scores)
+
+
+def rebuild_quality_scores(batch_size=BATCH_SIZE, on_progress=None):
+    """Rescore every candidate in id order, committing each batch; returns the number scored"""
+    last_id = scored = 0
+    while True:
+        ids = db.session.execute(
+            select(Candidate.id).where(Candidate.id > last_id).order_by(Candidate.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return scored
+
+        connection = db.session.connection()
+        scores = compute_quality_scores(connection, ids)
+        write_quality_scores(connection, scores)
+        db.session.commit()
+        scored += len(scores)
+        last_id = ids[-1]
+        if on_progress:
+            on_progress(scored)
+
+
+class QualityScorer:
+    """Drains the dirty set in the background.
+
+    Commits that queue candidates wake the worker, which waits
+    ``QUALITY_SCORE_DELAY`` seconds so bursts are scored as one batch.
+    Candidates queued by other processes (the CLI, say) are picked up every
+    ``QUALITY_SCORE_POLL_INTERVAL`` seconds once the worker runs.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._queued = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def init_app(self, app):
+        app.config.setdefault('QUALITY_SCORE_BATCH_SIZE', BATCH_SIZE)
+        app.config.setdefault('QUALITY_SCORE_DELAY', 2.0)
+        app.config.setdefault('QUALITY_SCORE_POLL_INTERVAL', 60.0)
+        self._app = app
+        self.batch_size = app.config['QUALITY_SCORE_BATCH_SIZE']
+        self.delay = app.config['QUALITY_SCORE_DELAY']
+        self.poll_interval = app.config['QUALITY_SCORE_POLL_INTERVAL']
+
+    def notify(self):
+        if self._app is None:
+            return
+        self._ensure_worker()
+        self._queued.set()
+
+    def _ensure_worker(self):
+        # Per process, so that forked server workers each get their own thread
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name='quality-scorer', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            if self._queued.wait(self.poll_interval):
+                # Coalesce bursts of commits into one drain
+                self._queued.wait(self.delay)
+            self._queued.clear()
+            try:
+                with self._app.app_context():
+                    drain_quality_queue(self.batch_size)
+            except Exception:
+                logger.exception("Quality score update failed")
+
+
+quality_scorer = QualityScorer()
+
+_QUEUED_KEY = 'quality_scores_queued'
+
+
+@event.listens_for(db.session, 'after_flush')
+def queue_flushed_candidates(session, flush_context):
+    """Queue candidates that were created, edited, or whose applications or interviews changed"""
+    deleted = {obj.id for obj in session.deleted if isinstance(obj, Candidate)}
+    candidate_ids = set()
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (Application, Interview)):
+            if obj in session.new or obj in session.deleted or session.is_modified(obj):
+                candidate_ids.add(obj.candidate_id)
+        elif isinstance(obj, Candidate) and obj not in session.deleted:
+            if obj in session.new or session.is_modified(obj) and any(
+                inspect(obj).attrs[column].history.has_changes() for column in PROFILE_COLUMNS
+            ):
+                candidate_ids.add(obj.id)
+
+    queue_quality_scores(session, candidate_ids - deleted)
+
+
+@event.listens_for(db.session, 'after_commit')
+def wake_quality_scorer(session):
+    if session.info.pop(_QUEUED_KEY, None):
+        quality_scorer.notify()
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def discard_queued_candidates(session, previous_transaction):
+    session.info.pop(_QUEUED_KEY, None)
@@ -0,0 +1,29 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import threading
+
+_local = threading.local()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    statements = getattr(_local, 'statements', None)
+    if statements is not None:
+        statements.append(statement)
+
+
+@contextmanager
+def count_statements():
+    """Collect the SQL statements this thread issues inside the block.
+
+    Used by the query budget tests: a test client request runs in the calling
+    thread, while the background activity writer and other workers are not
+    counted.
+    """
+    statements = []
+    _local.statements = statements
+    try:
+        yield statements
+    finally:
+        _local.statements = None
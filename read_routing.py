@@ -0,0 +1,126 @@
+from flask import g, has_app_context, has_request_context, current_app, request
+from flask_sqlalchemy.session import Session
+from itsdangerous import URLSafeTimedSerializer, BadSignature
+from sqlalchemy import event
+from contextlib import contextmanager
+from functools import wraps
+
+REPLICA_BIND = 'replica'
+
+# Signed "wrote at" marker of the user's last committed write. Browsers send
+# the cookie back by themselves; other clients echo the header.
+STICKY_COOKIE = 'mps_last_write'
+STICKY_HEADER = 'X-Last-Write'
+
+_WROTE_KEY = 'wrote'
+
+
+class RoutingSession(Session):
+    """Send the reads of ``@read_replica`` views to the ``replica`` bind.
+
+    Everything else uses the primary: views without the decorator, flushes and
+    DML statements, and any read after this session has written, so a request
+    always reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._use_replica(clause):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _use_replica(self, clause):
+        if not has_app_context() or not g.get('read_replica'):
+            return False
+        if self._flushing or self.info.get(_WROTE_KEY):
+            return False
+        if clause is not None and getattr(clause, 'is_dml', False):
+            return False
+        return REPLICA_BIND in self._db.engines
+
+
+def read_replica(f):
+    """Serve a read-only view from the replica, when one is configured.
+
+    Users who committed a write within ``REPLICA_STICKY_SECONDS`` stay on the
+    primary, so they do not read data older than their own changes while the
+    replica catches up. The write time travels with the client as a signed
+    marker, so every worker process sees it and it expires on its own.
+    """
+    @wraps(f)
+    def decorated_function(current_user, *args, **kwargs):
+        if _wrote_recently(current_user.id):
+            return f(current_user, *args, **kwargs)
+
+        g.read_replica = True
+        try:
+            return f(current_user, *args, **kwargs)
+        finally:
+            g.pop('read_replica', None)
+
+    return decorated_function
+
+
+@contextmanager
+def use_primary():
+    """Run a block of a ``@read_replica`` view, typically a write, on the primary"""
+    routed = g.pop('read_replica', None)
+    try:
+        yield
+    finally:
+        if routed:
+            g.read_replica = routed
+
+
+def init_read_routing(app):
+    """Hand the sticky marker to clients whose request committed a write"""
+    app.config.setdefault('REPLICA_STICKY_SECONDS', 10)
+
+    @app.after_request
+    def set_sticky_marker(response):
+        user = g.get('current_user')
+        if g.pop('wrote', None) and user is not None:
+            marker = _serializer().dumps(user.id)
+            max_age = current_app.config['REPLICA_STICKY_SECONDS']
+            response.set_cookie(STICKY_COOKIE, marker, max_age=max_age, httponly=True,
+                                secure=request.is_secure, samesite='Lax')
+            response.headers[STICKY_HEADER] = marker
+        return response
+
+
+def _serializer():
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='read-replica-sticky')
+
+
+def _wrote_recently(user_id):
+    marker = request.headers.get(STICKY_HEADER) or request.cookies.get(STICKY_COOKIE)
+    if not marker:
+        return False
+    try:
+        # Signed with the user's id, so one user's marker never pins another
+        return _serializer().loads(marker, max_age=current_app.config['REPLICA_STICKY_SECONDS']) == user_id
+    except BadSignature:
+        return False
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def mark_written(session, flush_context):
+    session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def mark_bulk_written(orm_execute_state):
+    # Bulk INSERT/UPDATE/DELETE statements write without a flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def record_commit(session):
+    """Start the sticky window of the current user once their writes commit"""
+    if session.info.get(_WROTE_KEY) and has_request_context():
+        g.wrote = True
+
+
+@event.listens_for(RoutingSession, 'after_soft_rollback')
+def discard_writes(session, previous_transaction):
+    session.info.pop(_WROTE_KEY, None)
@@ -0,0 +1,436 @@
+from sqlalchemy import select, func, case, or_, text
+from src.models.candidate import Candidate, CandidateStatus
+from src.models.client import Client
+from src.models.job_position import JobPosition
+from src.models.application import Application, ApplicationStatus
+from src.models.interview import Interview
+from src.models.partner import Partner
+from src.services.sql_dates import days_between, month_of, month_start, week_start
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import csv
+import io
+import json
+import re
+import tempfile
+import numpy as np
+
+# Analytics computations shared by the analytics views and the export report.
+# Each takes a connection and a date range and returns plain dicts, so they can
+# run on any connection, including one per worker thread.
+
+FUNNEL_STAGES = (
+    ('applied', Application.applied_at),
+    ('screened', Application.screened_at),
+    ('interviewed', Application.interviewed_at),
+    ('shortlisted', Application.shortlisted_at),
+    ('client_reviewed', Application.client_reviewed_at),
+    ('hired', Application.hired_at)
+)
+
+# Conversion rate name -> (stage, previous stage)
+FUNNEL_RATES = (
+    ('screen_rate', 'screened', 'applied'),
+    ('interview_rate', 'interviewed', 'screened'),
+    ('shortlist_rate', 'shortlisted', 'interviewed'),
+    ('client_review_rate', 'client_reviewed', 'shortlisted'),
+    ('hire_rate', 'hired', 'client_reviewed'),
+    ('overall_rate', 'hired', 'applied')
+)
+
+FUNNEL_MODES = ('events', 'cohort')
+
+# Cohort period start dates, weeks start on Monday
+COHORT_BUCKETS = {
+    'week': week_start,
+    'month': month_start
+}
+
+SOURCE_BREAKDOWNS = ('partner', 'job')
+
+
+def _funnel(counts):
+    """Stage counts and stage-to-stage conversion rates from a row or mapping of counts"""
+    if not isinstance(counts, dict):
+        counts = counts._mapping
+    stages = {stage: counts[stage] or 0 for stage, _ in FUNNEL_STAGES}
+
+    return {
+        'funnel_stages': stages,
+        'conversion_rates': {
+            rate: round(stages[stage] / stages[previous] * 100, 1) if stages[previous] > 0 else 0
+            for rate, stage, previous in FUNNEL_RATES
+        }
+    }
+
+
+def recruitment_funnel(connection, from_date, to_date, mode='events', bucket=None):
+    result = {'mode': mode}
+
+    if mode == 'events':
+        # Stage events that happened inside the window, all counted in one scan
+        in_window = {stage: column.between(from_date, to_date) for stage, column in FUNNEL_STAGES}
+        row = connection.execute(select(*[
+            func.sum(case((condition, 1), else_=0)).label(stage) for stage, condition in in_window.items()
+        ]).where(or_(*in_window.values()))).one()
+        result.update(_funnel(row))
+        return result
+
+    # Applications that entered in the window, followed through every later stage
+    cohort = (Application.applied_at >= from_date, Application.applied_at <= to_date)
+    reached = [func.count(column).label(stage) for stage, column in FUNNEL_STAGES]
+
+    if not bucket:
+        row = connection.execute(select(*reached).where(*cohort)).one()
+        result.update(_funnel(row))
+        return result
+
+    period = COHORT_BUCKETS[bucket](Application.applied_at).label('period')
+    rows = connection.execute(select(period, *reached).where(*cohort).group_by(period).order_by(period)).all()
+
+    cohorts = [{'period': row.period, **_funnel(row)} for row in rows]
+    totals = {stage: sum(c['funnel_stages'][stage] for c in cohorts) for stage, _ in FUNNEL_STAGES}
+    result.update(_funnel(totals))
+    result['bucket'] = bucket
+    result['cohorts'] = cohorts
+    return result
+
+
+def _duration_stats(days):
+    if not len(days):
+        return {'hires': 0, 'avg_days': 0, 'p50_days': 0, 'p90_days': 0}
+
+    p50, p90 = np.percentile(days, [50, 90])
+    return {
+        'hires': int(len(days)),
+        'avg_days': round(float(days.mean()), 1),
+        'p50_days': round(float(p50), 1),
+        'p90_days': round(float(p90), 1)
+    }
+
+
+def _grouped_duration_stats(keys, days):
+    """Hires, average, p50 and p90 of ``days`` per distinct key, ordered by key"""
+    groups, inverse = np.unique(np.array(keys), return_inverse=True)
+
+    # Sort once by group, then every group is a contiguous slice
+    order = np.argsort(inverse, kind='stable')
+    bounds = np.searchsorted(inverse[order], np.arange(len(groups) + 1))
+    sorted_days = days[order]
+
+    return {
+        group.item(): _duration_stats(sorted_days[bounds[i]:bounds[i + 1]])
+        for i, group in enumerate(groups)
+    }
+
+
+def time_to_hire(connection, from_date, to_date):
+    # One narrow fetch of plain columns, no ORM objects
+    days_to_hire = days_between(Application.hired_at, Application.applied_at)
+    rows = connection.execute(
+        select(
+            days_to_hire,
+            month_of(Application.hired_at),
+            JobPosition.job_type,
+            JobPosition.job_level,
+            JobPosition.client_id,
+            Client.company_name
+        ).select_from(Application).join(
+            JobPosition, Application.job_position_id == JobPosition.id
+        ).join(
+            Client, JobPosition.client_id == Client.id
+        ).where(
+            Application.hired_at >= from_date,
+            Application.hired_at <= to_date,
+            Application.applied_at.isnot(None)
+        )
+    ).all()
+
+    if not rows:
+        overall = _duration_stats(np.array([]))
+        by_job_type, by_job_level, by_client, monthly_trend = {}, {}, [], []
+    else:
+        days, months, job_types, job_levels, client_ids, client_names = zip(*rows)
+
+        # Whole days, as timedelta.days counted them. The day difference is a float,
+        # so round to the second first or exact multiples of a day can floor short
+        days = np.floor(np.round(np.array(days, dtype=float) * 86400) / 86400)
+
+        overall = _duration_stats(days)
+        by_job_type = _grouped_duration_stats([job_type.value for job_type in job_types], days)
+        by_job_level = _grouped_duration_stats(
+            [job_level.value if job_level else 'Not specified' for job_level in job_levels], days
+        )
+
+        # Fastest 5 clients
+        names = dict(zip(client_ids, client_names))
+        by_client = sorted(
+            ({'client_id': int(client_id), 'client_name': names[client_id], **stats}
+             for client_id, stats in _grouped_duration_stats(client_ids, days).items()),
+            key=lambda client: client['avg_days']
+        )[:5]
+
+        monthly_trend = [{'month': month, **stats} for month, stats in _grouped_duration_stats(months, days).items()]
+
+    return {
+        'overall_avg_days': overall['avg_days'],
+        'overall_p50_days': overall['p50_days'],
+        'overall_p90_days': overall['p90_days'],
+        'total_hires': overall['hires'],
+        'by_job_type': by_job_type,
+        'by_job_level': by_job_level,
+        'by_client': by_client,
+        'monthly_trend': monthly_trend
+    }
+
+
+def _outcome_columns(status_column, hired, rejected):
+    """Total, hired and rejected counts for a grouped query, as conditional sums"""
+    return (
+        func.count().label('total'),
+        func.sum(case((status_column == hired, 1), else_=0)).label('hired'),
+        func.sum(case((status_column == rejected, 1), else_=0)).label('rejected')
+    )
+
+
+def _outcome_counts(row, total_key='total_candidates'):
+    hired, rejected = row.hired or 0, row.rejected or 0
+    return {
+        total_key: row.total,
+        'hired': hired,
+        'rejected': rejected,
+        'in_process': row.total - hired - rejected,
+        'hire_rate': round(hired / row.total * 100, 1) if row.total else 0
+    }
+
+
+def source_effectiveness(connection, from_date, to_date, breakdowns=()):
+    in_window = (Candidate.created_at >= from_date, Candidate.created_at <= to_date)
+    source = func.coalesce(func.nullif(Candidate.source, ''), 'Unknown').label('source')
+    candidate_outcomes = _outcome_columns(Candidate.status, CandidateStatus.HIRED, CandidateStatus.REJECTED)
+
+    # One grouped scan, however many candidates fall in the window
+    rows = connection.execute(
+        select(source, *candidate_outcomes).where(*in_window).group_by(source).order_by(func.count().desc(), source)
+    ).all()
+
+    result = {'source_effectiveness': [{'source': row.source, **_outcome_counts(row)} for row in rows]}
+
+    if 'partner' in breakdowns:
+        # Candidates are attributed to a partner when their source is the partner's name
+        rows = connection.execute(
+            select(Partner.id, Partner.name, Partner.partner_type, *candidate_outcomes).join(
+                Candidate, Candidate.source == Partner.name
+            ).where(*in_window).group_by(Partner.id, Partner.name, Partner.partner_type).order_by(
+                func.count().desc(), Partner.name
+            )
+        ).all()
+
+        result['by_partner'] = [{
+            'partner_id': row.id,
+            'partner_name': row.name,
+            'partner_type': row.partner_type.value,
+            **_outcome_counts(row)
+        } for row in rows]
+
+    if 'job' in breakdowns:
+        # Outcomes of the applications made by the window's candidates, per source and job
+        application_outcomes = _outcome_columns(Application.status, ApplicationStatus.HIRED, ApplicationStatus.REJECTED)
+        rows = connection.execute(
+            select(source, JobPosition.id, JobPosition.title, *application_outcomes).select_from(Candidate).join(
+                Application, Application.candidate_id == Candidate.id
+            ).join(
+                JobPosition, JobPosition.id == Application.job_position_id
+            ).where(*in_window).group_by(source, JobPosition.id, JobPosition.title).order_by(
+                func.count().desc(), source, JobPosition.id
+            )
+        ).all()
+
+        result['by_job'] = [{
+            'source': row.source,
+            'job_position_id': row.id,
+            'job_title': row.title,
+            **_outcome_counts(row, total_key='total_applications')
+        } for row in rows]
+
+    return result
+
+
+def report_summary(connection, from_date, to_date):
+    def count(column):
+        return select(func.count()).where(column >= from_date, column <= to_date).scalar_subquery()
+
+    row = connection.execute(select(
+        count(Candidate.created_at).label('total_candidates'),
+        count(Application.created_at).label('total_applications'),
+        count(Interview.created_at).label('total_interviews'),
+        count(Application.hired_at).label('total_hires')
+    )).one()
+
+    return dict(row._mapping)
+
+
+# pg_export_snapshot() ids, checked before being spliced into SET TRANSACTION SNAPSHOT
+SNAPSHOT_ID = re.compile(r'^[0-9A-F]+(-[0-9A-F]+)+$')
+
+REPORT_SECTIONS = (
+    ('summary', report_summary),
+    ('recruitment_funnel', recruitment_funnel),
+    ('time_to_hire', time_to_hire),
+    ('source_effectiveness', source_effectiveness),
+)
+
+
+def _concurrent_sections(engine, from_date, to_date):
+    """Run the sections in parallel, each importing one exported PostgreSQL snapshot"""
+    with engine.connect().execution_options(isolation_level='REPEATABLE READ') as leader, leader.begin():
+        snapshot = leader.execute(text('SELECT pg_export_snapshot()')).scalar()
+        if not SNAPSHOT_ID.match(snapshot):
+            raise ValueError(f'Unexpected snapshot id {snapshot!r}')
+
+        def run(compute):
+            with engine.connect().execution_options(isolation_level='REPEATABLE READ') as connection, connection.begin():
+                # Must be the first statement of the transaction, and the
+                # leader must stay open until every section has imported it
+                connection.exec_driver_sql(f"SET TRANSACTION SNAPSHOT '{snapshot}'")
+                return compute(connection, from_date, to_date)
+
+        with ThreadPoolExecutor(max_workers=len(REPORT_SECTIONS)) as pool:
+            futures = [(name, pool.submit(run, compute)) for name, compute in REPORT_SECTIONS]
+            return {name: future.result() for name, future in futures}
+
+
+def _sequential_sections(engine, from_date, to_date):
+    """Run the sections one after another inside a single read transaction"""
+    with engine.connect() as connection:
+        if engine.dialect.name == 'sqlite':
+            # pysqlite only opens a transaction before writes; without one
+            # every SELECT would read the latest WAL state
+            connection.exec_driver_sql('BEGIN')
+        try:
+            return {name: compute(connection, from_date, to_date) for name, compute in REPORT_SECTIONS}
+        finally:
+            connection.rollback()
+
+
+def build_report(engine, from_date, to_date):
+    """Compute every report section from one snapshot of the database.
+
+    On PostgreSQL the sections run concurrently, each on its own connection
+    importing a snapshot exported by a leader transaction. SQLite cannot share
+    a snapshot between connections, so there the sections run in turn inside
+    one read transaction. Either way rows committed while the report runs,
+    including status changes, land in all sections or none.
+    """
+    generated_at = datetime.utcnow()
+    to_date = min(to_date, generated_at)
+
+    if engine.dialect.name == 'postgresql':
+        sections = _concurrent_sections(engine, from_date, to_date)
+    else:
+        sections = _sequential_sections(engine, from_date, to_date)
+
+    return {
+        'report_date': generated_at.isoformat(),
+        'date_range': {
+            'from': from_date.isoformat(),
+            'to': to_date.isoformat()
+        },
+        **sections
+    }
+
+
+# Flat export layout shared by the NDJSON, CSV and XLSX formats
+REPORT_COLUMNS = ('section', 'group', 'key', 'metric', 'value')
+
+# Fields that identify a row of a list section; the remaining fields become metrics
+RECORD_KEYS = {
+    'cohorts': ('period',),
+    'by_client': ('client_id', 'client_name'),
+    'monthly_trend': ('month',),
+    'source_effectiveness': ('source',),
+    'by_partner': ('partner_id', 'partner_name', 'partner_type'),
+    'by_job': ('source', 'job_position_id', 'job_title'),
+}
+
+
+def _metrics(values, prefix=''):
+    """Yield (metric, value) pairs, nested dicts become dotted metric names"""
+    for name, value in values.items():
+        if isinstance(value, dict):
+            yield from _metrics(value, f'{prefix}{name}.')
+        else:
+            yield f'{prefix}{name}', value
+
+
+def report_records(report):
+    """Flatten a report into (section, group, key, metric, value) records"""
+    for section, _ in REPORT_SECTIONS:
+        for name, value in report[section].items():
+            if isinstance(value, list):
+                fields = RECORD_KEYS[name]
+                for record in value:
+                    key = ' / '.join(str(record[field]) for field in fields)
+                    metrics = {field: item for field, item in record.items() if field not in fields}
+                    for metric, item in _metrics(metrics):
+                        yield section, name, key, metric, item
+            elif isinstance(value, dict) and any(isinstance(item, dict) for item in value.values()):
+                for key, item in value.items():
+                    for metric, metric_value in _metrics(item):
+                        yield section, name, key, metric, metric_value
+            elif isinstance(value, dict):
+                for metric, item in _metrics(value):
+                    yield section, name, '', metric, item
+            else:
+                yield section, '', '', name, value
+
+
+def ndjson_lines(report):
+    yield json.dumps({'report_date': report['report_date'], 'date_range': report['date_range']}) + '\n'
+    for record in report_records(report):
+        yield json.dumps(dict(zip(REPORT_COLUMNS, record))) + '\n'
+
+
+def csv_lines(report):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(REPORT_COLUMNS)
+    for record in report_records(report):
+        writer.writerow(record)
+        # Hand each line over as soon as it is written
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+XLSX_CHUNK_SIZE = 64 * 1024
+
+
+def xlsx_chunks(report):
+    """Write the report with openpyxl's write-only mode and stream the file back"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('report')
+    sheet.append(list(REPORT_COLUMNS))
+    for record in report_records(report):
+        sheet.append(list(record))
+
+    with tempfile.TemporaryFile() as output:
+        workbook.save(output)
+        output.seek(0)
+        while True:
+            chunk = output.read(XLSX_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+REPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', ndjson_lines),
+    'csv': ('text/csv', csv_lines),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', xlsx_chunks),
+}
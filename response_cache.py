@@ -0,0 +1,187 @@
+from flask import request, g, current_app, Response
+from src.models.user import db
+from src.services.auth_cache import TTLCache
+from functools import wraps
+import glob
+import hashlib
+import json
+import os
+import random
+import tempfile
+import time
+import uuid
+
+# Share of writes to the file backend that also sweep out expired entries
+FILE_PRUNE_RATE = 0.01
+
+
+class MemoryBackend:
+    """Per-process cache, each gunicorn worker keeps its own entries"""
+
+    def __init__(self, maxsize, ttl):
+        self._entries = TTLCache(maxsize, ttl)
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def set(self, key, value):
+        self._entries.set(key, value)
+
+    def delete(self, key):
+        self._entries.invalidate(key)
+
+
+class FileBackend:
+    """Cache shared by every process that can see ``directory``.
+
+    Point it at a directory of its own, e.g. under a tmpfs, to share entries
+    between gunicorn workers through memory. Entries are written to a temp file and renamed
+    into place, so readers never see a partial entry.
+    """
+
+    def __init__(self, directory, ttl):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    def get(self, key):
+        try:
+            with open(self._path(key)) as entry:
+                expires_at, value = json.load(entry)
+        except (OSError, ValueError):
+            return None
+        return value if expires_at > time.time() else None
+
+    def set(self, key, value):
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as entry:
+            json.dump([time.time() + self.ttl, value], entry)
+        os.replace(temp_path, self._path(key))
+
+        if random.random() < FILE_PRUNE_RATE:
+            self.prune()
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def prune(self):
+        for path in glob.glob(os.path.join(self.directory, '*.json')):
+            try:
+                with open(path) as entry:
+                    expires_at, _ = json.load(entry)
+                if expires_at <= time.time():
+                    os.remove(path)
+            except (OSError, ValueError):
+                continue
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + '.json')
+
+
+class ResponseCache:
+    """Cache of serialized GET responses, validated by strong ETags.
+
+    A cached view declares a narrow version query (e.g. the ``updated_at`` of
+    its row and of the rows it embeds) and a tag. The ETag hashes the request
+    (endpoint, arguments and role), the version values and the tag's
+    generation, which write handlers bump through ``invalidate``. A hit costs
+    the version query: ``If-None-Match`` matches answer 304 and other hits
+    reuse the stored body, skipping the view.
+
+    ``RESPONSE_CACHE_BACKEND`` is ``memory`` (default), ``file`` (shared
+    through ``RESPONSE_CACHE_DIR``) or ``none``.
+    """
+
+    def __init__(self):
+        self.backend = None
+
+    def init_app(self, app):
+        app.config.setdefault('RESPONSE_CACHE_BACKEND', 'memory')
+        app.config.setdefault('RESPONSE_CACHE_SIZE', 2048)
+        app.config.setdefault('RESPONSE_CACHE_TTL', 300)
+        app.config.setdefault('RESPONSE_CACHE_DIR', os.path.join(app.instance_path, 'mps-response-cache'))
+
+        backend, ttl = app.config['RESPONSE_CACHE_BACKEND'], app.config['RESPONSE_CACHE_TTL']
+        if backend == 'memory':
+            self.backend = MemoryBackend(app.config['RESPONSE_CACHE_SIZE'], ttl)
+        elif backend == 'file':
+            self.backend = FileBackend(app.config['RESPONSE_CACHE_DIR'], ttl)
+        elif backend == 'none':
+            self.backend = None
+        else:
+            raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND {backend!r}")
+
+    def invalidate(self, *tags):
+        """Start a new generation for ``tags``, called after the write commits"""
+        if self.backend is not None:
+            for tag in tags:
+                self.backend.set(f'generation:{tag}', uuid.uuid4().hex)
+
+    def generation(self, tag):
+        return self.backend.get(f'generation:{tag}') or ''
+
+
+response_cache = ResponseCache()
+
+
+def _etag(tag, versions):
+    user = g.get('current_user')
+    key = [
+        request.endpoint,
+        sorted(request.view_args.items()),
+        sorted(request.args.items(multi=True)),
+        user.role.value if user else None,
+        [value.isoformat() if hasattr(value, 'isoformat') else value for value in versions],
+        response_cache.generation(tag),
+    ]
+    return hashlib.sha256(json.dumps(key, default=str).encode()).hexdigest()
+
+
+def _response(etag, body=None, mimetype=None, status=200):
+    response = Response(body, status=status, mimetype=mimetype)
+    response.set_etag(etag)
+    # Clients may keep the body but must revalidate it on every use
+    response.headers['Cache-Control'] = 'private, no-cache' if g.get('current_user') else 'public, no-cache'
+    return response
+
+
+def cached_response(tag, version):
+    """Serve a GET view through the response cache.
+
+    ``tag`` is formatted with the view arguments (``'job:{job_id}'``) and
+    ``version`` is called with them and returns a select of the values that
+    change whenever the response does. Place it under ``@token_required``.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if response_cache.backend is None:
+                return f(*args, **kwargs)
+
+            versions = db.session.execute(version(**kwargs)).first()
+            if versions is None:
+                # Missing row, let the view answer (usually 404)
+                return f(*args, **kwargs)
+
+            etag = _etag(tag.format(**kwargs), versions)
+            if request.if_none_match.contains(etag):
+                return _response(etag, status=304)
+
+            cached = response_cache.backend.get(f'response:{etag}')
+            if cached is not None:
+                return _response(etag, cached['body'], cached['mimetype'])
+
+            response = current_app.make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+            body = response.get_data(as_text=True)
+            response_cache.backend.set(f'response:{etag}', {'body': body, 'mimetype': response.mimetype})
+            return _response(etag, body, response.mimetype)
+
+        return decorated_function
+
+    return decorator
@@ -0,0 +1,243 @@
+from flask import Blueprint, request, jsonify
+from src.models.user import db
+from src.models.job_position import JobPosition, JobType, JobLevel, JobStatus
+from src.models.client import Client
+from src.services.search_index import JOB_SEARCH, fold
+from src.services.suggestions import JOB_SUGGESTIONS
+from src.services.loading import with_profile
+from src.services.response_cache import cached_response
+from datetime import datetime
+import math
+
+search_bp = Blueprint('search', __name__)
+
+FACETS = ('job_type', 'job_level', 'location', 'remote', 'salary')
+
+# Salary buckets in millions of VND, as offered on the public jobs page.
+# Jobs without a public VND salary fall under "negotiable".
+SALARY_BUCKETS = (
+    ('under_10', 0, 10),
+    ('10_20', 10, 20),
+    ('20_30', 20, 30),
+    ('30_plus', 30, None),
+)
+SALARY_FACET_VALUES = ['negotiable'] + [key for key, _, _ in SALARY_BUCKETS]
+
+SORT_OPTIONS = ('relevance', 'date', 'salary-high', 'salary-low')
+SUGGESTION_TYPES = ('position', 'skill', 'location')
+
+MIN_SUGGESTION_LENGTH = 2
+MAX_SUGGESTIONS = 20
+MAX_PER_PAGE = 50
+
+
+def _location_key(value):
+    # "TP. Hồ Chí Minh" and the "hochiminh" filter value compare equal
+    return ''.join(fold(value).split())
+
+
+def _public_salary(row):
+    if row.salary_is_public and (row.salary_min or row.salary_max):
+        return row.salary_min, row.salary_max
+    return None, None
+
+
+def _salary_bucket(row):
+    salary_min, salary_max = _public_salary(row)
+    if salary_max is None and salary_min is None:
+        return 'negotiable'
+    if (row.salary_currency or 'VND') != 'VND':
+        return None
+
+    millions = (salary_max or salary_min) / 1000000
+    for key, low, high in SALARY_BUCKETS:
+        if millions >= low and (high is None or millions < high):
+            return key
+    return None
+
+
+def _facet_values(row):
+    return {
+        'job_type': row.job_type.value if row.job_type else None,
+        'job_level': row.job_level.value if row.job_level else None,
+        'location': row.location or None,
+        'remote': 'true' if row.remote_option else 'false',
+        'salary': _salary_bucket(row),
+    }
+
+
+def _matches(facet, value, selected):
+    if not selected:
+        return True
+    if value is None:
+        return False
+    if facet == 'location':
+        key = _location_key(value)
+        return any(_location_key(option) in key for option in selected)
+    return value in selected
+
+
+def _selected_values(name):
+    """Read a multi-valued filter given as repeated and/or comma separated parameters"""
+    values = []
+    for value in request.args.getlist(name):
+        values.extend(part.strip() for part in value.split(',') if part.strip())
+    return values
+
+
+def _sort_key(sort_by):
+    if sort_by == 'date':
+        return lambda row: row.created_at or datetime.min, True
+
+    def salary(row):
+        salary_min, salary_max = _public_salary(row)
+        value = salary_max or salary_min
+        # Negotiable salaries go last in both directions
+        if value is None:
+            return (1, 0)
+        return (0, -value if sort_by == 'salary-high' else value)
+
+    return salary, False
+
+
+def jobs_version():
+    # Any job insert, update or delete changes the count or the latest
+    # updated_at, and posted_days_ago changes with the date
+    return db.select(
+        db.func.count(JobPosition.id),
+        db.func.max(JobPosition.updated_at),
+        db.select(db.func.max(Client.updated_at)).scalar_subquery(),
+        db.func.current_date()
+    )
+
+
+@search_bp.route('/search', methods=['GET'])
+@cached_response('jobs', jobs_version)
+def search_jobs():
+    """Public faceted search over open jobs.
+
+    Filters within a facet are OR-ed and facets are AND-ed. Each facet's counts
+    apply every other active filter but not its own, so the counts show what
+    ticking another option of that facet would return.
+    """
+    keyword = request.args.get('q', '').strip()
+    sort_by = request.args.get('sort', 'relevance')
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', 10, type=int), MAX_PER_PAGE)
+
+    if sort_by not in SORT_OPTIONS:
+        return jsonify({'message': 'Invalid sort value'}), 400
+
+    if page < 1 or per_page < 1:
+        return jsonify({'message': 'Invalid page value'}), 400
+
+    selected = {facet: _selected_values(facet) for facet in FACETS}
+
+    allowed = {
+        'job_type': [member.value for member in JobType],
+        'job_level': [member.value for member in JobLevel],
+        'remote': ['true', 'false'],
+        'salary': SALARY_FACET_VALUES,
+    }
+    for facet, values in allowed.items():
+        if any(value not in values for value in selected[facet]):
+            return jsonify({'message': f'Invalid {facet} value'}), 400
+
+    # One narrow scan of the open jobs matching the keyword feeds both the
+    # facet counts and the result order
+    query = db.session.query(
+        JobPosition.id, JobPosition.job_type, JobPosition.job_level, JobPosition.location,
+        JobPosition.remote_option, JobPosition.salary_min, JobPosition.salary_max,
+        JobPosition.salary_currency, JobPosition.salary_is_public, JobPosition.created_at
+    ).filter(JobPosition.status == JobStatus.OPEN)
+
+    if keyword:
+        query = JOB_SEARCH.apply(query, keyword)
+
+    facets = {
+        'job_type': dict.fromkeys(allowed['job_type'], 0),
+        'job_level': dict.fromkeys(allowed['job_level'], 0),
+        'location': {},
+        'remote': dict.fromkeys(allowed['remote'], 0),
+        'salary': dict.fromkeys(SALARY_FACET_VALUES, 0),
+    }
+
+    results = []
+    for row in query.all():
+        values = _facet_values(row)
+        misses = [facet for facet in FACETS if not _matches(facet, values[facet], selected[facet])]
+
+        if not misses:
+            results.append(row)
+            counted = FACETS
+        elif len(misses) == 1:
+            # Only its own facet excludes the row, so it counts towards that facet
+            counted = misses
+        else:
+            continue
+
+        for facet in counted:
+            if values[facet] is not None:
+                facets[facet][values[facet]] = facets[facet].get(values[facet], 0) + 1
+
+    facets['location'] = dict(sorted(facets['location'].items(), key=lambda item: (-item[1], item[0])))
+
+    # Keyword matches arrive best first; without a keyword relevance means newest
+    if sort_by != 'relevance' or not keyword:
+        key, reverse = _sort_key('date' if sort_by == 'relevance' else sort_by)
+        results.sort(key=key, reverse=reverse)
+
+    total = len(results)
+    start = (page - 1) * per_page
+    page_ids = [row.id for row in results[start:start + per_page]]
+
+    jobs_by_id = {}
+    if page_ids:
+        jobs = with_profile(JobPosition.query, 'jobs.list').filter(JobPosition.id.in_(page_ids)).all()
+        jobs_by_id = {job.id: job for job in jobs}
+
+    now = datetime.utcnow()
+    jobs_list = []
+    for job_id in page_ids:
+        job = jobs_by_id[job_id]
+        salary_min, salary_max = _public_salary(job)
+        jobs_list.append({
+            'id': job.id,
+            'title': job.title,
+            'company': job.client.company_name,
+            'job_type': job.job_type.value if job.job_type else None,
+            'job_level': job.job_level.value if job.job_level else None,
+            'location': job.location,
+            'remote_option': job.remote_option,
+            'department': job.department,
+            'salary_min': salary_min,
+            'salary_max': salary_max,
+            'salary_currency': job.salary_currency,
+            'posted_days_ago': (now - job.created_at).days if job.created_at else None,
+            'created_at': job.created_at.isoformat() if job.created_at else None
+        })
+
+    return jsonify({
+        'jobs': jobs_list,
+        'facets': facets,
+        'total': total,
+        'pages': math.ceil(total / per_page),
+        'current_page': page,
+        'per_page': per_page
+    }), 200
+
+
+@search_bp.route('/suggestions', methods=['GET'])
+def get_suggestions():
+    """Autocomplete for the public job search, answered from memory"""
+    prefix = request.args.get('q', '').strip()
+    limit = min(request.args.get('limit', 5, type=int), MAX_SUGGESTIONS)
+    kinds = _selected_values('type')
+
+    if any(kind not in SUGGESTION_TYPES for kind in kinds):
+        return jsonify({'message': 'Invalid type value'}), 400
+
+    if len(prefix) < MIN_SUGGESTION_LENGTH or limit < 1:
+        return jsonify({'suggestions': []}), 200
+
+    return jsonify({'suggestions': JOB_SUGGESTIONS.suggest(prefix, limit, kinds)}), 200
@@ -0,0 +1,163 @@
+from flask import request
+from sqlalchemy import event, select, text, literal_column, or_
+from src.models.user import db
+from src.models.candidate import Candidate
+from src.models.job_position import JobPosition
+import re
+import unicodedata
+
+REBUILD_BATCH_SIZE = 5000
+
+
+def fold(value):
+    """Lower-case and strip diacritics, so "Nguyễn Đức" is indexed and matched as "nguyen duc" """
+    if not value:
+        return ''
+    value = unicodedata.normalize('NFD', str(value))
+    value = ''.join(ch for ch in value if not unicodedata.combining(ch))
+    # đ/Đ are distinct letters rather than d + a combining mark
+    return value.replace('đ', 'd').replace('Đ', 'D').lower()
+
+
+def is_fragment(term):
+    """Phone numbers and email addresses are searched by any piece, which word prefixes cannot match"""
+    term = term.strip()
+    return '@' in term or (re.search(r'\d', term) is not None and re.fullmatch(r'[\d\s+().-]+', term) is not None)
+
+
+def match_expression(term):
+    """Turn free text into an FTS5 query that prefix-matches every word"""
+    tokens = re.findall(r'\w+', fold(term))
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+class SearchIndex:
+    """An FTS5 table mirroring a few text columns of a model, keyed by the model's id"""
+
+    def __init__(self, name, model, columns, weights):
+        self.name = name
+        self.model = model
+        self.columns = columns
+        self.weights = weights
+
+    def create(self, connection):
+        """Create the FTS table if missing, returning True when it had to be created"""
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': self.name}
+        ).first()
+        if exists:
+            return False
+
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE {self.name} USING fts5("
+            f"{', '.join(self.columns)}, tokenize = 'unicode61 remove_diacritics 2')"
+        ))
+        return True
+
+    def rebuild(self, connection):
+        """Re-index every row of the model from scratch"""
+        connection.execute(text(f"DELETE FROM {self.name}"))
+
+        columns = [self.model.id] + [getattr(self.model, column) for column in self.columns]
+        result = connection.execute(select(*columns)).yield_per(REBUILD_BATCH_SIZE)
+        total = 0
+        for rows in result.partitions():
+            connection.execute(self._insert_statement(), [self._values(row[0], row[1:]) for row in rows])
+            total += len(rows)
+
+        return total
+
+    def index_row(self, connection, target):
+        self.remove_row(connection, target)
+        connection.execute(
+            self._insert_statement(),
+            self._values(target.id, [getattr(target, column) for column in self.columns])
+        )
+
+    def index_rows(self, connection, rows):
+        """Index freshly inserted rows, given as mappings with ``id`` and the indexed columns"""
+        if rows and connection.dialect.name == 'sqlite':
+            connection.execute(
+                self._insert_statement(),
+                [self._values(row['id'], [row.get(column) for column in self.columns]) for row in rows]
+            )
+
+    def remove_row(self, connection, target):
+        connection.execute(text(f"DELETE FROM {self.name} WHERE rowid = :id"), {'id': target.id})
+
+    def apply(self, query, term):
+        """Restrict ``query`` to rows matching ``term``, best BM25 matches first.
+
+        Keyset pages (``cursor=``) cannot follow relevance order, so they keep
+        their (created_at, id) order and only use the index as a filter.
+        Databases without FTS5, and phone or email fragments, fall back to
+        ILIKE over the same columns.
+        """
+        if db.engine.dialect.name != 'sqlite' or is_fragment(term):
+            search_term = f"%{term}%"
+            return query.filter(or_(*[getattr(self.model, column).ilike(search_term) for column in self.columns]))
+
+        expression = match_expression(term)
+        if not expression:
+            return query
+
+        weights = ', '.join(str(weight) for weight in self.weights)
+        matches = select(
+            literal_column('rowid').label('id'),
+            literal_column(f"bm25({self.name}, {weights})").label('rank')
+        ).select_from(text(self.name)).where(
+            text(f"{self.name} MATCH :search_expression").bindparams(search_expression=expression)
+        ).subquery()
+
+        query = query.join(matches, self.model.id == matches.c.id)
+        if request.args.get('cursor') is None:
+            # bm25() is lower for better matches
+            query = query.order_by(matches.c.rank)
+
+        return query
+
+    def _insert_statement(self):
+        return text(
+            f"INSERT INTO {self.name} (rowid, {', '.join(self.columns)}) "
+            f"VALUES (:id, {', '.join(':' + column for column in self.columns)})"
+        )
+
+    def _values(self, row_id, values):
+        return dict(id=row_id, **{column: fold(value) for column, value in zip(self.columns, values)})
+
+
+CANDIDATE_SEARCH = SearchIndex('candidates_fts', Candidate, ('full_name', 'email', 'phone', 'skills'), (10.0, 5.0, 5.0, 1.0))
+JOB_SEARCH = SearchIndex('job_positions_fts', JobPosition, ('title', 'description', 'location'), (10.0, 1.0, 5.0))
+
+SEARCH_INDEXES = (CANDIDATE_SEARCH, JOB_SEARCH)
+
+
+def create_search_indexes():
+    """Create missing FTS tables and fill them from the base tables"""
+    if db.engine.dialect.name != 'sqlite':
+        return
+
+    connection = db.session.connection()
+    for index in SEARCH_INDEXES:
+        if index.create(connection):
+            index.rebuild(connection)
+    db.session.commit()
+
+
+def _register(index):
+    # Keep the FTS table in step with the model inside the same flush
+    def on_write(mapper, connection, target):
+        if connection.dialect.name == 'sqlite':
+            index.index_row(connection, target)
+
+    def on_delete(mapper, connection, target):
+        if connection.dialect.name == 'sqlite':
+            index.remove_row(connection, target)
+
+    event.listen(index.model, 'after_insert', on_write)
+    event.listen(index.model, 'after_update', on_write)
+    event.listen(index.model, 'after_delete', on_delete)
+
+
+for _index in SEARCH_INDEXES:
+    _register(_index)
@@ -0,0 +1,91 @@
+from sqlalchemy import Date, Float, String
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+# Date arithmetic and bucketing that compiles for both SQLite and PostgreSQL.
+# Buckets come back as ISO strings ('2026-10', '2026-10-12') on every database.
+
+
+class days_between(FunctionElement):
+    """Fractional days from the second datetime argument to the first"""
+    type = Float()
+    inherit_cache = True
+
+
+class day_of(FunctionElement):
+    type = Date()
+    inherit_cache = True
+
+
+class month_of(FunctionElement):
+    """'YYYY-MM'"""
+    type = String()
+    inherit_cache = True
+
+
+class month_start(FunctionElement):
+    """'YYYY-MM-01'"""
+    type = String()
+    inherit_cache = True
+
+
+class week_start(FunctionElement):
+    """'YYYY-MM-DD' of the Monday starting the week"""
+    type = String()
+    inherit_cache = True
+
+
+def _arguments(compiler, element, **kw):
+    return [compiler.process(argument, **kw) for argument in element.clauses]
+
+
+@compiles(days_between)
+def _days_between_sqlite(element, compiler, **kw):
+    end, start = _arguments(compiler, element, **kw)
+    return f"(julianday({end}) - julianday({start}))"
+
+
+@compiles(days_between, 'postgresql')
+def _days_between_postgresql(element, compiler, **kw):
+    end, start = _arguments(compiler, element, **kw)
+    return f"(EXTRACT(EPOCH FROM ({end} - {start})) / 86400.0)"
+
+
+@compiles(day_of)
+def _day_of_sqlite(element, compiler, **kw):
+    return f"date({_arguments(compiler, element, **kw)[0]})"
+
+
+@compiles(day_of, 'postgresql')
+def _day_of_postgresql(element, compiler, **kw):
+    return f"CAST({_arguments(compiler, element, **kw)[0]} AS DATE)"
+
+
+@compiles(month_of)
+def _month_of_sqlite(element, compiler, **kw):
+    return f"strftime('%Y-%m', {_arguments(compiler, element, **kw)[0]})"
+
+
+@compiles(month_of, 'postgresql')
+def _month_of_postgresql(element, compiler, **kw):
+    return f"to_char({_arguments(compiler, element, **kw)[0]}, 'YYYY-MM')"
+
+
+@compiles(month_start)
+def _month_start_sqlite(element, compiler, **kw):
+    return f"strftime('%Y-%m-01', {_arguments(compiler, element, **kw)[0]})"
+
+
+@compiles(month_start, 'postgresql')
+def _month_start_postgresql(element, compiler, **kw):
+    return f"to_char({_arguments(compiler, element, **kw)[0]}, 'YYYY-MM-01')"
+
+
+@compiles(week_start)
+def _week_start_sqlite(element, compiler, **kw):
+    return f"date({_arguments(compiler, element, **kw)[0]}, '-6 days', 'weekday 1')"
+
+
+@compiles(week_start, 'postgresql')
+def _week_start_postgresql(element, compiler, **kw):
+    return f"to_char(date_trunc('week', {_arguments(compiler, element, **kw)[0]}), 'YYYY-MM-DD')"
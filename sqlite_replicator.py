@@ -0,0 +1,43 @@
+"""Stand-in replicator for trying the read replica locally with SQLite.
+
+Copies the primary database into the replica file with SQLite's online backup
+API every ``--interval`` seconds, so the replica lags the primary the way a
+real streaming replica would. Point DATABASE_REPLICA_URL at the replica file.
+
+    python sqlite_replicator.py instance/database/app.db instance/database/replica.db [--interval 2] [--once]
+"""
+import argparse
+import sqlite3
+import time
+
+
+def replicate(primary_path, replica_path):
+    """Copy a consistent snapshot of the primary over the replica"""
+    source = sqlite3.connect(primary_path)
+    target = sqlite3.connect(replica_path, timeout=30)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('primary', help='path of the primary SQLite database')
+    parser.add_argument('replica', help='path of the replica SQLite database')
+    parser.add_argument('--interval', type=float, default=2, help='seconds between copies')
+    parser.add_argument('--once', action='store_true', help='copy once and exit')
+    args = parser.parse_args()
+
+    while True:
+        started = time.perf_counter()
+        replicate(args.primary, args.replica)
+        print(f"Replicated in {(time.perf_counter() - started) * 1000:.0f} ms", flush=True)
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
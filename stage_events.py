@@ -0,0 +1,263 @@
+from flask import g, has_request_context
+from sqlalchemy import event, inspect, select, insert, exists, func, and_, or_
+from sqlalchemy.orm import aliased
+from src.models.user import db
+from src.models.application import Application, ApplicationStatus, STAGE_TIMESTAMPS
+from src.models.application_stage_event import ApplicationStageEvent
+from src.services.sql_dates import days_between
+from datetime import datetime, timedelta
+import numpy as np
+
+BACKFILL_BATCH_SIZE = 5000
+
+# Applications end in these statuses, so no time is spent "in" them
+TERMINAL_STATUSES = (ApplicationStatus.HIRED, ApplicationStatus.REJECTED, ApplicationStatus.WITHDRAWN)
+
+# Upper edges of the stage duration histogram buckets, in hours
+HISTOGRAM_EDGES = (24, 72, 168, 336, 720)
+
+# Default service level per stage, in hours, before an application counts as stuck
+DEFAULT_SLA_HOURS = {
+    ApplicationStatus.NEW: 48,
+    ApplicationStatus.SCREENING: 72,
+    ApplicationStatus.INTERVIEW: 168,
+    ApplicationStatus.SHORTLISTED: 72,
+    ApplicationStatus.CLIENT_REVIEW: 120,
+}
+
+
+def record_stage_events(connection, events):
+    """Append ``(application_id, from_status, to_status, at, user_id)`` events in one statement"""
+    if events:
+        connection.execute(insert(ApplicationStageEvent.__table__), [
+            {'application_id': application_id, 'from_status': from_status, 'to_status': to_status, 'at': at, 'user_id': user_id}
+            for application_id, from_status, to_status, at, user_id in events
+        ])
+
+
+def _history(row, until=None):
+    """Reconstruct the stage events of an application from its ``*_at`` columns.
+
+    With ``until``, the time of the application's first recorded event, only
+    the history before it is rebuilt, ending in ``row['status']``: the status
+    that first event left.
+    """
+    reached = sorted(
+        ((row[column], status) for status, column in STAGE_TIMESTAMPS.items()
+         if row[column] is not None and (until is None or row[column] < until)),
+        key=lambda item: item[0]
+    )
+    created_at = row['applied_at'] or (reached[0][0] if reached else row['updated_at'])
+    if until is not None and (created_at is None or created_at >= until):
+        # Nothing is known to have happened before the recorded events
+        return []
+
+    events, current = [(None, ApplicationStatus.NEW, created_at)], ApplicationStatus.NEW
+    for at, status in reached:
+        events.append((current, status, at))
+        current = status
+
+    # Statuses reached without a timestamp (e.g. back to NEW) are only known to
+    # hold now, or, before recorded events, since the last known change
+    if row['status'] is not None and row['status'] != current:
+        at = events[-1][2] if until is not None else max(row['updated_at'] or created_at, events[-1][2])
+        events.append((current, row['status'], at))
+
+    return [(row['id'], from_status, to_status, at, None) for from_status, to_status, at in events]
+
+
+def _before_first_event(row):
+    """``row`` as it stood before its first recorded event, to rebuild the history up to it"""
+    past = dict(row, status=row['first_event_from'])
+    until = row['first_event_at']
+    # Stage columns are stamped on first entry, in the same flush as the
+    # event: if the first event's stage holds the latest stamp before it,
+    # that stamp belongs to the event, not to the older history
+    column = STAGE_TIMESTAMPS.get(row['first_event_to'])
+    stamps = [past[other] for other in STAGE_TIMESTAMPS.values() if past[other] is not None and past[other] < until]
+    if column is not None and past[column] is not None and past[column] < until and past[column] == max(stamps):
+        past[column] = None
+    return past
+
+
+def backfill_stage_events(connection, batch_size=BACKFILL_BATCH_SIZE):
+    """Write the history of every application without a creation event, returning (applications, events).
+
+    Applications that changed after stage events were deployed but before the
+    backfill already have some events; for those only the history older than
+    their first event is written.
+    """
+    first_event = select(ApplicationStageEvent.at).where(
+        ApplicationStageEvent.application_id == Application.id
+    ).order_by(ApplicationStageEvent.at, ApplicationStageEvent.id).limit(1)
+    columns = [Application.id, Application.status, Application.applied_at, Application.updated_at] + [
+        getattr(Application, column) for column in STAGE_TIMESTAMPS.values()
+    ] + [
+        first_event.scalar_subquery().label('first_event_at'),
+        first_event.with_only_columns(ApplicationStageEvent.from_status).scalar_subquery().label('first_event_from'),
+        first_event.with_only_columns(ApplicationStageEvent.to_status).scalar_subquery().label('first_event_to'),
+    ]
+    result = connection.execute(
+        select(*columns).where(~exists().where(
+            ApplicationStageEvent.application_id == Application.id, ApplicationStageEvent.from_status.is_(None)
+        )).order_by(Application.id)
+    ).yield_per(batch_size)
+
+    applications = events = 0
+    for rows in result.partitions():
+        history = []
+        for row in rows:
+            row = row._mapping
+            if row['first_event_at'] is None:
+                history.extend(_history(row))
+            else:
+                history.extend(_history(_before_first_event(row), until=row['first_event_at']))
+        record_stage_events(connection, history)
+        applications += len(rows)
+        events += len(history)
+
+    return applications, events
+
+
+def _stints(from_date, to_date, stage=None):
+    """Subquery of the stage stints entered within the window, with when they were left (NULL if still open)"""
+    entered = aliased(ApplicationStageEvent)
+    following = aliased(ApplicationStageEvent)
+    left_at = select(func.min(following.at)).where(
+        following.application_id == entered.application_id,
+        or_(following.at > entered.at, and_(following.at == entered.at, following.id > entered.id))
+    ).scalar_subquery()
+
+    query = select(
+        entered.application_id,
+        entered.to_status.label('stage'),
+        entered.at.label('entered_at'),
+        left_at.label('left_at')
+    ).where(entered.at >= from_date, entered.at <= to_date)
+    if stage is not None:
+        query = query.where(entered.to_status == stage)
+    else:
+        query = query.where(entered.to_status.notin_(TERMINAL_STATUSES))
+    return query.subquery()
+
+
+def _hours_stats(hours):
+    if not len(hours):
+        return {'avg_hours': 0, 'p50_hours': 0, 'p90_hours': 0}
+
+    p50, p90 = np.percentile(hours, [50, 90])
+    return {
+        'avg_hours': round(float(hours.mean()), 1),
+        'p50_hours': round(float(p50), 1),
+        'p90_hours': round(float(p90), 1)
+    }
+
+
+def _completed_hours(connection, stints):
+    """``(stage, hours)`` of the stints that have been left"""
+    rows = connection.execute(
+        select(stints.c.stage, days_between(stints.c.left_at, stints.c.entered_at) * 24)
+        .where(stints.c.left_at.isnot(None))
+    ).all()
+    if not rows:
+        return [], np.array([])
+    stages, hours = zip(*rows)
+    return stages, np.array(hours, dtype=float)
+
+
+def stage_dwell_times(connection, from_date, to_date):
+    """How long applications that entered each stage within the window stayed in it"""
+    stints = _stints(from_date, to_date)
+    stages, hours = _completed_hours(connection, stints)
+    open_counts = dict(connection.execute(
+        select(stints.c.stage, func.count()).where(stints.c.left_at.is_(None)).group_by(stints.c.stage)
+    ).all())
+
+    result = {}
+    for stage in ApplicationStatus:
+        if stage in TERMINAL_STATUSES:
+            continue
+        stage_hours = hours[[index for index, value in enumerate(stages) if value == stage]]
+        result[stage.value] = {
+            'completed': int(len(stage_hours)),
+            'open': open_counts.get(stage, 0),
+            **_hours_stats(stage_hours)
+        }
+    return result
+
+
+def stage_duration_histogram(connection, stage, from_date, to_date):
+    """Completed stints of ``stage`` entered within the window, bucketed by duration"""
+    _, hours = _completed_hours(connection, _stints(from_date, to_date, stage))
+    edges = (0,) + HISTOGRAM_EDGES + (np.inf,)
+    counts, _ = np.histogram(hours, bins=edges)
+
+    return {
+        'stage': stage.value,
+        'completed': int(len(hours)),
+        **_hours_stats(hours),
+        'buckets': [{
+            'from_hours': edges[i],
+            'to_hours': edges[i + 1] if np.isfinite(edges[i + 1]) else None,
+            'count': int(count)
+        } for i, count in enumerate(counts)]
+    }
+
+
+def sla_breaches(connection, stage, sla_hours, from_date, to_date, now=None, limit=100):
+    """Stints of ``stage`` that outlasted ``sla_hours``.
+
+    Completed breaches are counted for stints entered within the window. Open
+    breaches are every application sitting in the stage past its SLA right
+    now, oldest first.
+    """
+    now = now or datetime.utcnow()
+    _, hours = _completed_hours(connection, _stints(from_date, to_date, stage))
+
+    current = aliased(ApplicationStageEvent)
+    later = aliased(ApplicationStageEvent)
+    stuck = select(current.application_id, current.at).where(
+        current.to_status == stage,
+        current.at <= now - timedelta(hours=sla_hours),
+        ~exists().where(
+            later.application_id == current.application_id,
+            or_(later.at > current.at, and_(later.at == current.at, later.id > current.id))
+        )
+    ).order_by(current.at, current.application_id)
+
+    total_open = connection.execute(select(func.count()).select_from(stuck.subquery())).scalar()
+    rows = connection.execute(stuck.limit(limit)).all()
+
+    return {
+        'stage': stage.value,
+        'sla_hours': sla_hours,
+        'completed': int(len(hours)),
+        'completed_breaches': int((hours > sla_hours).sum()),
+        'open_breaches': total_open,
+        'applications': [{
+            'application_id': application_id,
+            'entered_at': entered_at.isoformat(),
+            'hours_in_stage': round((now - entered_at).total_seconds() / 3600, 1)
+        } for application_id, entered_at in rows]
+    }
+
+
+@event.listens_for(db.session, 'after_flush')
+def record_flushed_stage_changes(session, flush_context):
+    """Append an event for every application created or moved to another status in this flush"""
+    now = datetime.utcnow()
+    user = g.get('current_user') if has_request_context() else None
+    user_id = user.id if user is not None else None
+
+    events = []
+    for obj in session.new:
+        if isinstance(obj, Application):
+            events.append((obj.id, None, obj.status or ApplicationStatus.NEW, now, user_id))
+
+    for obj in session.dirty:
+        if isinstance(obj, Application):
+            history = inspect(obj).attrs.status.history
+            if history.added and history.deleted and history.added[0] != history.deleted[0]:
+                events.append((obj.id, history.deleted[0], history.added[0], now, user_id))
+
+    record_stage_events(session.connection(), events)
@@ -0,0 +1,210 @@
+from sqlalchemy import event, select, func
+from src.models.user import db
+from src.models.job_position import JobPosition, JobStatus
+from src.services.search_index import fold
+import heapq
+import re
+import threading
+import time
+
+# Requirements are free text, so skills are the short comma/line separated fragments
+SKILL_SEPARATORS = re.compile(r'[\n,;•·]|\s-\s')
+MAX_SKILL_WORDS = 5
+
+# How often a process checks whether other processes changed the jobs table
+REFRESH_INTERVAL = 30
+
+
+class _Node:
+    __slots__ = ('children', 'entries')
+
+    def __init__(self):
+        self.children = {}
+        self.entries = set()
+
+
+class SuggestionTrie:
+    """Prefix trie over folded phrases, matching from the start of any word.
+
+    Each node keeps the set of entries below it, so completing a prefix is a
+    walk down the trie plus a top-N pick by count.
+    """
+
+    def __init__(self):
+        self.root = _Node()
+        self.counts = {}
+        self.labels = {}
+
+    def add(self, entry, label):
+        count = self.counts.get(entry, 0)
+        self.counts[entry] = count + 1
+        if count == 0:
+            self.labels[entry] = label
+            for key in self._keys(entry):
+                node = self.root
+                for char in key:
+                    node = node.children.setdefault(char, _Node())
+                    node.entries.add(entry)
+
+    def remove(self, entry):
+        count = self.counts.get(entry, 0)
+        if count > 1:
+            self.counts[entry] = count - 1
+            return
+        if count == 0:
+            return
+
+        del self.counts[entry]
+        del self.labels[entry]
+        for key in self._keys(entry):
+            path = [self.root]
+            for char in key:
+                node = path[-1].children.get(char)
+                if node is None:
+                    # Already pruned while removing an overlapping key
+                    break
+                node.entries.discard(entry)
+                path.append(node)
+            # Prune the branch back to the last node still in use
+            walked = key[:len(path) - 1]
+            for parent, char, node in zip(reversed(path[:-1]), reversed(walked), reversed(path[1:])):
+                if node.entries:
+                    break
+                del parent.children[char]
+
+    def complete(self, prefix, limit, kinds=None):
+        node = self.root
+        for char in fold(prefix).strip():
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        entries = node.entries
+        if kinds:
+            entries = [entry for entry in entries if entry[0] in kinds]
+
+        best = heapq.nlargest(limit, entries, key=lambda entry: (self.counts[entry], entry[1]))
+        return [{'type': entry[0], 'text': self.labels[entry], 'count': self.counts[entry]} for entry in best]
+
+    @staticmethod
+    def _keys(entry):
+        # One key per word start, so "phan" completes "Kỹ sư Phần mềm"
+        text = entry[1]
+        return [text[match.start():] for match in re.finditer(r'\b\w', text)]
+
+
+def job_entries(title, requirements, location, status):
+    """Return the {(type, folded text): label} suggestions a single job contributes"""
+    if status != JobStatus.OPEN:
+        return {}
+
+    entries = {}
+    if title and title.strip():
+        entries[('position', fold(title).strip())] = title.strip()
+    if location and location.strip():
+        entries[('location', fold(location).strip())] = location.strip()
+    for fragment in SKILL_SEPARATORS.split(requirements or ''):
+        skill = fragment.strip(' \t\r*+.:')
+        if skill and len(skill.split()) <= MAX_SKILL_WORDS:
+            entries[('skill', fold(skill))] = skill
+
+    return entries
+
+
+class JobSuggestions:
+    """Autocomplete over the titles, skills and locations of open jobs.
+
+    The trie is built on first use and kept in step with this process's own
+    commits. Writes made by other processes are picked up by a cheap
+    count/max(updated_at) check at most every ``REFRESH_INTERVAL`` seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._trie = None
+        self._jobs = {}
+        self._signature = None
+        self._checked_at = 0
+
+    def suggest(self, prefix, limit, kinds=None):
+        self._refresh()
+        with self._lock:
+            return self._trie.complete(prefix, limit, kinds)
+
+    def rebuild(self):
+        signature = self._current_signature()
+        rows = db.session.execute(
+            select(JobPosition.id, JobPosition.title, JobPosition.requirements, JobPosition.location, JobPosition.status)
+            .where(JobPosition.status == JobStatus.OPEN)
+        ).all()
+
+        trie, jobs = SuggestionTrie(), {}
+        for row in rows:
+            jobs[row.id] = job_entries(row.title, row.requirements, row.location, row.status)
+            for entry, label in jobs[row.id].items():
+                trie.add(entry, label)
+
+        with self._lock:
+            self._trie, self._jobs = trie, jobs
+            self._signature, self._checked_at = signature, time.monotonic()
+
+        return len(jobs)
+
+    def apply(self, changes):
+        """Fold committed job changes, ``{job_id: entries}``, into the trie"""
+        with self._lock:
+            if self._trie is None:
+                return
+            for job_id, entries in changes.items():
+                previous = self._jobs.pop(job_id, {})
+                for entry in previous.keys() - entries.keys():
+                    self._trie.remove(entry)
+                for entry in entries.keys() - previous.keys():
+                    self._trie.add(entry, entries[entry])
+                if entries:
+                    self._jobs[job_id] = entries
+
+    def _refresh(self):
+        if self._trie is None:
+            self.rebuild()
+        elif time.monotonic() - self._checked_at > REFRESH_INTERVAL:
+            self._checked_at = time.monotonic()
+            if self._current_signature() != self._signature:
+                self.rebuild()
+
+    @staticmethod
+    def _current_signature():
+        return tuple(db.session.execute(
+            select(func.count(JobPosition.id), func.max(JobPosition.updated_at))
+        ).one())
+
+
+JOB_SUGGESTIONS = JobSuggestions()
+
+_PENDING_KEY = 'job_suggestion_changes'
+
+
+@event.listens_for(db.session, 'after_flush')
+def collect_job_suggestion_changes(session, flush_context):
+    """Remember the suggestions of flushed jobs until the transaction commits"""
+    pending = session.info.setdefault(_PENDING_KEY, {})
+
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, JobPosition):
+            pending[obj.id] = job_entries(obj.title, obj.requirements, obj.location, obj.status)
+
+    for obj in session.deleted:
+        if isinstance(obj, JobPosition):
+            pending[obj.id] = {}
+
+
+@event.listens_for(db.session, 'after_commit')
+def apply_job_suggestion_changes(session):
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes:
+        JOB_SUGGESTIONS.apply(changes)
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def discard_job_suggestion_changes(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,169 @@
+"""SQL statement budgets of the list, detail and calendar endpoints.
+
+Every endpoint is called against a seeded database with PAGE_ROWS rows per
+table, so a relation loaded per row (an N+1) blows its budget by dozens of
+statements. Budgets include authentication with a cold principal cache.
+"""
+import os
+import tempfile
+
+# Point the app at a scratch database before src.main creates it
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'app.db')
+os.environ.pop('DATABASE_REPLICA_URL', None)
+
+from datetime import datetime, timedelta
+from werkzeug.security import generate_password_hash
+import pytest
+
+from src.main import create_app
+from src.models.user import db, User, UserRole
+from src.models.client import Client
+from src.models.candidate import Candidate
+from src.models.candidate_note import CandidateNote
+from src.models.job_position import JobPosition, JobType, JobLevel, JobStatus
+from src.models.application import Application, ApplicationStatus
+from src.models.interview import Interview
+from src.models.partner import Partner, PartnerType
+from src.models.activity import Activity, ActivityType
+from src.services.auth_cache import auth_cache
+from src.services.query_budget import count_statements
+
+PAGE_ROWS = 50
+
+NOW = datetime.utcnow()
+
+
+@pytest.fixture(scope='module')
+def app():
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': os.environ['DATABASE_URL'],
+        # Cached bodies would skip the views whose loading is under test
+        'RESPONSE_CACHE_BACKEND': 'none',
+        'ACTIVITY_LOG_ASYNC': False,
+    })
+    with app.app_context():
+        _seed()
+    return app
+
+
+def _seed():
+    admin = User(
+        username='admin', email='admin@example.com', full_name='Admin', role=UserRole.ADMIN,
+        password_hash=generate_password_hash('secret', method='pbkdf2:sha256')
+    )
+    db.session.add(admin)
+    db.session.add(Partner(name='University', partner_type=PartnerType.SCHOOL))
+    clients = [Client(company_name=f'Client {i}') for i in range(PAGE_ROWS)]
+    db.session.add_all(clients)
+    db.session.flush()
+
+    jobs = [JobPosition(
+        client_id=clients[i].id, title=f'Developer {i}', description='Build things', requirements='python sql',
+        location='Hanoi', job_type=JobType.FULL_TIME, job_level=JobLevel.MID_LEVEL, status=JobStatus.OPEN
+    ) for i in range(PAGE_ROWS)]
+    candidates = [Candidate(
+        full_name=f'Candidate {i}', email=f'candidate{i}@example.com', skills='python, sql', city='Hanoi'
+    ) for i in range(2 * PAGE_ROWS)]
+    db.session.add_all(jobs + candidates)
+    db.session.flush()
+
+    applications = [Application(
+        candidate_id=candidates[i].id, job_position_id=jobs[i].id, recruiter_id=admin.id,
+        status=ApplicationStatus.SCREENING, applied_at=NOW - timedelta(days=i)
+    ) for i in range(PAGE_ROWS)]
+    db.session.add_all(applications)
+    db.session.flush()
+
+    db.session.add_all(Interview(
+        application_id=application.id, candidate_id=application.candidate_id, interviewer_id=admin.id,
+        scheduled_at=NOW + timedelta(hours=i)
+    ) for i, application in enumerate(applications))
+    db.session.add_all(Activity(
+        user_id=admin.id, candidate_id=candidates[i].id, activity_type=ActivityType.NOTE_ADDED,
+        description=f'Activity {i}', created_at=NOW - timedelta(hours=i)
+    ) for i in range(PAGE_ROWS))
+    db.session.add_all(CandidateNote(
+        candidate_id=candidates[0].id, user_id=admin.id, author_name='Admin', body=f'Note {i}'
+    ) for i in range(PAGE_ROWS))
+    db.session.commit()
+
+
+@pytest.fixture(scope='module')
+def client(app):
+    client = app.test_client()
+    response = client.post('/api/auth/login', json={'email': 'admin@example.com', 'password': 'secret'})
+    client.environ_base['HTTP_AUTHORIZATION'] = f"Bearer {response.get_json()['token']}"
+    return client
+
+
+def _first_id(model):
+    return db.session.execute(db.select(model.id).order_by(model.id)).scalar()
+
+
+def _statements(app, client, method, url, **kwargs):
+    with app.app_context():
+        url = url.format(
+            job=_first_id(JobPosition), application=_first_id(Application),
+            interview=_first_id(Interview), candidate=_first_id(Candidate)
+        )
+        auth_cache.init_app(app)
+
+    with count_statements() as statements:
+        response = client.open(url, method=method, **kwargs)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return statements
+
+
+READ_BUDGETS = [
+    ('/api/jobs/?per_page=50', 3),
+    ('/api/jobs/?per_page=50&cursor=', 2),
+    ('/api/jobs/{job}', 2),
+    ('/api/jobs/statistics', 4),
+    ('/api/candidates/?per_page=50', 3),
+    ('/api/candidates/{candidate}/notes?per_page=50', 4),
+    ('/api/candidates/statistics', 4),
+    ('/api/applications/?per_page=50', 3),
+    ('/api/applications/{application}', 2),
+    ('/api/applications/statistics', 3),
+    ('/api/interviews/?per_page=50', 3),
+    ('/api/interviews/{interview}', 2),
+    (f'/api/interviews/calendar?start_date={NOW.date().isoformat()}', 2),
+    ('/api/interviews/statistics', 3),
+    ('/api/clients/statistics', 4),
+    ('/api/partners/statistics', 3),
+    ('/api/activities/?per_page=50', 3),
+    ('/api/activities/recent', 2),
+    ('/api/activities/archive', 1),
+    ('/api/activities/statistics', 4),
+    ('/api/search?per_page=50', 2),
+]
+
+
+@pytest.mark.parametrize('url, budget', READ_BUDGETS)
+def test_read_budget(app, client, url, budget):
+    statements = _statements(app, client, 'GET', url)
+    assert len(statements) <= budget, '\n\n'.join(statements)
+
+
+def test_bulk_create_budget(app, client):
+    with app.app_context():
+        job_id = _first_id(JobPosition)
+        candidate_ids = db.session.execute(
+            db.select(Candidate.id).order_by(Candidate.id.desc()).limit(PAGE_ROWS)
+        ).scalars().all()
+
+    statements = _statements(app, client, 'POST', '/api/applications/bulk', json={
+        'job_position_id': job_id, 'applications': [{'candidate_id': candidate_id} for candidate_id in candidate_ids]
+    })
+    assert len(statements) <= 13, '\n\n'.join(statements)
+
+
+def test_bulk_status_budget(app, client):
+    with app.app_context():
+        application_ids = db.session.execute(db.select(Application.id).limit(PAGE_ROWS)).scalars().all()
+
+    statements = _statements(app, client, 'PUT', '/api/applications/bulk/status', json={
+        'application_ids': application_ids, 'status': ApplicationStatus.INTERVIEW.value
+    })
+    assert len(statements) <= 10, '\n\n'.join(statements)